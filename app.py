@@ -1,11 +1,13 @@
 import os
 import logging
-from flask import Flask, render_template
+from flask import Flask, render_template, jsonify
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager, current_user
 from sqlalchemy.orm import DeclarativeBase
 from werkzeug.middleware.proxy_fix import ProxyFix
 
+from config import Config
+
 # Configure logging
 logging.basicConfig(level=logging.DEBUG)
 
@@ -14,33 +16,8 @@ class Base(DeclarativeBase):
 
 db = SQLAlchemy(model_class=Base)
 
-# Create the app
-app = Flask(__name__)
-app.secret_key = os.environ.get("SESSION_SECRET")
-app.wsgi_app = ProxyFix(app.wsgi_app, x_proto=1, x_host=1)
-
-# Configure the database - Fresh Local Setup
-database_url = os.environ.get("DATABASE_URL", "sqlite:///toolora.db")
-
-print("🚀 Using Fresh Local Database Setup")
-
-# Clean database configuration for local development
-app.config["SQLALCHEMY_DATABASE_URI"] = database_url
-app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
-    "pool_recycle": 300,
-    "pool_pre_ping": True,
-}
-
-# Configure upload folder
-app.config['UPLOAD_FOLDER'] = 'uploads'
-app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
-
-# Initialize the app with the extension
-db.init_app(app)
-
 # Initialize Flask-Login
 login_manager = LoginManager()
-login_manager.init_app(app)
 login_manager.login_view = 'auth.login'
 
 @login_manager.user_loader
@@ -48,30 +25,160 @@ def load_user(user_id):
     from models import User
     return User.query.get(int(user_id))
 
-with app.app_context():
-    # Import models here so their tables are created
-    import models
-    db.create_all()
-    
-    # Import and register blueprints after database setup
-    from routes.main import main_bp
-    from routes.tools import tools_bp
-    from routes.auth import auth_bp
-    from routes.api import api_bp
-
-    app.register_blueprint(main_bp)
-    app.register_blueprint(tools_bp, url_prefix='/tools')
-    app.register_blueprint(auth_bp, url_prefix='/auth')
-    app.register_blueprint(api_bp, url_prefix='/api')
-
-# No authentication configuration needed
-
-# Error handlers
-@app.errorhandler(404)
-def not_found_error(error):
-    return render_template('errors/404.html'), 404
-
-@app.errorhandler(500)
-def internal_error(error):
-    db.session.rollback()
-    return render_template('errors/500.html'), 500
+# Blueprint name -> (module, attribute, url_prefix)
+BLUEPRINTS = {
+    'main': ('routes.main', 'main_bp', None),
+    'tools': ('routes.tools', 'tools_bp', '/tools'),
+    'auth': ('routes.auth', 'auth_bp', '/auth'),
+    'api': ('routes.api', 'api_bp', '/api'),
+    'api_v2': ('routes.enhanced_tool_api', 'enhanced_api_bp', None),
+}
+
+# Profile -> blueprints served and background services run by its processes
+PROFILES = {
+    'full': {
+        'blueprints': ('main', 'tools', 'auth', 'api', 'api_v2'),
+        'services': ('metrics', 'sweeper'),
+    },
+    'web': {
+        'blueprints': ('main', 'tools', 'auth'),
+        'services': ('metrics',),
+    },
+    'api': {
+        'blueprints': ('api', 'api_v2'),
+        'services': ('metrics', 'sweeper'),
+    },
+    'worker': {
+        'blueprints': (),
+        'services': ('sweeper', 'jobs'),
+    },
+    # Models and database only: maintenance scripts and CLIs
+    'script': {
+        'blueprints': (),
+        'services': (),
+    },
+}
+
+
+def create_app(config=None, profile=None):
+    """Build the Flask app for one of PROFILES
+
+    config is a mapping or an object with upper-case attributes applied
+    over the defaults. The profile comes from the argument, then
+    config['APP_PROFILE'], then the APP_PROFILE environment variable.
+    Nothing touches the database unless SCHEMA_AUTO_CREATE is on.
+    """
+    app = Flask(__name__)
+    app.secret_key = os.environ.get("SESSION_SECRET")
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_proto=1, x_host=1)
+
+    # Configure the database - Fresh Local Setup
+    database_url = os.environ.get("DATABASE_URL", "sqlite:///toolora.db")
+
+    from utils.database import engine_options
+    app.config["SQLALCHEMY_DATABASE_URI"] = database_url
+    app.config['UPLOAD_FOLDER'] = 'uploads'
+    app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
+    app.config['APP_PROFILE'] = Config.APP_PROFILE
+    app.config['SCHEMA_AUTO_CREATE'] = Config.SCHEMA_AUTO_CREATE
+    if isinstance(config, dict):
+        app.config.update(config)
+    elif config is not None:
+        app.config.from_object(config)
+    app.config.setdefault("SQLALCHEMY_ENGINE_OPTIONS", engine_options(app.config["SQLALCHEMY_DATABASE_URI"]))
+
+    profile = profile or app.config['APP_PROFILE']
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown app profile: {profile}")
+    app.config['APP_PROFILE'] = profile
+    blueprints = PROFILES[profile]['blueprints']
+    services = PROFILES[profile]['services']
+
+    db.init_app(app)
+    login_manager.init_app(app)
+
+    with app.app_context():
+        # WAL and pragmas on every SQLite connection, before the first one opens
+        from utils.database import configure_engine
+        configure_engine(db.engine)
+
+        # Import models so their tables are registered
+        import models  # noqa: F401
+
+    if app.config['SCHEMA_AUTO_CREATE']:
+        from utils.schema import ensure_schema
+        ensure_schema(app)
+
+    for name in blueprints:
+        module_name, attribute, url_prefix = BLUEPRINTS[name]
+        module = __import__(module_name, fromlist=[attribute])
+        app.register_blueprint(getattr(module, attribute), url_prefix=url_prefix)
+
+    # Tool list served from memory, reloaded when Tool/ToolCategory rows change
+    from utils.tool_catalog import tool_catalog
+    from routes.tools import TOOL_CUSTOM_ICONS
+    tool_catalog.init_app(app, icons=TOOL_CUSTOM_ICONS)
+
+    # /api/dashboard/track events and finished v2 tool runs are batched by a
+    # background flusher; queued runs are reported by the job queue's finish hook
+    # in whichever process dispatched them (web worker or python -m utils.job_queue)
+    from utils.tracking import usage_tracker
+    from utils.job_queue import job_queue
+    usage_tracker.init_app(app)
+    job_queue.on_finish(usage_tracker.record_job)
+
+    # Popular-tool lists read from counters maintained with each tracked batch
+    from utils.popularity import usage_counters
+    usage_counters.init_app(app)
+
+    # JSON and HTML of COMPRESSION_BLUEPRINTS gzip/brotli-compressed on the way out
+    from utils.compression import compression
+    compression.init_app(app)
+
+    if 'metrics' in services:
+        # Per-route and per-processor latency histograms at /metrics
+        from utils.metrics import metrics
+        metrics.init_app(app)
+
+    if 'sweeper' in services:
+        # Expire processed files in uploads/ and SavedFile rows in the background
+        from utils.storage import storage
+        storage.start_sweeper(app)
+
+    if 'jobs' in services:
+        from utils.job_queue import job_queue
+        job_queue.start()
+
+    # /static served from precompressed .br/.gz siblings when the client accepts them
+    from utils import static_files
+    static_files.init_app(app)
+
+    register_error_handlers(app, html='main' in blueprints)
+    return app
+
+
+def register_error_handlers(app, html=True):
+    """HTML error pages when the site is served, JSON otherwise"""
+
+    @app.errorhandler(404)
+    def not_found_error(error):
+        if html:
+            return render_template('errors/404.html'), 404
+        return jsonify({'error': 'Not found'}), 404
+
+    @app.errorhandler(500)
+    def internal_error(error):
+        db.session.rollback()
+        if html:
+            return render_template('errors/500.html'), 500
+        return jsonify({'error': 'Internal server error'}), 500
+
+
+def __getattr__(name):
+    # `from app import app` (maintenance scripts) builds a models-only app on
+    # first use; main.py builds the served one with create_app()
+    if name == 'app':
+        global app
+        app = create_app(profile='script')
+        return app
+    raise AttributeError(f"module 'app' has no attribute {name!r}")
@@ -0,0 +1,87 @@
+"""
+Cold-start benchmark per app profile
+Builds each create_app() profile in fresh interpreters and reports the time
+to import and build the app, the SQL statements run while building it, the
+first request, and how many modules and blueprints the process ends up
+with, with SCHEMA_AUTO_CREATE on and off
+
+Usage: python -m benchmarks.bench_cold_start [--runs 5] [--profiles full,web,api,worker,script]
+"""
+
+import os
+import sys
+import json
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+from benchmarks.fixtures import isolated_env
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Profile -> URL requested once the app is built
+FIRST_REQUEST = {
+    'full': '/',
+    'web': '/',
+    'api': '/api/v2/health',
+    'worker': None,
+    'script': None,
+}
+
+CHILD = '''
+import sys, json, time
+start = time.perf_counter()
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+queries = []
+event.listen(Engine, 'before_cursor_execute', lambda *args: queries.append(1))
+from app import create_app
+app = create_app(profile={profile!r})
+built = time.perf_counter() - start
+boot_queries = len(queries)
+first = None
+if {url!r}:
+    client = app.test_client()
+    start = time.perf_counter()
+    status = client.get({url!r}).status_code
+    first = time.perf_counter() - start
+print(json.dumps({{"build": built, "queries": boot_queries, "first": first, "modules": len(sys.modules),
+                  "blueprints": len(app.blueprints)}}))
+'''
+
+
+def measure(profile, env):
+    code = CHILD.format(profile=profile, url=FIRST_REQUEST[profile])
+    result = subprocess.run([sys.executable, '-c', code], cwd=ROOT, env=env,
+                            capture_output=True, text=True, check=True, timeout=120)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--profiles', default=','.join(FIRST_REQUEST))
+    args = parser.parse_args()
+
+    print(f"{'profile':<8} {'schema':<7} {'create_app':>11} {'queries':>8} {'1st request':>12} "
+          f"{'modules':>8} {'blueprints':>11}")
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for profile in args.profiles.split(','):
+            for schema in ('true', 'false'):
+                # Schema on first, so the 'false' runs find the tables in place like a worker after deploy
+                env = isolated_env(tmp, SCHEMA_AUTO_CREATE=schema)
+                runs = [measure(profile, env) for _ in range(args.runs)]
+                build = statistics.median(run['build'] for run in runs) * 1000
+                firsts = [run['first'] for run in runs if run['first'] is not None]
+                first = f'{statistics.median(firsts) * 1000:.1f}ms' if firsts else '-'
+                results[(profile, schema)] = build
+                print(f"{profile:<8} {'on' if schema == 'true' else 'off':<7} {build:>9.1f}ms "
+                      f"{runs[-1]['queries']:>8} {first:>12} "
+                      f"{runs[-1]['modules']:>8} {runs[-1]['blueprints']:>11}")
+    return results
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""
+Response compression benchmark
+CPU cost against bytes saved for the JSON and HTML responses the compression
+middleware handles: per-payload compressed size and time at several gzip
+levels and brotli qualities, the net time saved on a --mbps link, and
+end-to-end requests per second with and without Accept-Encoding
+
+Usage: python -m benchmarks.bench_compression [--requests 300] [--mbps 10]
+"""
+
+import os
+import time
+import argparse
+import tempfile
+import statistics
+
+from benchmarks.fixtures import isolated_env
+
+PAYLOADS = ('/tools/api/tools', '/search?q=pdf', '/api/dashboard/stats', '/about')
+SETTINGS = (('gzip', 1), ('gzip', 6), ('gzip', 9), ('br', 1), ('br', 4), ('br', 11))
+
+
+def compress(encoding, level, data):
+    from utils.compression import _GzipEncoder, _BrotliEncoder
+
+    encoder = _GzipEncoder(level) if encoding == 'gzip' else _BrotliEncoder(level)
+    return encoder.process(data) + encoder.finish()
+
+
+def time_compress(encoding, level, data, rounds):
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        compressed = compress(encoding, level, data)
+        timings.append(time.perf_counter() - start)
+    return len(compressed), statistics.median(timings)
+
+
+def throughput(client, url, encoding, requests):
+    headers = {'Accept-Encoding': encoding} if encoding else {}
+    client.get(url, headers=headers)
+    start = time.perf_counter()
+    size = 0
+    for _ in range(requests):
+        size = len(client.get(url, headers=headers).get_data())
+    return requests / (time.perf_counter() - start), size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=300)
+    parser.add_argument('--rounds', type=int, default=50)
+    parser.add_argument('--mbps', type=float, default=10.0, help='link speed for the net saving column')
+    args = parser.parse_args()
+    bytes_per_second = args.mbps * 1e6 / 8
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ.update(isolated_env(tmp, COMPRESSION_ENABLED='true'))
+        from app import create_app
+        from utils.static_files import brotli
+
+        client = create_app(profile='full').test_client()
+        settings = [(encoding, level) for encoding, level in SETTINGS if encoding == 'gzip' or brotli is not None]
+
+        print(f"{'payload':<22} {'setting':<8} {'bytes':>8} {'ratio':>6} {'cpu':>9} {'MB/s':>7} "
+              f"{'net saved':>10}")
+        results = {}
+        for url in PAYLOADS:
+            data = client.get(url).get_data()
+            print(f"{url:<22} {'none':<8} {len(data):>8}")
+            for encoding, level in settings:
+                size, seconds = time_compress(encoding, level, data, args.rounds)
+                saved = (len(data) - size) / bytes_per_second - seconds
+                results[(url, encoding, level)] = (size, seconds)
+                print(f"{'':<22} {f'{encoding}-{level}':<8} {size:>8} {size / len(data):>6.1%} "
+                      f"{seconds * 1e6:>7.0f}us {len(data) / seconds / 1e6:>7.1f} {saved * 1000:>8.2f}ms")
+        if brotli is None:
+            print("(brotli not installed: br settings skipped)")
+
+        print()
+        print(f"{'endpoint':<22} {'encoding':<9} {'req/s':>8} {'bytes':>8}")
+        for url in PAYLOADS[:2]:
+            for encoding in [None, 'gzip'] + (['br'] if brotli is not None else []):
+                rate, size = throughput(client, url, encoding, args.requests)
+                results[(url, encoding)] = rate
+                print(f"{url:<22} {encoding or 'identity':<9} {rate:>8.0f} {size:>8}")
+    return results
+
+
+if __name__ == '__main__':
+    main()
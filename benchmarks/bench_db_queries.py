@@ -0,0 +1,147 @@
+"""
+Database query benchmark
+Seeds a throwaway SQLite database with --rows tool_history rows (plus
+analytics and saved-file rows), then times the hot queries from
+benchmarks.check_query_plans without and with the model indexes
+
+Usage: python -m benchmarks.bench_db_queries [--rows 1000000] [--users 2000] [--days 90]
+"""
+
+import os
+import time
+import random
+import argparse
+import tempfile
+import statistics
+from datetime import datetime, timedelta
+
+from benchmarks.fixtures import isolated_env
+
+DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S.%f'  # SQLAlchemy's SQLite DateTime storage format
+CHUNK = 50000
+
+
+def _seed(conn, rows, users, days, tool_names):
+    """Insert synthetic rows through the DBAPI connection; returns seconds taken"""
+    rng = random.Random(7)
+    now = datetime.utcnow()
+    span = days * 24 * 3600
+    start = time.perf_counter()
+
+    def moment():
+        return (now - timedelta(seconds=rng.random() * span)).strftime(DATETIME_FORMAT)
+
+    cursor = conn.cursor()
+    cursor.executemany('INSERT INTO users (id, email) VALUES (?, ?)',
+                       [(i, f'user{i}@example.com') for i in range(1, users + 1)])
+    for offset in range(0, rows, CHUNK):
+        batch = []
+        for _ in range(min(CHUNK, rows - offset)):
+            name, category = rng.choice(tool_names)
+            batch.append((rng.randint(1, users), name, category, moment(), rng.randint(1, 5),
+                          rng.random() * 10, rng.random() * 20))
+        cursor.executemany(
+            'INSERT INTO tool_history (user_id, tool_name, tool_category, used_at, file_count, '
+            'processing_time, file_size_mb) VALUES (?, ?, ?, ?, ?, ?, ?)', batch)
+
+    analytics = [(rng.randint(1, users), f'session-{rng.randint(1, rows // 20 or 1)}', '/tools/', 'view', moment())
+                 for _ in range(rows // 4)]
+    cursor.executemany('INSERT INTO user_analytics (user_id, session_id, page_url, action, timestamp) '
+                       'VALUES (?, ?, ?, ?, ?)', analytics)
+
+    files = []
+    for i in range(rows // 20):
+        created = now - timedelta(seconds=rng.random() * span)
+        files.append((rng.randint(1, users), 'in.pdf', f'out-{i}.pdf', f'uploads/out-{i}.pdf', 1024,
+                      'application/pdf', 'pdf-merge', created.strftime(DATETIME_FORMAT),
+                      (created + timedelta(days=1)).strftime(DATETIME_FORMAT)))
+    cursor.executemany('INSERT INTO saved_files (user_id, original_filename, saved_filename, file_path, file_size, '
+                       'mime_type, tool_used, created_at, expires_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)', files)
+    conn.commit()
+    return time.perf_counter() - start
+
+
+def _time_queries(session, queries, repeat):
+    """{name: median milliseconds}"""
+    timings = {}
+    for name, (table, statement) in queries.items():
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            session.execute(statement).fetchall()
+            samples.append(time.perf_counter() - start)
+        timings[name] = statistics.median(samples) * 1000
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--users', type=int, default=2000)
+    parser.add_argument('--days', type=int, default=90)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ.update(isolated_env(tmp))
+        from app import app, db
+        from config import Config
+        from utils.schema import ensure_indexes
+        from utils.popularity import usage_counters
+        from benchmarks.check_query_plans import hot_queries, explain
+
+        with app.app_context():
+            engine = db.engine
+            for table in db.metadata.sorted_tables:
+                for index in table.indexes:
+                    index.drop(engine, checkfirst=True)
+
+            tool_names = [(tool, category) for category, data in Config.TOOL_CATEGORIES.items()
+                          for tool in data['tools']]
+            raw = engine.raw_connection()
+            try:
+                seconds = _seed(raw, args.rows, args.users, args.days, tool_names)
+            finally:
+                raw.close()
+            print(f'seeded {args.rows:,} tool_history rows ({args.users} users, {args.days} days) in {seconds:.1f}s')
+
+            start = time.perf_counter()
+            usage_counters.rebuild()
+            print(f'popularity counters rebuilt (no indexes) in {time.perf_counter() - start:.2f}s')
+
+            queries = hot_queries()
+            before = _time_queries(db.session, queries, args.repeat)
+
+            start = time.perf_counter()
+            created = ensure_indexes()
+            with engine.connect() as conn:
+                conn.exec_driver_sql('ANALYZE')
+            print(f'created {len(created)} indexes + ANALYZE in {time.perf_counter() - start:.1f}s')
+            after = _time_queries(db.session, queries, args.repeat)
+
+            print(f"\n{'query':<28} {'no index':>11} {'indexed':>11} {'speedup':>9}  plan")
+            with engine.connect() as conn:
+                for name, (table, statement) in queries.items():
+                    plan = ' | '.join(explain(conn, statement))
+                    print(f'{name:<28} {before[name]:>9.2f}ms {after[name]:>9.2f}ms '
+                          f'{before[name] / after[name] if after[name] else 0:>8.1f}x  {plan}')
+
+            usage_counters.invalidate()
+            start = time.perf_counter()
+            usage_counters.popular('all', 8)
+            counters_ms = (time.perf_counter() - start) * 1000
+            print(f"\npopular tools: GROUP BY over tool_history {after['popular.rebuild_totals']:.2f}ms, "
+                  f"counters table {counters_ms:.2f}ms (uncached), "
+                  f"in-process cache {_cached_ms(usage_counters):.4f}ms")
+            return before, after
+
+
+def _cached_ms(counters, repeat=1000):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        counters.popular('all', 8)
+    return (time.perf_counter() - start) * 1000 / repeat
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""
+Startup import-time benchmark
+Boots the app (`import main`) in fresh interpreters under -X importtime and
+reports the cumulative import time of each app module and of the heavy
+processing libraries, which utils.lazy_imports now defers to first use
+
+Usage: python -m benchmarks.bench_imports [--runs 5] [--top 25]
+"""
+
+import os
+import re
+import sys
+import json
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+from benchmarks.fixtures import isolated_env
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+IMPORTTIME_LINE = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)')
+APP_PREFIXES = ('main', 'app', 'config', 'models', 'routes', 'utils')
+
+BOOT = 'import time; start = time.perf_counter(); import main; boot = time.perf_counter() - start'
+EAGER = ('import time; start = time.perf_counter(); import main; '
+         'from utils.lazy_imports import preload; timings = preload(); boot = time.perf_counter() - start')
+REPORT = ('; import sys, json; from utils.lazy_imports import HEAVY_MODULES; '
+          'print(json.dumps({"boot": boot, "timings": globals().get("timings", {}), '
+          '"loaded": [name for name in HEAVY_MODULES if name in sys.modules]}))')
+
+
+def _run(code, env, importtime=False):
+    args = [sys.executable] + (['-X', 'importtime'] if importtime else []) + ['-c', code + REPORT]
+    result = subprocess.run(args, cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1]), result.stderr
+
+
+def parse_importtime(stderr):
+    """{module: (self microseconds, cumulative microseconds)} from -X importtime output"""
+    modules = {}
+    for line in stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            modules[match.group(4)] = (int(match.group(1)), int(match.group(2)))
+    return modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--runs', type=int, default=5, help='fresh interpreters per boot mode')
+    parser.add_argument('--top', type=int, default=25, help='app modules to list')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = isolated_env(tmp)
+        lazy = [_run(BOOT, env)[0]['boot'] for _ in range(args.runs)]
+        eager = [_run(EAGER, env)[0]['boot'] for _ in range(args.runs)]
+        report, stderr = _run(BOOT, env, importtime=True)
+        first_use, _ = _run(EAGER, env)
+
+    modules = parse_importtime(stderr)
+    app_modules = sorted(((name, times) for name, times in modules.items() if name.split('.')[0] in APP_PREFIXES),
+                         key=lambda item: -item[1][1])
+    print(f"{'app module':<34} {'self':>9} {'cumulative':>11}")
+    for name, (self_us, cumulative_us) in app_modules[:args.top]:
+        print(f'{name:<34} {self_us / 1000:>7.1f}ms {cumulative_us / 1000:>9.1f}ms')
+
+    print(f"\n{'processing library':<34} {'at boot':>9} {'first use':>11}")
+    for name, seconds in sorted(first_use['timings'].items(), key=lambda item: -item[1]):
+        at_boot = 'loaded' if name in report['loaded'] else '-'
+        print(f'{name:<34} {at_boot:>9} {seconds * 1000:>9.1f}ms')
+
+    print(f'\nimport main, median of {args.runs}: {statistics.median(lazy) * 1000:.0f}ms lazy, '
+          f'{statistics.median(eager) * 1000:.0f}ms with every processing library imported '
+          f'(+{sum(first_use["timings"].values()) * 1000:.0f}ms deferred to first use or the gunicorn master)')
+    return report
+
+
+if __name__ == '__main__':
+    main()
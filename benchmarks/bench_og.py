@@ -0,0 +1,99 @@
+"""
+OG image generation benchmark
+Compares images per second of the cached base-layer generator against the
+previous approach that redrew the gradient, dot pattern and fonts per call
+
+Usage: python -m benchmarks.bench_og [--count 50]
+"""
+
+import io
+import time
+import argparse
+
+from PIL import Image, ImageChops, ImageDraw, ImageFont, ImageStat
+
+from utils import og_generator
+
+
+def _render_legacy(title, description, tool_category):
+    """Per-call work of the previous generator: 630 lines, 480 ellipses, font loads"""
+    width, height = og_generator.OG_WIDTH, og_generator.OG_HEIGHT
+    img = Image.new('RGB', (width, height), color='#1a1a1a')
+    draw = ImageDraw.Draw(img)
+    for y in range(height):
+        ratio = y / height
+        top, bottom = og_generator.GRADIENT_TOP, og_generator.GRADIENT_BOTTOM
+        color = tuple(int(t * (1 - ratio) + b * ratio) for t, b in zip(top, bottom))
+        draw.line([(0, y), (width, y)], fill=color)
+    for x in range(0, width, 40):
+        for y in range(0, height, 40):
+            draw.ellipse([x, y, x + 2, y + 2], fill=(255, 255, 255, 20))
+    try:
+        ImageFont.truetype("Arial", 64)
+        ImageFont.truetype("Arial", 36)
+    except OSError:
+        ImageFont.load_default()
+        ImageFont.load_default()
+
+    # Same overlay as the current generator, drawn onto the freshly built background
+    overlay = og_generator.generate_og_image(title, description, tool_category)
+    img.paste(overlay.crop((og_generator.LOGO_X, 0, width, height)), (og_generator.LOGO_X, 0))
+    return img
+
+
+def _render_cached(title, description, tool_category):
+    return og_generator.generate_og_image(title, description, tool_category)
+
+
+def measure(render, count, encode):
+    start = time.perf_counter()
+    for i in range(count):
+        img = render(f'Tool {i}', 'Professional pdf tool - Free online', 'pdf')
+        if encode:
+            img.save(io.BytesIO(), 'PNG', optimize=True)
+    return count / (time.perf_counter() - start)
+
+
+def background_difference():
+    """Mean absolute per-channel difference between the old and new backgrounds"""
+    width, height = og_generator.OG_WIDTH, og_generator.OG_HEIGHT
+    legacy = Image.new('RGB', (width, height))
+    draw = ImageDraw.Draw(legacy)
+    for y in range(height):
+        ratio = y / height
+        color = tuple(int(t * (1 - ratio) + b * ratio)
+                      for t, b in zip(og_generator.GRADIENT_TOP, og_generator.GRADIENT_BOTTOM))
+        draw.line([(0, y), (width, y)], fill=color)
+    for x in range(0, width, 40):
+        for y in range(0, height, 40):
+            draw.ellipse([x, y, x + 2, y + 2], fill=(255, 255, 255, 20))
+
+    current = og_generator.get_base_layer()
+    region = (og_generator.LOGO_X + og_generator.LOGO_SIZE + 10, 0, width, height - 70)
+    diff = ImageChops.difference(legacy.crop(region), current.crop(region))
+    return sum(ImageStat.Stat(diff).mean) / 3
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--count', type=int, default=50)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    og_generator.get_base_layer()
+    print(f'base layer build (once): {(time.perf_counter() - start) * 1000:.1f}ms')
+
+    results = {}
+    for encode in (False, True):
+        label = 'render+png' if encode else 'render'
+        for name, render in (('legacy', _render_legacy), ('cached', _render_cached)):
+            results[(name, label)] = measure(render, args.count, encode)
+            print(f'{name:>7} {label:<11} {results[(name, label)]:>8.1f} images/s')
+        print(f"{'':>7} {label:<11} speedup x{results[('cached', label)] / results[('legacy', label)]:.1f}")
+
+    print(f'background mean abs difference: {background_difference():.2f}/255')
+    return results
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""
+Page cache benchmark
+Latency of the static and tool pages rendered on every request against the
+same pages served from the page cache, plus a conditional request that
+revalidates with If-None-Match
+
+Usage: python -m benchmarks.bench_page_cache [--requests 200] [--urls /about,/faq,/tools/image-compress]
+"""
+
+import os
+import sys
+import json
+import argparse
+import tempfile
+import subprocess
+
+from benchmarks.fixtures import isolated_env
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+URLS = ('/about', '/faq', '/privacy', '/blog', '/tools/image-compress')
+
+CHILD = '''
+import json, time, statistics
+from app import create_app
+app = create_app(profile='web')
+client = app.test_client()
+results = {{}}
+for url in {urls!r}:
+    first = client.get(url)
+    timings = []
+    for _ in range({requests}):
+        start = time.perf_counter()
+        client.get(url)
+        timings.append(time.perf_counter() - start)
+    revalidate = None
+    if first.headers.get('ETag'):
+        start = time.perf_counter()
+        status = client.get(url, headers={{'If-None-Match': first.headers['ETag']}}).status_code
+        revalidate = [status, time.perf_counter() - start]
+    timings.sort()
+    results[url] = {{"status": first.status_code, "p50": statistics.median(timings),
+                    "p99": timings[int(len(timings) * 0.99) - 1], "revalidate": revalidate}}
+print(json.dumps(results))
+'''
+
+
+def measure(urls, requests, env):
+    code = CHILD.format(urls=tuple(urls), requests=requests)
+    result = subprocess.run([sys.executable, '-c', code], cwd=ROOT, env=env,
+                            capture_output=True, text=True, check=True, timeout=600)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--urls', default=','.join(URLS))
+    args = parser.parse_args()
+    urls = args.urls.split(',')
+
+    with tempfile.TemporaryDirectory() as tmp:
+        rendered = measure(urls, args.requests, isolated_env(tmp))
+        cached = measure(urls, args.requests, isolated_env(tmp, PAGE_CACHE_ENABLED='true'))
+
+    print(f"{'url':<24} {'status':>6} {'rendered p50':>13} {'cached p50':>11} {'cached p99':>11} "
+          f"{'speedup':>8} {'304':>10}")
+    for url in urls:
+        before, after = rendered[url], cached[url]
+        revalidate = after['revalidate']
+        not_modified = f"{revalidate[0]} {revalidate[1] * 1000:.2f}ms" if revalidate else '-'
+        print(f"{url:<24} {after['status']:>6} {before['p50'] * 1000:>11.2f}ms {after['p50'] * 1000:>9.2f}ms "
+              f"{after['p99'] * 1000:>9.2f}ms {before['p50'] / after['p50']:>7.1f}x {not_modified:>10}")
+    return rendered, cached
+
+
+if __name__ == '__main__':
+    main()
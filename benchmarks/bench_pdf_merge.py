@@ -0,0 +1,94 @@
+"""
+PDF merge memory benchmark
+Shows peak RSS of the streaming merge staying flat as the input count grows,
+against the previous single PdfWriter approach
+
+Usage: python -m benchmarks.bench_pdf_merge [--counts 5,10,25,50] [--pages 10]
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+
+from benchmarks.fixtures import make_pdf
+
+
+def _merge_legacy(input_files, output_path):
+    from PyPDF2 import PdfReader, PdfWriter
+
+    writer = PdfWriter()
+    for file_path in input_files:
+        reader = PdfReader(file_path)
+        for page in reader.pages:
+            writer.add_page(page)
+    with open(output_path, 'wb') as f:
+        writer.write(f)
+
+
+def _merge_streaming(input_files, output_path):
+    from utils.pdf_merge import merge_pdf_files
+
+    merge_pdf_files(input_files, output_path)
+
+
+def run_once(engine, input_files, output_path):
+    """Run one merge in this process and print its measurements as JSON"""
+    from utils.pdf_merge import peak_rss_kb
+
+    baseline_kb = peak_rss_kb()
+    start = time.perf_counter()
+    (_merge_streaming if engine == 'streaming' else _merge_legacy)(input_files, output_path)
+    elapsed = time.perf_counter() - start
+    peak_kb = peak_rss_kb()
+    print(json.dumps({
+        'engine': engine,
+        'inputs': len(input_files),
+        'seconds': round(elapsed, 3),
+        'peak_rss_mb': round(peak_kb / 1024, 1),
+        'rss_growth_mb': round((peak_kb - baseline_kb) / 1024, 1),
+        'output_mb': round(os.path.getsize(output_path) / 1024 / 1024, 2)
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--counts', default='5,10,25,50')
+    parser.add_argument('--pages', type=int, default=10)
+    parser.add_argument('--engines', default='legacy,streaming')
+    parser.add_argument('--run-once', nargs='+', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_once:
+        engine, output_path, *input_files = args.run_once
+        run_once(engine, input_files, output_path)
+        return
+
+    counts = [int(c) for c in args.counts.split(',')]
+    with tempfile.TemporaryDirectory() as tmp:
+        # Distinct images per input so deduplication does not flatter the numbers
+        inputs = [make_pdf(os.path.join(tmp, f'input_{i}.pdf'), pages=args.pages, label=f'Doc {i}')
+                  for i in range(max(counts))]
+
+        results = []
+        for engine in args.engines.split(','):
+            for count in counts:
+                # Fresh interpreter per run so ru_maxrss measures only this merge
+                out = subprocess.run(
+                    [sys.executable, '-m', 'benchmarks.bench_pdf_merge', '--run-once',
+                     engine, os.path.join(tmp, 'merged.pdf'), *inputs[:count]],
+                    capture_output=True, text=True, check=True
+                )
+                result = json.loads(out.stdout.strip().splitlines()[-1])
+                results.append(result)
+                print(f"{result['engine']:>10} inputs={result['inputs']:>3} "
+                      f"time={result['seconds']:>7.3f}s peak_rss={result['peak_rss_mb']:>7.1f}MB "
+                      f"growth={result['rss_growth_mb']:>7.1f}MB output={result['output_mb']:.2f}MB")
+    return results
+
+
+if __name__ == '__main__':
+    main()
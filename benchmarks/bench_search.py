@@ -0,0 +1,110 @@
+"""
+Tool search benchmark
+Query latency of the prefix/trigram search index against the previous
+linear substring scan, over a synthetic catalog of --tools tools
+
+Usage: python -m benchmarks.bench_search [--tools 10000] [--queries 2000]
+"""
+
+import time
+import random
+import argparse
+import statistics
+
+from utils.search_index import SearchIndex
+from utils.tool_catalog import CategoryRecord, ToolRecord
+
+WORDS = ('pdf', 'image', 'video', 'audio', 'merge', 'split', 'compress', 'convert', 'resize', 'crop',
+         'rotate', 'watermark', 'extract', 'generator', 'calculator', 'converter', 'remover', 'summarize',
+         'translate', 'resume', 'invoice', 'qr', 'barcode', 'password', 'subtitle', 'trimmer', 'editor',
+         'scanner', 'signature', 'budget', 'loan', 'tax', 'currency', 'notes', 'flashcard', 'mindmap')
+CATEGORIES = ('pdf', 'image', 'video', 'ai', 'utility', 'finance', 'student', 'government')
+QUERIES = ('p', 'pd', 'pdf', 'pdf m', 'pdf merge', 'com', 'compre', 'image resize', 'gen', 'ator',
+           'calc', 'qr', 'water', 'subtitle gen', 'zzz', 'res')
+
+
+def make_tools(count, seed=1):
+    rng = random.Random(seed)
+    categories = [CategoryRecord(name=name, display_name=f'{name.title()} Tools', icon='tool', color='blue',
+                                 description='', sort_order=i) for i, name in enumerate(CATEGORIES)]
+    tools = []
+    for i in range(count):
+        words = rng.sample(WORDS, 3)
+        name = '-'.join(words) + f'-{i}'
+        tools.append(ToolRecord(
+            name=name,
+            display_name=' '.join(words).title(),
+            description=f"Professional {' '.join(rng.sample(WORDS, 6))} tool",
+            category=rng.choice(categories),
+            icon='tool', color='blue', is_popular=False, is_premium=False, usage_count=0,
+            features=tuple(rng.sample(WORDS, 2)), file_types=(), max_file_size_mb=16
+        ))
+    popularity = {tool.name: rng.randint(0, 5000) for tool in tools}
+    return tools, popularity
+
+
+def linear_search(tools, query):
+    """Previous /search behaviour: substring test on every tool and category name"""
+    query = query.lower()
+    return [tool for tool in tools
+            if query in tool.name.lower() or query in tool.category.display_name.lower()]
+
+
+def measure(search, queries):
+    timings = []
+    for query in queries:
+        start = time.perf_counter()
+        search(query)
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return {
+        'p50_us': statistics.median(timings) * 1e6,
+        'p99_us': timings[int(len(timings) * 0.99) - 1] * 1e6,
+        'qps': len(timings) / sum(timings)
+    }
+
+
+def typeahead_queries(count, seed=2):
+    """Keystroke-by-keystroke prefixes of one- and two-word queries"""
+    rng = random.Random(seed)
+    queries = []
+    while len(queries) < count:
+        phrase = ' '.join(rng.sample(WORDS, rng.choice((1, 1, 2))))
+        queries.extend(phrase[:end] for end in range(1, len(phrase) + 1) if phrase[:end].strip())
+    return queries[:count]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--tools', type=int, default=10000)
+    parser.add_argument('--queries', type=int, default=2000)
+    parser.add_argument('--limit', type=int, default=10, help='results per typeahead query')
+    args = parser.parse_args()
+
+    tools, popularity = make_tools(args.tools)
+    start = time.perf_counter()
+    index = SearchIndex(tools, popularity)
+    print(f'index build: {(time.perf_counter() - start) * 1000:.0f}ms for {len(tools)} tools')
+    uncached = SearchIndex(tools, popularity, cache_size=0)
+
+    queries = typeahead_queries(args.queries)
+    results = {
+        'linear scan': measure(lambda q: linear_search(tools, q), queries),
+        'index cold': measure(lambda q: uncached.search(q, args.limit), queries),
+        'index': measure(lambda q: index.search(q, args.limit), queries),
+    }
+    for name, result in results.items():
+        print(f"{name:>12}  p50 {result['p50_us']:>9.1f}us  p99 {result['p99_us']:>9.1f}us  "
+              f"{result['qps']:>9.0f} queries/s")
+
+    print('\nper query (uncached, ranked):')
+    for query in QUERIES:
+        matches = uncached.search(query, args.limit)
+        timing = measure(lambda q: uncached.search(q, args.limit), [query] * 20)
+        print(f"  {query!r:<16} {timing['p50_us']:>8.1f}us  {len(uncached.search(query)):>5} matches"
+              f"  top: {matches[0].name if matches else '-'}")
+    return results
+
+
+if __name__ == '__main__':
+    main()
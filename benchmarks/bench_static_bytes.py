@@ -0,0 +1,92 @@
+"""
+Static bytes-on-the-wire benchmark
+Requests every local stylesheet, script and icon a typical tool page links,
+as separate source files (the layout before bundling) and as the built
+bundles, with Accept-Encoding identity, gzip and br, and reports requests
+and bytes transferred (body plus response headers)
+
+Builds the assets first, which also writes .gz/.br siblings under static/
+(ignored by git).
+
+Usage: python -m benchmarks.bench_static_bytes [--page /tools/image-compress]
+"""
+
+import os
+import re
+import argparse
+import tempfile
+
+from benchmarks.fixtures import isolated_env
+
+LOCAL_LINK = re.compile(r'(?:src|href)="(/(?:static|assets)/[^"?]+)"')
+
+
+def local_links(html):
+    """Distinct /static and /assets URLs in page order"""
+    return list(dict.fromkeys(LOCAL_LINK.findall(html)))
+
+
+def unbundled(urls, manifest, bundles):
+    """The same page with each bundle replaced by its source files"""
+    bundle_by_file = {filename: name for name, filename in manifest.items()}
+    expanded = []
+    for url in urls:
+        name = bundle_by_file.get(url.rsplit('/', 1)[-1]) if url.startswith('/assets/') else None
+        if name:
+            expanded.extend(f'/static/{source}' for source in bundles[name])
+        else:
+            expanded.append(url)
+    return list(dict.fromkeys(expanded))
+
+
+def transfer(client, urls, encoding):
+    """(requests, bytes) to fetch urls with the given Accept-Encoding"""
+    total = 0
+    for url in urls:
+        response = client.get(url, headers={'Accept-Encoding': encoding})
+        headers = sum(len(f'{key}: {value}\r\n') for key, value in response.headers.items())
+        total += len(response.get_data()) + headers
+    return len(urls), total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--page', default='/tools/image-compress')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ.update(isolated_env(tmp, ASSET_DIST_DIR=os.path.join(tmp, 'dist')))
+        from app import create_app
+        from utils.assets import BUNDLES, build_assets, load_manifest
+        from utils.static_files import brotli
+
+        build_assets()
+        client = create_app(profile='web').test_client()
+        page = client.get(args.page)
+        if page.status_code != 200:
+            raise SystemExit(f"{args.page} returned {page.status_code}")
+
+        bundled = local_links(page.get_data(as_text=True))
+        layouts = {
+            'separate files': unbundled(bundled, load_manifest(), BUNDLES),
+            'bundled': bundled,
+        }
+        encodings = ['identity', 'gzip'] + (['br'] if brotli is not None else [])
+
+        results = {}
+        print(f"{args.page}: {len(page.get_data())} bytes of HTML")
+        print(f"{'layout':<16} {'encoding':<9} {'requests':>8} {'bytes':>10} {'vs baseline':>12}")
+        baseline = None
+        for layout, urls in layouts.items():
+            for encoding in encodings:
+                requests, size = transfer(client, urls, encoding)
+                baseline = baseline or size
+                results[(layout, encoding)] = (requests, size)
+                print(f"{layout:<16} {encoding:<9} {requests:>8} {size:>10} {size / baseline:>11.1%}")
+        if brotli is None:
+            print("(brotli not installed: br variants not built)")
+    return results
+
+
+if __name__ == '__main__':
+    main()
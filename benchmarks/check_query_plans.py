@@ -0,0 +1,130 @@
+"""
+Query plan check
+Asserts that the dashboard, popularity, catalog, storage and analytics
+queries are answered through an index on SQLite and, when a database URL is
+given, on PostgreSQL. Exits non-zero when a query scans its table.
+
+Usage: python -m benchmarks.check_query_plans [--postgres-url postgresql://...]
+"""
+
+import os
+import re
+import sys
+import argparse
+import tempfile
+from datetime import datetime, timedelta
+
+from benchmarks.fixtures import isolated_env
+
+
+def hot_queries():
+    """{name: (table, statement)} for the queries the app runs on hot paths"""
+    from sqlalchemy import select, func
+    from models import ToolHistory, ToolUsageHourly, Tool, SavedFile, UserAnalytics
+
+    now = datetime.utcnow()
+    return {
+        'dashboard.tools_used': ('tool_history',
+            select(func.count(ToolHistory.id)).where(ToolHistory.user_id == 1)),
+        'dashboard.files_processed': ('tool_history',
+            select(func.sum(ToolHistory.file_count)).where(ToolHistory.user_id == 1)),
+        'dashboard.recent_activity': ('tool_history',
+            select(ToolHistory).where(ToolHistory.user_id == 1).order_by(ToolHistory.used_at.desc()).limit(10)),
+        'popular.rebuild_totals': ('tool_history',
+            select(ToolHistory.tool_name, ToolHistory.tool_category, func.count(ToolHistory.id))
+            .group_by(ToolHistory.tool_name, ToolHistory.tool_category)),
+        'popular.rebuild_hourly': ('tool_history',
+            select(ToolHistory.tool_name, ToolHistory.tool_category, ToolHistory.used_at)
+            .where(ToolHistory.used_at >= now - timedelta(days=7))),
+        'popular.window_7d': ('tool_usage_hourly',
+            select(ToolUsageHourly.tool_name, ToolUsageHourly.tool_category, func.sum(ToolUsageHourly.usage_count))
+            .where(ToolUsageHourly.hour >= now - timedelta(days=7))
+            .group_by(ToolUsageHourly.tool_name, ToolUsageHourly.tool_category)),
+        'popular.prune': ('tool_usage_hourly',
+            select(ToolUsageHourly.hour).where(ToolUsageHourly.hour < now - timedelta(days=7))),
+        'catalog.active_tools': ('tools',
+            select(Tool).where(Tool.is_active == True).order_by(Tool.id)),  # noqa: E712
+        'storage.expired_files': ('saved_files',
+            select(SavedFile.id).where(SavedFile.expires_at < now).limit(500)),
+        'storage.user_files': ('saved_files',
+            select(SavedFile).where(SavedFile.user_id == 1).order_by(SavedFile.created_at.desc()).limit(20)),
+        'analytics.session': ('user_analytics',
+            select(UserAnalytics).where(UserAnalytics.session_id == 'session').order_by(UserAnalytics.timestamp)),
+    }
+
+
+def explain(conn, statement):
+    """Plan lines for statement on conn's dialect"""
+    dialect = conn.dialect
+    compiled = statement.compile(dialect=dialect)
+    if dialect.name == 'sqlite':
+        params = tuple(compiled.params[name] for name in compiled.positiontup)
+        rows = conn.exec_driver_sql(f'EXPLAIN QUERY PLAN {compiled}', params).fetchall()
+        return [row[-1] for row in rows]
+    rows = conn.exec_driver_sql(f'EXPLAIN {compiled}', compiled.params).fetchall()
+    return [row[0] for row in rows]
+
+
+def plan_problems(dialect_name, table, lines):
+    """Reasons the plan does not use an index on table, if any"""
+    problems = []
+    for line in lines:
+        if dialect_name == 'sqlite':
+            # 'SCAN t' reads the table; 'SCAN t USING [COVERING] INDEX ix' walks an index
+            if re.match(rf'SCAN {table}\b(?!.*USING (COVERING )?INDEX)', line.strip()):
+                problems.append(line.strip())
+        elif re.search(rf'Seq Scan on {table}\b', line):
+            problems.append(line.strip())
+    return problems
+
+
+def check(engine):
+    """Print each query's plan verdict; returns True when all use indexes"""
+    ok = True
+    with engine.connect() as conn:
+        if engine.dialect.name == 'postgresql':
+            # Small test tables would otherwise always be sequentially scanned
+            conn.exec_driver_sql('SET enable_seqscan = off')
+        for name, (table, statement) in hot_queries().items():
+            lines = explain(conn, statement)
+            problems = plan_problems(engine.dialect.name, table, lines)
+            ok = ok and not problems
+            print(f"  {'FAIL' if problems else 'ok':<4}  {name:<28} {' | '.join(lines)}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--postgres-url', default=os.environ.get('QUERY_PLAN_POSTGRES_URL'),
+                        help='also check plans on this PostgreSQL database (tables are created if missing)')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ.update(isolated_env(tmp))
+        from sqlalchemy import create_engine
+        from app import app, db
+        from utils.schema import ensure_indexes
+
+        results = {}
+        with app.app_context():
+            print(f'sqlite ({db.engine.url.database}):')
+            results['sqlite'] = check(db.engine)
+
+            if args.postgres_url:
+                engine = create_engine(args.postgres_url)
+                db.metadata.create_all(engine)
+                ensure_indexes(engine, db.metadata)
+                print('postgresql:')
+                results['postgresql'] = check(engine)
+            else:
+                print('postgresql: skipped (pass --postgres-url or set QUERY_PLAN_POSTGRES_URL)')
+
+    failed = [name for name, ok in results.items() if not ok]
+    if failed:
+        print(f"queries without index support on: {', '.join(failed)}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,77 @@
+"""
+Synthetic fixtures for the benchmark suite
+Generates PDFs, images and videos on demand so no binary test data is committed,
+and the environment that keeps benchmarked code away from the app's own state
+"""
+
+import os
+import io
+
+from PIL import Image
+
+
+def make_image(path, width=1600, height=1200, fmt='JPEG'):
+    """Write a noisy RGB image that does not compress trivially"""
+    img = Image.effect_noise((width, height), 64).convert('RGB')
+    img.save(path, fmt)
+    return path
+
+
+def make_pdf(path, pages=10, image_size=(600, 400), label='Benchmark'):
+    """Write a multi-page PDF with text and one embedded image per page"""
+    from reportlab.pdfgen import canvas
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.utils import ImageReader
+
+    buf = io.BytesIO()
+    Image.effect_noise(image_size, 64).convert('RGB').save(buf, 'JPEG', quality=90)
+    buf.seek(0)
+    image = ImageReader(buf)
+
+    c = canvas.Canvas(path, pagesize=A4)
+    width, height = A4
+    for page in range(pages):
+        c.setFont('Helvetica', 14)
+        c.drawString(72, height - 72, f'{label} - page {page + 1}')
+        for line in range(30):
+            c.drawString(72, height - 110 - line * 16, 'Lorem ipsum dolor sit amet ' * 3)
+        c.drawImage(image, 72, 72, width=image_size[0] / 2, height=image_size[1] / 2)
+        c.showPage()
+    c.save()
+    return path
+
+
+def make_video(path, seconds=5, size='640x360'):
+    """Write a short test video using ffmpeg's lavfi sources; returns None without ffmpeg"""
+    import shutil
+    import subprocess
+
+    if not shutil.which('ffmpeg'):
+        return None
+    cmd = [
+        'ffmpeg', '-f', 'lavfi', '-i', f'testsrc=duration={seconds}:size={size}:rate=25',
+        '-f', 'lavfi', '-i', f'sine=frequency=440:duration={seconds}',
+        '-c:v', 'libx264', '-preset', 'ultrafast', '-c:a', 'aac', '-shortest', '-y', path
+    ]
+    result = subprocess.run(cmd, capture_output=True)
+    return path if result.returncode == 0 and os.path.exists(path) else None
+
+
+def isolated_env(tmp, **overrides):
+    """Environment pointing every app store at tmp, with caching and background threads off"""
+    env = dict(os.environ)
+    env.update({
+        'RESULT_CACHE_ENABLED': 'false',
+        'PAGE_CACHE_ENABLED': 'false',
+        'METRICS_ENABLED': 'false',
+        'STORAGE_SWEEPER_ENABLED': 'false',
+        'JOB_QUEUE_ENABLED': 'false',
+        'STORAGE_ROOT': os.path.join(tmp, 'uploads'),
+        'STORAGE_DB_PATH': os.path.join(tmp, 'storage.db'),
+        'FFMPEG_STATE_DIR': os.path.join(tmp, 'ffmpeg'),
+        'JOB_DB_PATH': os.path.join(tmp, 'jobs.db'),
+        'CATALOG_VERSION_PATH': os.path.join(tmp, 'catalog.version'),
+        'DATABASE_URL': 'sqlite:///' + os.path.join(tmp, 'app.db'),
+    })
+    env.update(overrides)
+    return env
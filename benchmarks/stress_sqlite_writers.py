@@ -0,0 +1,192 @@
+"""
+SQLite concurrent writer stress test
+Forks --writers processes that each run --transactions tracking-style write
+transactions (look up the guest user, insert a batch of tool_history rows,
+upsert the popularity counters) against one SQLite file while --readers
+processes run dashboard queries, and counts "database is locked" failures
+for each engine setup:
+
+  legacy  the previous configuration: rollback journal, no pragmas
+  tuned   configure_engine(): WAL and pragmas, request sessions as the app runs them
+  writer  configure_engine() plus db_writer.session() (BEGIN IMMEDIATE, serialized)
+
+Exits non-zero when the writer mode records any lock error.
+
+Usage: python -m benchmarks.stress_sqlite_writers [--writers 8] [--readers 4] [--transactions 50] [--rows 20]
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import multiprocessing
+from datetime import datetime
+
+from benchmarks.fixtures import isolated_env
+
+MODES = ('legacy', 'tuned', 'writer')
+
+
+def _make_engine(mode, url):
+    from sqlalchemy import create_engine
+    from config import Config
+    from utils.database import engine_options, configure_engine
+
+    if mode == 'legacy':
+        # Same wait budget as the other modes so only the journal and locking differ
+        return create_engine(url, pool_recycle=300, pool_pre_ping=True,
+                             connect_args={'timeout': Config.SQLITE_BUSY_TIMEOUT_MS / 1000})
+    return configure_engine(create_engine(url, **engine_options(url)))
+
+
+def _transaction(session, worker, rows):
+    from models import User, ToolHistory
+    from utils.popularity import usage_counters
+
+    user = session.query(User).filter_by(email='guest@toolora.ai').first()
+    now = datetime.utcnow()
+    batch = [{'user_id': user.id, 'tool_name': f'tool-{(worker + i) % 40}', 'tool_category': 'stress',
+              'file_count': 1, 'file_size_mb': 0, 'used_at': now} for i in range(rows)]
+    session.execute(ToolHistory.__table__.insert(), batch)
+    usage_counters.apply(batch, session)
+
+
+def _worker(mode, url, worker, transactions, rows, start_event, results):
+    from sqlalchemy.orm import Session
+    from sqlalchemy.exc import OperationalError
+    from utils.database import db_writer
+
+    engine = _make_engine(mode, url)
+    ok = locked = failed = 0
+    start_event.wait()
+    started = time.perf_counter()
+    for _ in range(transactions):
+        try:
+            if mode == 'writer':
+                with db_writer.session(engine) as session:
+                    _transaction(session, worker, rows)
+            else:
+                with Session(bind=engine) as session, session.begin():
+                    _transaction(session, worker, rows)
+            ok += 1
+        except OperationalError as e:
+            if 'locked' in str(e) or 'busy' in str(e):
+                locked += 1
+            else:
+                failed += 1
+        except Exception:
+            failed += 1
+    results.put((ok, locked, failed, time.perf_counter() - started))
+    engine.dispose()
+
+
+def _reader(mode, url, start_event, stop_event, results):
+    from sqlalchemy import select, func
+    from sqlalchemy.orm import Session
+    from sqlalchemy.exc import OperationalError
+    from models import ToolHistory, ToolUsageTotal
+
+    engine = _make_engine(mode, url)
+    reads = locked = 0
+    start_event.wait()
+    while not stop_event.is_set():
+        try:
+            with Session(bind=engine) as session:
+                session.execute(select(func.count(ToolHistory.id)).where(ToolHistory.user_id == 1)).scalar()
+                session.execute(select(ToolUsageTotal).order_by(ToolUsageTotal.usage_count.desc()).limit(8)).all()
+            reads += 1
+        except OperationalError:
+            locked += 1
+    results.put((reads, locked))
+    engine.dispose()
+
+
+def run(mode, directory, writers, readers, transactions, rows):
+    """Run one mode against a fresh database; returns a result dict"""
+    from app import db
+    from models import User, ToolHistory
+
+    url = 'sqlite:///' + os.path.join(directory, f'{mode}.db')
+    engine = _make_engine(mode, url)
+    db.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(User.__table__.insert(), {'email': 'guest@toolora.ai', 'display_name': 'Guest User'})
+    engine.dispose()
+
+    context = multiprocessing.get_context('fork')
+    start_event, stop_event = context.Event(), context.Event()
+    results, read_results = context.Queue(), context.Queue()
+    processes = [context.Process(target=_worker, args=(mode, url, worker, transactions, rows, start_event, results))
+                 for worker in range(writers)]
+    processes += [context.Process(target=_reader, args=(mode, url, start_event, stop_event, read_results))
+                  for _ in range(readers)]
+    for process in processes:
+        process.start()
+    started = time.perf_counter()
+    start_event.set()
+    outcomes = [results.get() for _ in range(writers)]
+    elapsed = time.perf_counter() - started
+    stop_event.set()
+    read_outcomes = [read_results.get() for _ in range(readers)]
+    for process in processes:
+        process.join()
+
+    engine = _make_engine(mode, url)
+    with engine.connect() as conn:
+        stored = conn.execute(db.select(db.func.count()).select_from(ToolHistory.__table__)).scalar()
+        journal = conn.exec_driver_sql('PRAGMA journal_mode').scalar()
+    engine.dispose()
+
+    ok = sum(outcome[0] for outcome in outcomes)
+    return {
+        'mode': mode,
+        'journal': journal,
+        'committed': ok,
+        'locked': sum(outcome[1] for outcome in outcomes),
+        'failed': sum(outcome[2] for outcome in outcomes),
+        'rows': stored,
+        'expected_rows': ok * rows,
+        'tx_per_s': ok / elapsed if elapsed else 0,
+        'reads': sum(outcome[0] for outcome in read_outcomes),
+        'read_locked': sum(outcome[1] for outcome in read_outcomes),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--writers', type=int, default=8)
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--transactions', type=int, default=50, help='per writer')
+    parser.add_argument('--rows', type=int, default=20, help='tool_history rows per transaction')
+    parser.add_argument('--modes', default=','.join(MODES))
+    parser.add_argument('--busy-timeout-ms', type=int, default=None,
+                        help='override SQLITE_BUSY_TIMEOUT_MS for every mode')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        overrides = {'SQLITE_BUSY_TIMEOUT_MS': str(args.busy_timeout_ms)} if args.busy_timeout_ms else {}
+        os.environ.update(isolated_env(tmp, **overrides))
+        import models  # noqa: F401  (registers the tables on db.metadata)
+
+        print(f'{args.writers} writer processes x {args.transactions} transactions x {args.rows} rows, '
+              f'{args.readers} reader processes')
+        print(f"{'mode':<8} {'journal':<8} {'committed':>9} {'locked':>7} {'failed':>7} {'rows ok':>8} "
+              f"{'tx/s':>8} {'reads':>7} {'r.locked':>8}")
+        results = {}
+        for mode in args.modes.split(','):
+            result = results[mode] = run(mode, tmp, args.writers, args.readers, args.transactions, args.rows)
+            print(f"{mode:<8} {result['journal']:<8} {result['committed']:>9} {result['locked']:>7} "
+                  f"{result['failed']:>7} {str(result['rows'] == result['expected_rows']):>8} "
+                  f"{result['tx_per_s']:>8.1f} {result['reads']:>7} {result['read_locked']:>8}")
+
+    writer = results.get('writer')
+    if writer and (writer['locked'] or writer['failed'] or writer['read_locked']
+                   or writer['rows'] != writer['expected_rows']):
+        print('serialized writer recorded lock errors')
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,403 @@
+"""
+Processor benchmark suite
+Times every utils processor on synthetic fixtures, records throughput and
+peak memory, and compares the run against a JSON baseline
+
+Usage:
+    python -m benchmarks.suite                      # run and compare with benchmarks/baseline.json
+    python -m benchmarks.suite --only pdf,image     # run a subset (case name prefixes)
+    python -m benchmarks.suite --save-baseline      # record the current run as the baseline
+
+Exits with status 1 when a case is slower (or uses more memory) than its
+baseline by more than the threshold. Baselines are machine specific:
+record them on the machine that runs the comparison.
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import statistics
+import subprocess
+import tempfile
+
+from benchmarks import fixtures
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+# name -> (prepare function, iterations per timed repeat)
+CASES = {}
+
+
+def case(name, number=1):
+    """Register a benchmark case
+
+    The decorated function receives a Fixtures object, does all untimed
+    preparation (such as copying inputs the processor will delete) and
+    returns (callable to time, input bytes or 0).
+    """
+    def decorator(func):
+        CASES[name] = (func, number)
+        return func
+    return decorator
+
+
+class Fixtures:
+    """Lazily generated fixture files shared by every case of a run"""
+
+    def __init__(self, root):
+        self.root = root
+        self.work_dir = os.path.join(root, 'work')
+        os.makedirs(self.work_dir, exist_ok=True)
+
+    def _path(self, name):
+        return os.path.join(self.root, name)
+
+    def pdf(self, name, pages=20):
+        path = self._path(f'{name}.pdf')
+        if not os.path.exists(path):
+            fixtures.make_pdf(path, pages=pages, label=name)
+        return path
+
+    def image(self, name, width=4000, height=3000, fmt='JPEG'):
+        path = self._path(f'{name}.{fmt.lower()}')
+        if not os.path.exists(path):
+            fixtures.make_image(path, width, height, fmt)
+        return path
+
+    def video(self, name, seconds=10):
+        path = self._path(f'{name}.mp4')
+        if not os.path.exists(path) and fixtures.make_video(path, seconds=seconds) is None:
+            return None
+        return path
+
+    def copy(self, path):
+        """Fresh copy of a fixture for processors that delete their input"""
+        if path is None:
+            raise SkipCase('fixture unavailable (ffmpeg not installed?)')
+        dst = os.path.join(self.work_dir, f'{time.time_ns()}_{os.path.basename(path)}')
+        shutil.copyfile(path, dst)
+        return dst
+
+
+class SkipCase(Exception):
+    """Raised by a case that cannot run here"""
+
+
+# PDF
+
+@case('pdf.merge')
+def bench_pdf_merge(fx):
+    from utils.pdf_tools import PDFProcessor
+    inputs = [fx.copy(fx.pdf(f'merge_{i}', pages=10)) for i in range(10)]
+    return lambda: PDFProcessor.merge_pdfs(inputs), sum(os.path.getsize(p) for p in inputs)
+
+
+@case('pdf.split')
+def bench_pdf_split(fx):
+    from utils.pdf_tools import PDFProcessor
+    path = fx.copy(fx.pdf('document', pages=50))
+    return lambda: PDFProcessor.split_pdf(path, 5), os.path.getsize(path)
+
+
+@case('pdf.compress')
+def bench_pdf_compress(fx):
+    from utils.pdf_tools import PDFProcessor
+    path = fx.copy(fx.pdf('document', pages=50))
+    return lambda: PDFProcessor.compress_pdf(path), os.path.getsize(path)
+
+
+@case('pdf.watermark')
+def bench_pdf_watermark(fx):
+    from utils.pdf_tools import PDFProcessor
+    path = fx.copy(fx.pdf('document', pages=50))
+    return lambda: PDFProcessor.add_watermark(path, 'CONFIDENTIAL'), os.path.getsize(path)
+
+
+# Images
+
+@case('image.compress')
+def bench_image_compress(fx):
+    from utils.image_tools import ImageProcessor
+    path = fx.copy(fx.image('photo'))
+    return lambda: ImageProcessor.compress_image(path, 75), os.path.getsize(path)
+
+
+@case('image.resize')
+def bench_image_resize(fx):
+    from utils.image_tools import ImageProcessor
+    path = fx.copy(fx.image('photo'))
+    return lambda: ImageProcessor.resize_image(path, 1200, 900), os.path.getsize(path)
+
+
+@case('image.convert')
+def bench_image_convert(fx):
+    from utils.image_tools import ImageProcessor
+    path = fx.copy(fx.image('graphic', 2000, 1500, 'PNG'))
+    return lambda: ImageProcessor.convert_image(path, 'JPEG'), os.path.getsize(path)
+
+
+@case('image.crop')
+def bench_image_crop(fx):
+    from utils.image_tools import ImageProcessor
+    path = fx.copy(fx.image('photo'))
+    return lambda: ImageProcessor.crop_image(path, 500, 500, 3500, 2500), os.path.getsize(path)
+
+
+@case('image.enhance')
+def bench_image_enhance(fx):
+    from utils.image_tools import ImageProcessor
+    path = fx.copy(fx.image('photo'))
+    return lambda: ImageProcessor.enhance_image(path, 1.1, 1.2, 1.1, 1.5), os.path.getsize(path)
+
+
+# Video
+
+@case('video.extract_audio')
+def bench_video_extract_audio(fx):
+    from utils.video_tools import VideoProcessor
+    path = fx.copy(fx.video('clip'))
+    return lambda: VideoProcessor.extract_audio(path), os.path.getsize(path)
+
+
+@case('video.trim')
+def bench_video_trim(fx):
+    from utils.video_tools import VideoProcessor
+    path = fx.copy(fx.video('clip'))
+    return lambda: VideoProcessor.trim_video(path, 2, 5), os.path.getsize(path)
+
+
+@case('video.compress')
+def bench_video_compress(fx):
+    from utils.video_tools import VideoProcessor
+    path = fx.copy(fx.video('clip'))
+    return lambda: VideoProcessor.compress_video(path, 28), os.path.getsize(path)
+
+
+@case('video.remove_audio')
+def bench_video_remove_audio(fx):
+    from utils.video_tools import VideoProcessor
+    path = fx.copy(fx.video('clip'))
+    return lambda: VideoProcessor.remove_audio(path), os.path.getsize(path)
+
+
+# Utility
+
+@case('utility.qr_code', number=20)
+def bench_utility_qr(fx):
+    from utils.utility_utils import UtilityProcessor
+    return lambda: UtilityProcessor.generate_qr_code('https://toolora.ai/tools/pdf-merge'), 0
+
+
+@case('utility.password', number=1000)
+def bench_utility_password(fx):
+    from utils.utility_utils import UtilityProcessor
+    return lambda: UtilityProcessor.generate_password(32), 0
+
+
+@case('utility.text_case', number=1000)
+def bench_utility_text_case(fx):
+    from utils.utility_utils import UtilityProcessor
+    text = 'The quick brown fox jumps over the lazy dog. ' * 200
+    return lambda: UtilityProcessor.convert_text_case(text, 'title'), len(text)
+
+
+# AI
+
+@case('ai.resume', number=5)
+def bench_ai_resume(fx):
+    from utils.ai_tools import AIProcessor
+    return lambda: AIProcessor.generate_resume('Jordan Lee', '8 years of backend engineering', 'Python, SQL'), 0
+
+
+@case('ai.business_names', number=1000)
+def bench_ai_business_names(fx):
+    from utils.ai_tools import AIProcessor
+    return lambda: AIProcessor.generate_business_names('technology', 'cloud data'), 0
+
+
+# OG images
+
+@case('og.generate', number=5)
+def bench_og_generate(fx):
+    import io
+    from utils.og_generator import generate_og_image
+
+    def render():
+        img = generate_og_image('PDF Merge', 'Professional pdf tool - Free online', 'pdf')
+        img.save(io.BytesIO(), 'PNG', optimize=True)
+        return img
+    return render, 0
+
+
+# Runner
+
+def reset_peak_rss():
+    """Reset VmHWM so the peak covers only what follows (Linux 4.0+)"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except OSError:
+        pass
+
+
+def run_case(name, fixtures_root, repeat):
+    """Run one case in this process and return its measurements"""
+    from utils.pdf_merge import peak_rss_kb
+
+    prepare, number = CASES[name]
+    fx = Fixtures(fixtures_root)
+    timings, input_bytes, peak_kb = [], 0, 0
+    for _ in range(repeat):
+        func, input_bytes = prepare(fx)
+        reset_peak_rss()
+        start = time.perf_counter()
+        for _ in range(number):
+            result = func()
+        elapsed = time.perf_counter() - start
+        peak_kb = max(peak_kb, peak_rss_kb())
+        if result is None or result is False:
+            raise RuntimeError('processor returned no result')
+        timings.append(elapsed / number)
+
+    seconds = statistics.median(timings)
+    measurement = {
+        'seconds': round(seconds, 6),
+        'min_seconds': round(min(timings), 6),
+        'ops_per_sec': round(1 / seconds, 2) if seconds else None,
+        'peak_rss_mb': round(peak_kb / 1024, 1)
+    }
+    if input_bytes:
+        measurement['mb_per_sec'] = round(input_bytes / 1024 / 1024 / seconds, 2) if seconds else None
+    return measurement
+
+
+def _child_env(tmp):
+    """Isolate processors from the app's state and disable caching"""
+    return fixtures.isolated_env(tmp)
+
+
+def run_suite(names, repeat):
+    """Run each case in a fresh interpreter and return {name: measurement}"""
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        fixtures_root = os.path.join(tmp, 'fixtures')
+        fx = Fixtures(fixtures_root)
+        env = _child_env(tmp)
+        for name in names:
+            # Build fixtures here so their generation does not count toward the case's memory
+            try:
+                CASES[name][0](fx)
+            except SkipCase as e:
+                results[name] = {'skipped': str(e)}
+                print(f'{name:<24} skipped: {e}')
+                continue
+            except Exception:
+                pass  # The child reports the real error
+
+            out = subprocess.run(
+                [sys.executable, '-m', 'benchmarks.suite', '--run-case', name,
+                 '--fixtures', fixtures_root, '--repeat', str(repeat)],
+                capture_output=True, text=True, env=env
+            )
+            lines = out.stdout.strip().splitlines()
+            if out.returncode != 0 or not lines:
+                error = (out.stderr.strip().splitlines() or ['failed'])[-1]
+                results[name] = {'error': error}
+                print(f'{name:<24} error: {error}')
+                continue
+
+            results[name] = json.loads(lines[-1])
+            m = results[name]
+            throughput = f" {m['mb_per_sec']:>8.2f}MB/s" if m.get('mb_per_sec') else ''
+            print(f"{name:<24} {m['seconds'] * 1000:>10.2f}ms {m['ops_per_sec']:>10.2f}op/s "
+                  f"peak_rss={m['peak_rss_mb']:>7.1f}MB{throughput}")
+    return results
+
+
+def compare(results, baseline, threshold, memory_threshold, min_delta):
+    """Return a list of regression messages against the baseline"""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get('cases', {}).get(name)
+        if not previous or 'min_seconds' not in previous:
+            continue
+        if 'min_seconds' not in current:
+            if 'error' in current:
+                regressions.append(f"{name}: now fails ({current['error']})")
+            continue
+
+        # Best-of-N timings are far less noisy than medians on shared machines
+        before, after = previous['min_seconds'], current['min_seconds']
+        if after - before > min_delta and after > before * (1 + threshold):
+            regressions.append(f"{name}: {before * 1000:.2f}ms -> {after * 1000:.2f}ms "
+                               f"(+{(after - before) / before:.0%})")
+        if current['peak_rss_mb'] > previous['peak_rss_mb'] * (1 + memory_threshold) + 5:
+            regressions.append(f"{name}: peak RSS {previous['peak_rss_mb']}MB -> {current['peak_rss_mb']}MB")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--only', help='comma-separated case name prefixes')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--threshold', type=float, default=0.5, help='allowed slowdown (0.5 = 50%%)')
+    parser.add_argument('--memory-threshold', type=float, default=0.25, help='allowed peak RSS growth')
+    parser.add_argument('--min-delta', type=float, default=0.002, help='ignore slowdowns under this many seconds')
+    parser.add_argument('--output', help='also write this run as JSON to a file')
+    parser.add_argument('--run-case', help=argparse.SUPPRESS)
+    parser.add_argument('--fixtures', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_case:
+        print(json.dumps(run_case(args.run_case, args.fixtures, args.repeat)))
+        return 0
+
+    names = list(CASES)
+    if args.only:
+        prefixes = tuple(args.only.split(','))
+        names = [name for name in names if name.startswith(prefixes)]
+
+    results = run_suite(names, args.repeat)
+    run = {
+        'machine': {'python': platform.python_version(), 'platform': platform.platform(),
+                    'cpus': os.cpu_count()},
+        'cases': results
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(run, f, indent=2, sort_keys=True)
+
+    if args.save_baseline:
+        baseline = {'machine': run['machine'], 'cases': {}}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline['cases'] = json.load(f).get('cases', {})
+        baseline['cases'].update({name: m for name, m in results.items() if 'seconds' in m})
+        with open(args.baseline, 'w') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f'Baseline written to {args.baseline}')
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f'No baseline at {args.baseline}; run with --save-baseline first')
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+
+    regressions = compare(results, baseline, args.threshold, args.memory_threshold, args.min_delta)
+    for message in regressions:
+        print(f'REGRESSION {message}')
+    if not regressions:
+        print('No regressions against baseline')
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -111,6 +111,119 @@ class Config:
         print("🚀 Using Fresh Suntyn AI Local Database")
 
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # SQLite settings applied on connect (utils/database.py)
+    SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 15000))
+    SQLITE_SYNCHRONOUS = os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL')
+    SQLITE_CACHE_SIZE_KB = int(os.environ.get('SQLITE_CACHE_SIZE_KB', 32 * 1024))
+    SQLITE_MMAP_SIZE = int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))
+
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'suntyn-ai-secret-key-2024'
     UPLOAD_FOLDER = 'uploads'
-    MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
\ No newline at end of file
+    MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
+
+    # Background job queue (utils/job_queue.py): JOB_WORKERS caps running jobs across all
+    # processes sharing JOB_DB_PATH, however many web workers dispatch
+    JOB_QUEUE_ENABLED = os.environ.get('JOB_QUEUE_ENABLED', 'true').lower() == 'true'
+    JOB_DB_PATH = os.environ.get('JOB_DB_PATH', os.path.join(basedir, 'instance', 'jobs.db'))
+    JOB_WORKERS = int(os.environ.get('JOB_WORKERS', os.cpu_count() or 2))
+    JOB_MAX_PENDING = int(os.environ.get('JOB_MAX_PENDING', 200))
+    JOB_TIMEOUT = int(os.environ.get('JOB_TIMEOUT', 15 * 60))
+    JOB_DISPATCH_IN_WEB = os.environ.get('JOB_DISPATCH_IN_WEB', 'true').lower() == 'true'
+    # /api/v2/jobs/<id>/events: seconds a request may wait for a status change (keep 0 with sync
+    # gunicorn workers) and the EventSource reconnect delay
+    JOB_EVENTS_WAIT = float(os.environ.get('JOB_EVENTS_WAIT', 0))
+    JOB_EVENTS_RETRY_MS = int(os.environ.get('JOB_EVENTS_RETRY_MS', 1000))
+
+    # FFmpeg scheduler (utils/video_tools.py)
+    FFMPEG_SLOTS = int(os.environ.get('FFMPEG_SLOTS', max(1, (os.cpu_count() or 2) // 2)))
+    FFMPEG_THREADS_PER_SLOT = int(os.environ.get('FFMPEG_THREADS_PER_SLOT', 0)) or max(1, (os.cpu_count() or 2) // FFMPEG_SLOTS)
+    FFMPEG_STATE_DIR = os.environ.get('FFMPEG_STATE_DIR', os.path.join(basedir, 'instance', 'ffmpeg'))
+    FFMPEG_TIMEOUT = int(os.environ.get('FFMPEG_TIMEOUT', 10 * 60))
+
+    # Processor result cache (utils/result_cache.py)
+    RESULT_CACHE_ENABLED = os.environ.get('RESULT_CACHE_ENABLED', 'true').lower() == 'true'
+    RESULT_CACHE_DIR = os.environ.get('RESULT_CACHE_DIR', os.path.join(basedir, 'instance', 'result_cache'))
+    RESULT_CACHE_MAX_BYTES = int(os.environ.get('RESULT_CACHE_MAX_BYTES', 1024 * 1024 * 1024))
+
+    # Chunked uploads (utils/chunked_upload.py); MAX_CONTENT_LENGTH caps each chunk request
+    CHUNKED_UPLOAD_DIR = os.environ.get('CHUNKED_UPLOAD_DIR', os.path.join(basedir, 'instance', 'chunked_uploads'))
+    CHUNKED_UPLOAD_CHUNK_SIZE = int(os.environ.get('CHUNKED_UPLOAD_CHUNK_SIZE', 8 * 1024 * 1024))
+    CHUNKED_UPLOAD_MAX_BYTES = int(os.environ.get('CHUNKED_UPLOAD_MAX_BYTES', 2 * 1024 * 1024 * 1024))
+    CHUNKED_UPLOAD_TTL = int(os.environ.get('CHUNKED_UPLOAD_TTL', 24 * 60 * 60))
+
+    # Upload storage (utils/storage.py)
+    STORAGE_ROOT = os.environ.get('STORAGE_ROOT', 'uploads')
+    STORAGE_DB_PATH = os.environ.get('STORAGE_DB_PATH', os.path.join(basedir, 'instance', 'storage.db'))
+    STORAGE_TTL = int(os.environ.get('STORAGE_TTL', 24 * 60 * 60))
+    STORAGE_SWEEP_INTERVAL = int(os.environ.get('STORAGE_SWEEP_INTERVAL', 300))
+    STORAGE_SWEEP_BATCH = int(os.environ.get('STORAGE_SWEEP_BATCH', 500))
+    STORAGE_SWEEPER_ENABLED = os.environ.get('STORAGE_SWEEPER_ENABLED', 'true').lower() == 'true'
+
+    # Downloads (utils/downloads.py): '' serves directly, or 'x-sendfile' / 'x-accel-redirect' for a fronting proxy
+    DOWNLOAD_OFFLOAD = os.environ.get('DOWNLOAD_OFFLOAD', '').lower()
+    DOWNLOAD_ACCEL_PREFIX = os.environ.get('DOWNLOAD_ACCEL_PREFIX', '/protected-uploads/')
+    DOWNLOAD_MAX_AGE = int(os.environ.get('DOWNLOAD_MAX_AGE', 60 * 60))
+
+    # Metrics (utils/metrics.py), exposed at /metrics
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'true').lower() == 'true'
+    METRICS_DB_PATH = os.environ.get('METRICS_DB_PATH', os.path.join(basedir, 'instance', 'metrics.db'))
+    METRICS_FLUSH_INTERVAL = float(os.environ.get('METRICS_FLUSH_INTERVAL', 2))
+
+    # Tool catalog (utils/tool_catalog.py): in-memory tool list, reloaded when the version file changes
+    CATALOG_VERSION_PATH = os.environ.get('CATALOG_VERSION_PATH', os.path.join(basedir, 'instance', 'catalog.version'))
+    CATALOG_CHECK_INTERVAL = float(os.environ.get('CATALOG_CHECK_INTERVAL', 1))
+
+    # Tool search (utils/search_index.py): seconds between popularity reloads from tool_history,
+    # and ranked results kept per index
+    SEARCH_POPULARITY_TTL = int(os.environ.get('SEARCH_POPULARITY_TTL', 300))
+    SEARCH_CACHE_SIZE = int(os.environ.get('SEARCH_CACHE_SIZE', 2048))
+
+    # Usage tracking (utils/tracking.py): /api/dashboard/track events buffered and inserted in batches
+    TRACKING_BUFFER_ENABLED = os.environ.get('TRACKING_BUFFER_ENABLED', 'true').lower() == 'true'
+    TRACKING_BUFFER_SIZE = int(os.environ.get('TRACKING_BUFFER_SIZE', 10000))
+    TRACKING_BATCH_SIZE = int(os.environ.get('TRACKING_BATCH_SIZE', 200))
+    TRACKING_FLUSH_INTERVAL = float(os.environ.get('TRACKING_FLUSH_INTERVAL', 2))
+
+    # Popularity counters (utils/popularity.py): seconds a popular-tools list is served from memory
+    POPULARITY_CACHE_TTL = int(os.environ.get('POPULARITY_CACHE_TTL', 30))
+
+    # Lazy imports (utils/lazy_imports.py): import the processing libraries once in the
+    # gunicorn master so forked workers share them (gunicorn.conf.py)
+    PRELOAD_HEAVY_MODULES = os.environ.get('PRELOAD_HEAVY_MODULES', 'false').lower() == 'true'
+
+    # App factory (app.py): blueprints and services per process ('full', 'web', 'api', 'worker',
+    # 'script'), and whether create_app() creates missing tables and indexes itself
+    APP_PROFILE = os.environ.get('APP_PROFILE', 'full')
+    SCHEMA_AUTO_CREATE = os.environ.get('SCHEMA_AUTO_CREATE', 'true').lower() == 'true'
+
+    # Page cache (utils/page_cache.py): rendered static and tool pages kept per worker, and shared
+    # between workers through PAGE_CACHE_DIR when set; browsers revalidate after the client max age
+    PAGE_CACHE_ENABLED = os.environ.get('PAGE_CACHE_ENABLED', 'true').lower() == 'true'
+    PAGE_CACHE_MAX_ENTRIES = int(os.environ.get('PAGE_CACHE_MAX_ENTRIES', 512))
+    PAGE_CACHE_DIR = os.environ.get('PAGE_CACHE_DIR', '')
+    PAGE_CACHE_CLIENT_MAX_AGE = int(os.environ.get('PAGE_CACHE_CLIENT_MAX_AGE', 300))
+
+    # Sitemap (utils/sitemap.py): rebuilt per catalog version, split into an index with child
+    # sitemaps of at most SITEMAP_MAX_URLS URLs once the site outgrows one file
+    SITE_URL = os.environ.get('SITE_URL', 'https://suntyn-ai.replit.app')
+    SITEMAP_MAX_URLS = int(os.environ.get('SITEMAP_MAX_URLS', 1000))
+    SITEMAP_MAX_AGE = int(os.environ.get('SITEMAP_MAX_AGE', 3600))
+
+    # Static assets (utils/assets.py): bundles built by `python -m utils.assets` at deploy; with
+    # ASSET_AUTO_BUILD on, a process that finds no manifest builds them on first use
+    ASSET_DIST_DIR = os.environ.get('ASSET_DIST_DIR', os.path.join(basedir, 'static', 'dist'))
+    ASSET_AUTO_BUILD = os.environ.get('ASSET_AUTO_BUILD', 'true').lower() == 'true'
+
+    # Static files (utils/static_files.py): serve the .br/.gz siblings written by the asset build
+    # to clients that accept them
+    STATIC_PRECOMPRESSED = os.environ.get('STATIC_PRECOMPRESSED', 'true').lower() == 'true'
+
+    # Response compression (utils/compression.py): text responses of these blueprints from
+    # COMPRESSION_MIN_SIZE bytes up ('name:bytes' sets a blueprint's own minimum). auth is left
+    # out so session secrets are never compressed next to request-controlled input (BREACH)
+    COMPRESSION_ENABLED = os.environ.get('COMPRESSION_ENABLED', 'true').lower() == 'true'
+    COMPRESSION_BLUEPRINTS = os.environ.get('COMPRESSION_BLUEPRINTS', 'main,tools,api,enhanced_api')
+    COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', 1024))
+    COMPRESSION_GZIP_LEVEL = int(os.environ.get('COMPRESSION_GZIP_LEVEL', 6))
+    COMPRESSION_BROTLI_QUALITY = int(os.environ.get('COMPRESSION_BROTLI_QUALITY', 4))
@@ -0,0 +1,38 @@
+"""
+Gunicorn settings for Toolora AI
+Read automatically by `gunicorn main:app` from the project directory
+"""
+
+import os
+
+
+def on_starting(server):
+    """Bring the schema and static bundles up to date once, optionally preload processing libraries
+
+    Runs in the master before any worker is forked. Workers inherit
+    SCHEMA_AUTO_CREATE off, so they start without touching the database,
+    and find the asset manifest already written.
+    With PRELOAD_HEAVY_MODULES set, workers find PyPDF2, Pillow, reportlab
+    and the rest already in sys.modules and share them copy-on-write; the
+    app itself is still loaded per worker.
+    """
+    from config import Config
+
+    if Config.SCHEMA_AUTO_CREATE:
+        from app import create_app
+        from utils.schema import ensure_schema
+        created = ensure_schema(create_app({'SCHEMA_AUTO_CREATE': False}, profile='script'))
+        server.log.info(f"Schema up to date ({len(created)} index(es) created)")
+        Config.SCHEMA_AUTO_CREATE = False
+        os.environ['SCHEMA_AUTO_CREATE'] = 'false'
+
+    if Config.ASSET_AUTO_BUILD:
+        from utils.assets import build_assets
+        sizes = build_assets()
+        server.log.info(f"Static assets built: {len(sizes)} bundles")
+
+    if Config.PRELOAD_HEAVY_MODULES:
+        from utils.lazy_imports import preload
+        timings = preload()
+        server.log.info(f"Preloaded {len(timings)} processing modules in "
+                        f"{sum(timings.values()) * 1000:.0f}ms")
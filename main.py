@@ -1,9 +1,4 @@
-from app import app  # noqa: F401
+from app import create_app
 
-# Register enhanced API
-try:
-    from routes.enhanced_tool_api import enhanced_api_bp
-    app.register_blueprint(enhanced_api_bp)
-    print("✅ Enhanced API v2 registered successfully")
-except Exception as e:
-    print(f"⚠️ Enhanced API registration failed: {e}")
\ No newline at end of file
+# Served app: `gunicorn main:app`; APP_PROFILE picks web-only, api-only or the full site
+app = create_app()
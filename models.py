@@ -49,6 +49,13 @@ class User(UserMixin, db.Model):
 
 class ToolHistory(db.Model):
     __tablename__ = 'tool_history'
+    __table_args__ = (
+        # Dashboard: per-user counts, sums and recent activity
+        db.Index('ix_tool_history_user_used_at', 'user_id', 'used_at'),
+        # Popularity rebuild: GROUP BY tool and the recent-hours window
+        db.Index('ix_tool_history_tool', 'tool_name', 'tool_category'),
+        db.Index('ix_tool_history_used_at', 'used_at', 'tool_name', 'tool_category'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
@@ -65,8 +72,40 @@ class ToolHistory(db.Model):
         return f'<ToolHistory {self.tool_name}>'
 
 
+class ToolUsageTotal(db.Model):
+    """All-time use count per tool, maintained as tool_history rows are written"""
+    __tablename__ = 'tool_usage_totals'
+
+    tool_name = db.Column(db.String(100), primary_key=True)
+    tool_category = db.Column(db.String(50), primary_key=True)
+    usage_count = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<ToolUsageTotal {self.tool_name} {self.usage_count}>'
+
+
+class ToolUsageHourly(db.Model):
+    """Use count per tool and hour, kept for the 24h and 7d popularity windows"""
+    __tablename__ = 'tool_usage_hourly'
+    __table_args__ = (
+        db.Index('ix_tool_usage_hourly_hour', 'hour', 'tool_name', 'tool_category', 'usage_count'),
+    )
+
+    tool_name = db.Column(db.String(100), primary_key=True)
+    tool_category = db.Column(db.String(50), primary_key=True)
+    hour = db.Column(db.DateTime, primary_key=True)
+    usage_count = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<ToolUsageHourly {self.tool_name} {self.hour}>'
+
+
 class SavedFile(db.Model):
     __tablename__ = 'saved_files'
+    __table_args__ = (
+        db.Index('ix_saved_files_user_created_at', 'user_id', 'created_at'),
+        db.Index('ix_saved_files_expires_at', 'expires_at'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
@@ -106,6 +145,9 @@ class ToolCategory(db.Model):
 
 class Tool(db.Model):
     __tablename__ = 'tools'
+    __table_args__ = (
+        db.Index('ix_tools_active_category', 'is_active', 'category_id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False, unique=True)
@@ -127,6 +169,11 @@ class Tool(db.Model):
 
 class UserAnalytics(db.Model):
     __tablename__ = 'user_analytics'
+    __table_args__ = (
+        db.Index('ix_user_analytics_session_timestamp', 'session_id', 'timestamp'),
+        db.Index('ix_user_analytics_user_timestamp', 'user_id', 'timestamp'),
+        db.Index('ix_user_analytics_timestamp', 'timestamp'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
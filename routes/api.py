@@ -5,28 +5,23 @@ Provides unique API endpoints for each tool with specific functionality
 
 from flask import Blueprint, request, jsonify, send_file
 from werkzeug.utils import secure_filename
+import io
 import os
 import uuid
 import tempfile
 from datetime import datetime
 import logging
 
-# Tool-specific imports
-try:
-    from PyPDF2 import PdfMerger, PdfReader, PdfWriter
-except ImportError:
-    print("PyPDF2 not available - PDF tools will use fallback")
+# Tool-specific libraries are imported on first use, so the boot and
+# HTML-only workers skip them; a missing one fails only its own tools
+from utils.lazy_imports import lazy_import
+from utils.pdf_split import split_parts, split_zip_response
 
-try:
-    from PIL import Image, ImageOps
-except ImportError:
-    print("PIL not available - Image tools will use fallback")
-
-try:
-    import qrcode
-    from qrcode.image.styledpil import StyledPilImage
-except ImportError:
-    print("QRCode library not available - using fallback QR generation")
+PyPDF2 = lazy_import('PyPDF2')
+Image = lazy_import('PIL.Image')
+ImageOps = lazy_import('PIL.ImageOps')
+qrcode = lazy_import('qrcode')
+merge_engine = lazy_import('utils.pdf_merge')
 
 api_bp = Blueprint('api', __name__, url_prefix='/api')
 
@@ -62,22 +57,19 @@ def pdf_merge():
         
         # Create temporary directory for processing
         with tempfile.TemporaryDirectory() as temp_dir:
-            merger = PdfMerger()
+            input_paths = []
             
             # Process files in order
             for i, file in enumerate(files):
                 temp_path = os.path.join(temp_dir, f"input_{i}.pdf")
                 file.save(temp_path)
-                merger.append(temp_path)
+                input_paths.append(temp_path)
             
             # Create output file
             output_filename = create_temp_filename("merged_document.pdf")
             output_path = os.path.join(temp_dir, output_filename)
             
-            with open(output_path, 'wb') as output_file:
-                merger.write(output_file)
-            
-            merger.close()
+            merge_engine.merge_pdf_files(input_paths, output_path)
             
             # Send file and cleanup will happen automatically
             return send_file(output_path, 
@@ -91,47 +83,27 @@ def pdf_merge():
 
 @api_bp.route('/tools/pdf-split', methods=['POST'])
 def pdf_split():
-    """Split PDF into individual pages"""
+    """Split PDF into pages or page ranges, streamed back as a ZIP archive"""
     try:
         file = request.files.get('file')
+        page_range = request.form.get('page_range', request.form.get('page_ranges', ''))
         
         if not file or not allowed_file(file.filename, ['pdf']):
             return jsonify({'error': 'Please upload a valid PDF file'}), 400
         
-        with tempfile.TemporaryDirectory() as temp_dir:
-            # Save uploaded file
-            input_path = os.path.join(temp_dir, 'input.pdf')
-            file.save(input_path)
-            
-            # Read PDF and split
-            reader = PdfReader(input_path)
-            
-            split_files = []
-            for i, page in enumerate(reader.pages):
-                writer = PdfWriter()
-                writer.add_page(page)
-                
-                page_filename = f"page_{i+1}.pdf"
-                page_path = os.path.join(temp_dir, page_filename)
-                
-                with open(page_path, 'wb') as output_file:
-                    writer.write(output_file)
-                
-                split_files.append({
-                    'filename': page_filename,
-                    'path': page_path,
-                    'page_number': i + 1
-                })
-            
-            # For now, return the first page as example
-            # In production, you'd create a ZIP file with all pages
-            if split_files:
-                return send_file(split_files[0]['path'], 
-                               as_attachment=True, 
-                               download_name=split_files[0]['filename'],
-                               mimetype='application/pdf')
-            else:
-                return jsonify({'error': 'No pages found in PDF'}), 400
+        # Read PDF from the upload in memory; the request stream closes before the response is sent
+        reader = PyPDF2.PdfReader(io.BytesIO(file.read()))
+        
+        try:
+            parts = split_parts(len(reader.pages), page_range)
+        except ValueError:
+            return jsonify({'error': 'Invalid page range'}), 400
+        
+        if not parts:
+            return jsonify({'error': 'No pages found in PDF'}), 400
+        
+        # Each part is zipped and sent as soon as it is written
+        return split_zip_response(reader, parts, 'split_pages.zip')
     
     except Exception as e:
         logger.error(f"PDF split error: {str(e)}")
@@ -1,6 +1,9 @@
 
-from flask import Blueprint, request, jsonify, send_file
+from flask import Blueprint, request, jsonify, Response
+import io
 import os
+import json
+import time
 import uuid
 from werkzeug.utils import secure_filename
 import tempfile
@@ -8,9 +11,20 @@ import logging
 
 # Import tool utilities
 from utils.pdf_tools import PDFProcessor
+from utils.pdf_split import split_parts, split_zip_response
 from utils.image_tools import ImageProcessor
-from utils.video_tools import VideoProcessor
+from utils.video_tools import VideoProcessor, ffmpeg_scheduler
 from utils.ai_tools import AIProcessor
+from utils.result_cache import result_cache
+from utils.chunked_upload import upload_store, UploadError
+from utils.storage import storage
+from utils.downloads import send_download
+from utils.metrics import metrics
+from utils.tracking import usage_tracker
+from utils.page_cache import page_cache
+from utils.compression import compression
+from utils.job_queue import job_queue, JobError, QueueFullError
+from config import Config
 
 enhanced_api_bp = Blueprint('enhanced_api', __name__, url_prefix='/api/v2')
 
@@ -43,23 +57,154 @@ def save_uploaded_file(file, prefix='uploaded'):
     
     filename = secure_filename(file.filename)
     unique_filename = f"{prefix}_{uuid.uuid4()}_{filename}"
-    file_path = os.path.join(UPLOAD_FOLDER, unique_filename)
+    file_path = storage.output_path(unique_filename)
     
-    os.makedirs(UPLOAD_FOLDER, exist_ok=True)
     file.save(file_path)
     return file_path
 
+def claim_chunked_uploads(file_type, prefix='uploaded'):
+    """Claim completed chunked uploads referenced by upload_id form fields
+
+    Returns (saved path, original filename) pairs. Raises UploadError for
+    unknown or incomplete uploads and disallowed file types.
+    """
+    uploads = []
+    for upload_id in request.form.getlist('upload_id'):
+        status = upload_store.status(upload_id)
+        if not allowed_file(status['filename'], file_type):
+            raise UploadError(f"Invalid file type: {status['filename']}")
+        uploads.append(upload_store.claim(upload_id, prefix))
+    return uploads
+
+def upload_error_response(error):
+    return jsonify({'error': str(error), **error.details}), error.status
+
+def file_result(output_path, message):
+    """Build the response payload for a single processed file"""
+    return {
+        'success': True,
+        'download_url': f'/api/v2/download/{os.path.basename(output_path)}',
+        'filename': os.path.basename(output_path),
+        'message': message
+    }
+
+def files_result(output_paths, message):
+    """Build the response payload for several processed files"""
+    return {
+        'success': True,
+        'files': [{
+            'filename': os.path.basename(path),
+            'download_url': f'/api/v2/download/{os.path.basename(path)}'
+        } for path in output_paths],
+        'message': message
+    }
+
+def dispatch_job(task, *args, tool):
+    """Queue a processing task and return a 202 with its job id
+
+    Falls back to running the task inline when JOB_QUEUE_ENABLED is off.
+    """
+    if not Config.JOB_QUEUE_ENABLED:
+        start = time.time()
+        try:
+            result = task(*args)
+        except JobError as e:
+            return jsonify({'error': str(e)}), 500
+        usage_tracker.record_run(tool, time.time() - start, ip_address=request.remote_addr,
+                                 user_agent=request.headers.get('User-Agent', ''))
+        return jsonify(result)
+
+    try:
+        job_id = job_queue.submit(task, *args, tool=tool)
+    except QueueFullError:
+        return jsonify({'error': 'Server is busy, please try again shortly'}), 503
+
+    return jsonify({
+        'success': True,
+        'job_id': job_id,
+        'status': 'queued',
+        'status_url': f'/api/v2/jobs/{job_id}',
+        'events_url': f'/api/v2/jobs/{job_id}/events'
+    }), 202
+
+def stream_split_response(data, filename, page_ranges=''):
+    """Return a streamed ZIP of the split parts of an uploaded PDF"""
+    from PyPDF2 import PdfReader
+
+    reader = PdfReader(io.BytesIO(data))
+    base_name = os.path.splitext(secure_filename(filename))[0] or 'document'
+    try:
+        parts = split_parts(len(reader.pages), page_ranges, base_name=base_name)
+    except ValueError:
+        return jsonify({'error': 'Invalid page range'}), 400
+    if not parts:
+        return jsonify({'error': 'No pages selected'}), 400
+
+    return split_zip_response(reader, parts, f'{base_name}_split.zip')
+
+# Background tasks - executed by the job queue worker pool
+
+def run_pdf_merge(file_paths):
+    output_path = PDFProcessor.merge_pdfs(file_paths)
+    if not output_path:
+        raise JobError('PDF merge failed')
+    return file_result(output_path, 'PDFs merged successfully')
+
+def run_pdf_split(file_path, page_ranges):
+    output_files = PDFProcessor.split_pdf(file_path, page_ranges=page_ranges)
+    if not output_files:
+        raise JobError('PDF split failed')
+    return files_result(output_files, 'PDF split successfully')
+
+def run_pdf_compress(file_path, quality):
+    output_path = PDFProcessor.compress_pdf(file_path, quality)
+    if not output_path:
+        raise JobError('PDF compression failed')
+    return file_result(output_path, 'PDF compressed successfully')
+
+def run_image_compress(file_paths, quality):
+    output_paths = [path for path in (ImageProcessor.compress_image(p, quality) for p in file_paths) if path]
+    if not output_paths:
+        raise JobError('Image compression failed')
+    return files_result(output_paths, 'Images compressed successfully')
+
+def run_image_resize(file_paths, width, height, maintain_aspect):
+    output_paths = [path for path in (ImageProcessor.resize_image(p, width, height, maintain_aspect)
+                                      for p in file_paths) if path]
+    if not output_paths:
+        raise JobError('Image resize failed')
+    return files_result(output_paths, 'Images resized successfully')
+
+def run_video_extract_audio(file_path, quality):
+    output_path = VideoProcessor.extract_audio(file_path, quality)
+    if not output_path:
+        raise JobError('Audio extraction failed')
+    return file_result(output_path, 'Audio extracted successfully')
+
+def run_generate_resume(name, email, phone, experience, skills, education, template):
+    output_path = AIProcessor.generate_resume(name, email, phone, experience, skills, education, template)
+    if not output_path:
+        raise JobError('Resume generation failed')
+    return file_result(output_path, 'Resume generated successfully')
+
+def run_generate_qr(content, qr_type, size):
+    from utils.utility_utils import UtilityProcessor
+    output_path = UtilityProcessor.generate_qr_code(content, qr_type, size)
+    if not output_path:
+        raise JobError('QR code generation failed')
+    return file_result(output_path, 'QR code generated successfully')
+
 # PDF Tool APIs
 @enhanced_api_bp.route('/pdf/merge', methods=['POST'])
 def pdf_merge():
     """Merge multiple PDF files"""
     try:
         files = request.files.getlist('files')
-        if len(files) < 2:
+        if len(files) + len(request.form.getlist('upload_id')) < 2:
             return jsonify({'error': 'At least 2 PDF files required'}), 400
         
         # Save uploaded files
-        file_paths = []
+        file_paths = [path for path, _ in claim_chunked_uploads('pdf', 'pdf')]
         for file in files:
             if not allowed_file(file.filename, 'pdf'):
                 return jsonify({'error': f'Invalid file type: {file.filename}'}), 400
@@ -68,19 +213,10 @@ def pdf_merge():
             if file_path:
                 file_paths.append(file_path)
         
-        # Process PDFs
-        output_path = PDFProcessor.merge_pdfs(file_paths)
-        
-        if output_path:
-            return jsonify({
-                'success': True,
-                'download_url': f'/api/v2/download/{os.path.basename(output_path)}',
-                'filename': os.path.basename(output_path),
-                'message': 'PDFs merged successfully'
-            })
-        else:
-            return jsonify({'error': 'PDF merge failed'}), 500
+        return dispatch_job(run_pdf_merge, file_paths, tool='pdf-merge')
             
+    except UploadError as e:
+        return upload_error_response(e)
     except Exception as e:
         logger.error(f"PDF merge error: {e}")
         return jsonify({'error': str(e)}), 500
@@ -90,32 +226,29 @@ def pdf_split():
     """Split PDF file"""
     try:
         file = request.files.get('file')
-        if not file or not allowed_file(file.filename, 'pdf'):
+        uploads = claim_chunked_uploads('pdf', 'pdf')
+        if not uploads and (not file or not allowed_file(file.filename, 'pdf')):
             return jsonify({'error': 'Valid PDF file required'}), 400
         
         # Get split options
         split_type = request.form.get('split_type', 'pages')
         page_ranges = request.form.get('page_ranges', '')
         
-        file_path = save_uploaded_file(file, 'pdf')
-        output_files = PDFProcessor.split_pdf(file_path, split_type, page_ranges)
+        if split_type == 'zip':
+            # Stream every part straight into a ZIP response, no files on disk
+            if not uploads:
+                return stream_split_response(file.read(), file.filename, page_ranges)
+            file_path, filename = uploads[0]
+            with open(file_path, 'rb') as f:
+                data = f.read()
+            os.remove(file_path)
+            return stream_split_response(data, filename, page_ranges)
         
-        if output_files:
-            file_links = []
-            for output_file in output_files:
-                file_links.append({
-                    'filename': os.path.basename(output_file),
-                    'download_url': f'/api/v2/download/{os.path.basename(output_file)}'
-                })
-            
-            return jsonify({
-                'success': True,
-                'files': file_links,
-                'message': 'PDF split successfully'
-            })
-        else:
-            return jsonify({'error': 'PDF split failed'}), 500
+        file_path = uploads[0][0] if uploads else save_uploaded_file(file, 'pdf')
+        return dispatch_job(run_pdf_split, file_path, page_ranges, tool='pdf-split')
             
+    except UploadError as e:
+        return upload_error_response(e)
     except Exception as e:
         logger.error(f"PDF split error: {e}")
         return jsonify({'error': str(e)}), 500
@@ -125,24 +258,17 @@ def pdf_compress():
     """Compress PDF file"""
     try:
         file = request.files.get('file')
-        if not file or not allowed_file(file.filename, 'pdf'):
+        uploads = claim_chunked_uploads('pdf', 'pdf')
+        if not uploads and (not file or not allowed_file(file.filename, 'pdf')):
             return jsonify({'error': 'Valid PDF file required'}), 400
         
         quality = request.form.get('quality', 'medium')
         
-        file_path = save_uploaded_file(file, 'pdf')
-        output_path = PDFProcessor.compress_pdf(file_path, quality)
-        
-        if output_path:
-            return jsonify({
-                'success': True,
-                'download_url': f'/api/v2/download/{os.path.basename(output_path)}',
-                'filename': os.path.basename(output_path),
-                'message': 'PDF compressed successfully'
-            })
-        else:
-            return jsonify({'error': 'PDF compression failed'}), 500
+        file_path = uploads[0][0] if uploads else save_uploaded_file(file, 'pdf')
+        return dispatch_job(run_pdf_compress, file_path, quality, tool='pdf-compress')
             
+    except UploadError as e:
+        return upload_error_response(e)
     except Exception as e:
         logger.error(f"PDF compress error: {e}")
         return jsonify({'error': str(e)}), 500
@@ -153,34 +279,21 @@ def image_compress():
     """Compress image files"""
     try:
         files = request.files.getlist('files')
-        if not files:
+        if not files and not request.form.getlist('upload_id'):
             return jsonify({'error': 'No image files provided'}), 400
         
         quality = int(request.form.get('quality', 85))
         
-        processed_files = []
-        for file in files:
-            if not allowed_file(file.filename, 'image'):
-                continue
-            
-            file_path = save_uploaded_file(file, 'image')
-            output_path = ImageProcessor.compress_image(file_path, quality)
-            
-            if output_path:
-                processed_files.append({
-                    'filename': os.path.basename(output_path),
-                    'download_url': f'/api/v2/download/{os.path.basename(output_path)}'
-                })
-        
-        if processed_files:
-            return jsonify({
-                'success': True,
-                'files': processed_files,
-                'message': 'Images compressed successfully'
-            })
-        else:
+        file_paths = [path for path, _ in claim_chunked_uploads('image', 'image')]
+        file_paths += [save_uploaded_file(file, 'image') for file in files
+                       if allowed_file(file.filename, 'image')]
+        if not file_paths:
             return jsonify({'error': 'Image compression failed'}), 500
+        
+        return dispatch_job(run_image_compress, file_paths, quality, tool='image-compress')
             
+    except UploadError as e:
+        return upload_error_response(e)
     except Exception as e:
         logger.error(f"Image compress error: {e}")
         return jsonify({'error': str(e)}), 500
@@ -190,36 +303,24 @@ def image_resize():
     """Resize image files"""
     try:
         files = request.files.getlist('files')
-        if not files:
+        if not files and not request.form.getlist('upload_id'):
             return jsonify({'error': 'No image files provided'}), 400
         
         width = int(request.form.get('width', 800))
         height = int(request.form.get('height', 600))
         maintain_aspect = request.form.get('maintain_aspect', 'true') == 'true'
         
-        processed_files = []
-        for file in files:
-            if not allowed_file(file.filename, 'image'):
-                continue
-            
-            file_path = save_uploaded_file(file, 'image')
-            output_path = ImageProcessor.resize_image(file_path, width, height, maintain_aspect)
-            
-            if output_path:
-                processed_files.append({
-                    'filename': os.path.basename(output_path),
-                    'download_url': f'/api/v2/download/{os.path.basename(output_path)}'
-                })
-        
-        if processed_files:
-            return jsonify({
-                'success': True,
-                'files': processed_files,
-                'message': 'Images resized successfully'
-            })
-        else:
+        file_paths = [path for path, _ in claim_chunked_uploads('image', 'image')]
+        file_paths += [save_uploaded_file(file, 'image') for file in files
+                       if allowed_file(file.filename, 'image')]
+        if not file_paths:
             return jsonify({'error': 'Image resize failed'}), 500
+        
+        return dispatch_job(run_image_resize, file_paths, width, height, maintain_aspect,
+                            tool='image-resize')
             
+    except UploadError as e:
+        return upload_error_response(e)
     except Exception as e:
         logger.error(f"Image resize error: {e}")
         return jsonify({'error': str(e)}), 500
@@ -230,24 +331,17 @@ def video_extract_audio():
     """Extract audio from video"""
     try:
         file = request.files.get('file')
-        if not file or not allowed_file(file.filename, 'video'):
+        uploads = claim_chunked_uploads('video', 'video')
+        if not uploads and (not file or not allowed_file(file.filename, 'video')):
             return jsonify({'error': 'Valid video file required'}), 400
         
         quality = request.form.get('quality', '192kbps')
         
-        file_path = save_uploaded_file(file, 'video')
-        output_path = VideoProcessor.extract_audio(file_path, quality)
-        
-        if output_path:
-            return jsonify({
-                'success': True,
-                'download_url': f'/api/v2/download/{os.path.basename(output_path)}',
-                'filename': os.path.basename(output_path),
-                'message': 'Audio extracted successfully'
-            })
-        else:
-            return jsonify({'error': 'Audio extraction failed'}), 500
+        file_path = uploads[0][0] if uploads else save_uploaded_file(file, 'video')
+        return dispatch_job(run_video_extract_audio, file_path, quality, tool='video-to-mp3')
             
+    except UploadError as e:
+        return upload_error_response(e)
     except Exception as e:
         logger.error(f"Video extract audio error: {e}")
         return jsonify({'error': str(e)}), 500
@@ -268,17 +362,8 @@ def ai_generate_resume():
         if not name or not experience or not skills:
             return jsonify({'error': 'Name, experience, and skills are required'}), 400
         
-        output_path = AIProcessor.generate_resume(name, email, phone, experience, skills, education, template)
-        
-        if output_path:
-            return jsonify({
-                'success': True,
-                'download_url': f'/api/v2/download/{os.path.basename(output_path)}',
-                'filename': os.path.basename(output_path),
-                'message': 'Resume generated successfully'
-            })
-        else:
-            return jsonify({'error': 'Resume generation failed'}), 500
+        return dispatch_job(run_generate_resume, name, email, phone, experience, skills, education, template,
+                            tool='resume-generator')
             
     except Exception as e:
         logger.error(f"Resume generation error: {e}")
@@ -319,31 +404,94 @@ def utility_generate_qr():
         if not content:
             return jsonify({'error': 'Content is required'}), 400
         
-        from utils.utility_utils import UtilityProcessor
-        output_path = UtilityProcessor.generate_qr_code(content, qr_type, size)
-        
-        if output_path:
-            return jsonify({
-                'success': True,
-                'download_url': f'/api/v2/download/{os.path.basename(output_path)}',
-                'filename': os.path.basename(output_path),
-                'message': 'QR code generated successfully'
-            })
-        else:
-            return jsonify({'error': 'QR code generation failed'}), 500
+        return dispatch_job(run_generate_qr, content, qr_type, size, tool='qr-generator')
             
     except Exception as e:
         logger.error(f"QR generation error: {e}")
         return jsonify({'error': str(e)}), 500
 
+# Chunked upload endpoints
+@enhanced_api_bp.route('/uploads', methods=['POST'])
+def upload_init():
+    """Start a chunked upload; body: {"filename": ..., "size": total bytes}"""
+    try:
+        data = request.get_json(silent=True) or request.form
+        status = upload_store.init(data.get('filename', ''), int(data.get('size', 0)))
+        return jsonify({'success': True, **status}), 201
+    except UploadError as e:
+        return upload_error_response(e)
+    except (TypeError, ValueError):
+        return jsonify({'error': 'Valid size is required'}), 400
+
+@enhanced_api_bp.route('/uploads/<upload_id>')
+def upload_status(upload_id):
+    """Report received bytes and the next chunk to send, for resuming"""
+    try:
+        return jsonify(upload_store.status(upload_id))
+    except UploadError as e:
+        return upload_error_response(e)
+
+@enhanced_api_bp.route('/uploads/<upload_id>/chunks/<int:index>', methods=['PUT'])
+def upload_chunk(upload_id, index):
+    """Append one chunk; raw request body, SHA-256 hex in X-Chunk-Checksum"""
+    try:
+        status = upload_store.put_chunk(upload_id, index, request.stream,
+                                        request.headers.get('X-Chunk-Checksum'))
+        return jsonify({'success': True, **status})
+    except UploadError as e:
+        return upload_error_response(e)
+
+@enhanced_api_bp.route('/uploads/<upload_id>/complete', methods=['POST'])
+def upload_complete(upload_id):
+    """Finish an upload; pass the returned upload_id to any tool endpoint"""
+    try:
+        return jsonify({'success': True, **upload_store.complete(upload_id)})
+    except UploadError as e:
+        return upload_error_response(e)
+
+# Job status endpoints
+@enhanced_api_bp.route('/jobs/<job_id>')
+def job_status(job_id):
+    """Poll the status of a background job"""
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job)
+
+@enhanced_api_bp.route('/jobs/<job_id>/events')
+def job_events(job_id):
+    """Job status as a short Server-Sent Events response that EventSource re-polls
+
+    The response never outlives the request: it waits at most
+    JOB_EVENTS_WAIT seconds for the status to move past Last-Event-ID, then
+    ends with a retry hint so the browser reconnects. Clients close the
+    EventSource once the status is finished or failed.
+    """
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+
+    last_status = request.headers.get('Last-Event-ID')
+    deadline = time.time() + Config.JOB_EVENTS_WAIT
+    while job is not None and job['status'] == last_status and time.time() < deadline:
+        time.sleep(0.5)
+        job = job_queue.get(job_id)
+
+    events = f"retry: {Config.JOB_EVENTS_RETRY_MS}\n\n"
+    if job is None:
+        events += f"event: error\ndata: {json.dumps({'error': 'Job not found'})}\n\n"
+    elif job['status'] != last_status:
+        events += f"id: {job['status']}\nevent: status\ndata: {json.dumps(job)}\n\n"
+    return Response(events, mimetype='text/event-stream', headers={'Cache-Control': 'no-cache'})
+
 # Download endpoint
 @enhanced_api_bp.route('/download/<filename>')
 def download_file(filename):
     """Download processed file"""
     try:
-        file_path = os.path.join(UPLOAD_FOLDER, filename)
-        if os.path.exists(file_path):
-            return send_file(file_path, as_attachment=True)
+        file_path = storage.resolve(secure_filename(filename))
+        if file_path:
+            return send_download(file_path)
         else:
             return jsonify({'error': 'File not found'}), 404
     except Exception as e:
@@ -357,5 +505,13 @@ def health_check():
     return jsonify({
         'status': 'healthy',
         'version': '2.0',
-        'features': ['pdf', 'image', 'video', 'ai', 'utility']
+        'features': ['pdf', 'image', 'video', 'ai', 'utility'],
+        'jobs': job_queue.stats(),
+        'ffmpeg': ffmpeg_scheduler.stats(),
+        'cache': result_cache.stats(),
+        'storage': storage.stats(),
+        'latency': metrics.summary(),
+        'tracking': usage_tracker.stats(),
+        'page_cache': page_cache.stats(),
+        'compression': compression.stats()
     })
@@ -1,20 +1,28 @@
 
-from flask import Blueprint, render_template, request, jsonify
+from flask import Blueprint, render_template, request, jsonify, abort
 from models import User, ToolHistory, ToolCategory
 from app import db
 from config import Config
+from utils.tool_catalog import tool_catalog
+from utils.search_index import search_index
+from utils.tracking import usage_tracker
+from utils.popularity import usage_counters, WINDOWS as POPULARITY_WINDOWS
+from utils.page_cache import page_cache
+from utils.sitemap import sitemaps
+from utils.assets import assets
 from datetime import datetime
 import os
 
 main_bp = Blueprint('main', __name__)
 
+# Page cache lifetimes: legal and help pages change only on deploy, the blog a little more often
+STATIC_PAGE_TTL = 24 * 60 * 60
+BLOG_PAGE_TTL = 60 * 60
+
 @main_bp.route('/')
 def index():
     # Get popular tools based on usage
-    popular_tools = db.session.query(ToolHistory.tool_name, ToolHistory.tool_category, db.func.count(ToolHistory.id).label('usage_count'))\
-        .group_by(ToolHistory.tool_name, ToolHistory.tool_category)\
-        .order_by(db.func.count(ToolHistory.id).desc())\
-        .limit(8).all()
+    popular_tools = usage_counters.popular('all', 8)
 
     return render_template('index.html',
                          categories=Config.TOOL_CATEGORIES,
@@ -26,16 +34,16 @@ def search():
     results = []
 
     if query:
-        for category_id, category_data in Config.TOOL_CATEGORIES.items():
-            for tool in category_data['tools']:
-                if query in tool.lower() or query in category_data['name'].lower():
-                    results.append({
-                        'tool': tool,
-                        'category': category_id,
-                        'category_name': category_data['name'],
-                        'icon': category_data['icon'],
-                        'color': category_data['color']
-                    })
+        limit = request.args.get('limit', type=int)
+        for tool in search_index.search(query, limit=limit):
+            category = tool.category
+            results.append({
+                'tool': tool.name,
+                'category': category.name,
+                'category_name': category.display_name,
+                'icon': category.icon,
+                'color': category.color
+            })
 
     return jsonify(results)
 
@@ -57,7 +65,7 @@ def dashboard_stats():
             'data_saved': '0 MB',
             'time_saved': '0 hours',
             'recent_activity': [],
-            'quick_tools': get_popular_tools()
+            'quick_tools': get_popular_tools(request.args.get('window', 'all'))
         })
 
     try:
@@ -69,7 +77,7 @@ def dashboard_stats():
             'data_saved': '0 MB',
             'time_saved': '0 hours',
             'recent_activity': [],
-            'quick_tools': get_popular_tools()
+            'quick_tools': get_popular_tools(request.args.get('window', 'all'))
         })
 
         # Calculate real statistics
@@ -106,7 +114,7 @@ def dashboard_stats():
             'data_saved': data_saved,
             'time_saved': time_saved,
             'recent_activity': activity_data,
-            'quick_tools': get_popular_tools()
+            'quick_tools': get_popular_tools(request.args.get('window', 'all'))
         })
 
     except Exception as e:
@@ -117,18 +125,14 @@ def dashboard_stats():
             'data_saved': '0 MB',
             'time_saved': '0 hours',
             'recent_activity': [],
-            'quick_tools': get_popular_tools()
+            'quick_tools': get_popular_tools(request.args.get('window', 'all'))
         })
 
-def get_popular_tools():
-    """Get most popular tools across all users"""
-    popular = db.session.query(
-        ToolHistory.tool_name,
-        ToolHistory.tool_category,
-        db.func.count(ToolHistory.id).label('usage_count')
-    ).group_by(ToolHistory.tool_name, ToolHistory.tool_category)\
-     .order_by(db.func.count(ToolHistory.id).desc())\
-     .limit(6).all()
+def get_popular_tools(window='all'):
+    """Get most popular tools across all users over window ('24h', '7d' or 'all')"""
+    if window not in POPULARITY_WINDOWS:
+        window = 'all'
+    popular = usage_counters.popular(window, 6)
 
     tools_data = []
     for tool in popular:
@@ -157,41 +161,48 @@ def get_popular_tools():
 def track_tool_usage():
     """Track tool usage for dashboard analytics"""
     try:
-        data = request.get_json()
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({'error': 'Expected a JSON object'}), 400
         user_id = data.get('user_id')
         tool_name = data.get('tool_name')
         tool_category = data.get('tool_category')
-        file_count = data.get('file_count', 1)
-        file_size_mb = data.get('file_size_mb', 0)
 
-        if not user_id or not tool_name:
-            return jsonify({'error': 'Missing required fields'}), 400
+        if not tool_category and isinstance(tool_name, str):
+            tool = tool_catalog.get().get(tool_name)
+            tool_category = tool.category.name if tool else None
 
-        # Get or create user
-        user = User.query.filter_by(email="guest@suntyn.ai").first()
-        if not user:
-            user = User(
-                email="guest@suntyn.ai",
-                display_name=data.get('display_name', 'Guest User')
-            )
-            db.session.add(user)
-            db.session.commit()
-
-        # Create tool history record
-        tool_history = ToolHistory(
-            user_id=user.id,
-            tool_name=tool_name,
-            tool_category=tool_category,
+        if not user_id or not tool_name or not tool_category:
+            return jsonify({'error': 'Missing required fields'}), 400
+        if not isinstance(tool_name, str) or not isinstance(tool_category, str):
+            return jsonify({'error': 'tool_name and tool_category must be strings'}), 400
+
+        # Coerced here so one malformed event cannot fail the tracker's whole batch insert
+        try:
+            file_count = int(data.get('file_count') or 1)
+            file_size_mb = float(data.get('file_size_mb') or 0)
+            processing_time = data.get('processing_time')
+            processing_time = float(processing_time) if processing_time is not None else None
+        except (TypeError, ValueError):
+            return jsonify({'error': 'file_count, file_size_mb and processing_time must be numbers'}), 400
+        if file_count < 0 or file_size_mb < 0 or (processing_time is not None and processing_time < 0):
+            return jsonify({'error': 'file_count, file_size_mb and processing_time must not be negative'}), 400
+        display_name = data.get('display_name')
+        if not isinstance(display_name, str):
+            display_name = None
+
+        # Written to tool_history in batches by the background flusher
+        usage_tracker.record(
+            tool_name,
+            tool_category,
             file_count=file_count,
             file_size_mb=file_size_mb,
-            used_at=datetime.utcnow(),
+            processing_time=processing_time,
+            display_name=display_name,
             ip_address=request.remote_addr,
             user_agent=request.headers.get('User-Agent', '')
         )
 
-        db.session.add(tool_history)
-        db.session.commit()
-
         return jsonify({'success': True, 'message': 'Tool usage tracked'})
 
     except Exception as e:
@@ -199,6 +210,7 @@ def track_tool_usage():
         return jsonify({'error': 'Failed to track usage'}), 500
 
 @main_bp.route('/about')
+@page_cache.cached(STATIC_PAGE_TTL)
 def about():
     return render_template('about.html')
 
@@ -207,116 +219,100 @@ def contact():
     return render_template('contact.html')
 
 @main_bp.route('/privacy')
+@page_cache.cached(STATIC_PAGE_TTL)
 def privacy():
     return render_template('privacy.html')
 
 @main_bp.route('/terms')
+@page_cache.cached(STATIC_PAGE_TTL)
 def terms():
     return render_template('terms.html')
 
 @main_bp.route('/cookies')
+@page_cache.cached(STATIC_PAGE_TTL)
 def cookies():
     return render_template('cookies.html')
 
 @main_bp.route('/faq')
+@page_cache.cached(STATIC_PAGE_TTL)
 def faq():
     return render_template('faq.html')
 
 @main_bp.route('/blog')
+@page_cache.cached(BLOG_PAGE_TTL)
 def blog():
     return render_template('blog.html')
 
 @main_bp.route('/sitemap.xml')
 def sitemap():
-    """Generate dynamic sitemap for SEO"""
-    from flask import Response
-    import datetime
-
-    sitemap_xml = '''<?xml version="1.0" encoding="UTF-8"?>
-    <urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
-        <url>
-            <loc>https://suntyn-ai.replit.app/</loc>
-            <lastmod>{}</lastmod>
-            <changefreq>daily</changefreq>
-            <priority>1.0</priority>
-        </url>
-        <url>
-            <loc>https://suntyn-ai.replit.app/tools</loc>
-            <lastmod>{}</lastmod>
-            <changefreq>daily</changefreq>
-            <priority>0.9</priority>
-        </url>
-        <url>
-            <loc>https://suntyn-ai.replit.app/about</loc>
-            <lastmod>{}</lastmod>
-            <changefreq>monthly</changefreq>
-            <priority>0.7</priority>
-        </url>
-        <url>
-            <loc>https://suntyn-ai.replit.app/contact</loc>
-            <lastmod>{}</lastmod>
-            <changefreq>monthly</changefreq>
-            <priority>0.7</priority>
-        </url>
-        <url>
-            <loc>https://suntyn-ai.replit.app/privacy</loc>
-            <lastmod>{}</lastmod>
-            <changefreq>monthly</changefreq>
-            <priority>0.6</priority>
-        </url>
-        <url>
-            <loc>https://suntyn-ai.replit.app/terms</loc>
-            <lastmod>{}</lastmod>
-            <changefreq>monthly</changefreq>
-            <priority>0.6</priority>
-        </url>
-        <url>
-            <loc>https://suntyn-ai.replit.app/cookies</loc>
-            <lastmod>{}</lastmod>
-            <changefreq>monthly</changefreq>
-            <priority>0.6</priority>
-        </url>
-        <url>
-            <loc>https://suntyn-ai.replit.app/faq</loc>
-            <lastmod>{}</lastmod>
-            <changefreq>weekly</changefreq>
-            <priority>0.8</priority>
-        </url>
-    '''.format(
-        datetime.datetime.now().strftime('%Y-%m-%d'), 
-        datetime.datetime.now().strftime('%Y-%m-%d'),
-        datetime.datetime.now().strftime('%Y-%m-%d'),
-        datetime.datetime.now().strftime('%Y-%m-%d'),
-        datetime.datetime.now().strftime('%Y-%m-%d'),
-        datetime.datetime.now().strftime('%Y-%m-%d'),
-        datetime.datetime.now().strftime('%Y-%m-%d'),
-        datetime.datetime.now().strftime('%Y-%m-%d')
-    )
-
-    # Add all tool URLs
-    for category_id, category_data in Config.TOOL_CATEGORIES.items():
-        for tool in category_data['tools']:
-            sitemap_xml += '''
-        <url>
-            <loc>https://suntyn-ai.replit.app/tools/{}</loc>
-            <lastmod>{}</lastmod>
-            <changefreq>weekly</changefreq>
-            <priority>0.8</priority>
-        </url>
-            '''.format(tool, datetime.datetime.now().strftime('%Y-%m-%d'))
-
-    sitemap_xml += '\n    </urlset>'
-
-    return Response(sitemap_xml, mimetype='application/xml')
+    """Sitemap, or a sitemap index once the site outgrows one file; built once per catalog version"""
+    return sitemaps.respond(sitemaps.get('sitemap.xml'))
+
+@main_bp.route('/sitemaps/<name>')
+def sitemap_child(name):
+    """Child sitemaps listed by the sitemap index"""
+    if name == 'sitemap.xml':
+        abort(404)
+    return sitemaps.respond(sitemaps.get(name))
 
 @main_bp.route('/robots.txt')
 def robots():
-    """Generate robots.txt for SEO"""
-    from flask import Response
+    """robots.txt pointing crawlers at the sitemap"""
+    return sitemaps.respond(sitemaps.robots())
 
-    robots_txt = '''User-agent: *
-Allow: /
-Sitemap: https://suntyn-ai.replit.app/sitemap.xml
-'''
+# Pre-rendered OG images (python -m utils.og_generator)
+OG_CACHE_MAX_AGE = 365 * 24 * 60 * 60
+OG_UNVERSIONED_MAX_AGE = 60 * 60  # /og/<file> without (or with a stale) ?v=<hash>
+_og_manifest = {'mtime': None, 'hashes': {}}
 
-    return Response(robots_txt, mimetype='text/plain')
+def og_manifest():
+    """Filename -> content hash of pre-rendered OG images, reloaded when the build step rewrites it"""
+    from utils.og_generator import OG_DIR, MANIFEST_NAME, load_manifest
+
+    try:
+        mtime = os.path.getmtime(os.path.join(OG_DIR, MANIFEST_NAME))
+    except OSError:
+        return {}
+    if mtime != _og_manifest['mtime']:
+        _og_manifest['hashes'] = load_manifest()
+        _og_manifest['mtime'] = mtime
+    return _og_manifest['hashes']
+
+@main_bp.app_context_processor
+def og_image_context():
+    def og_image_url(tool_name=None, category=None):
+        """Versioned URL of a tool's (or category's) OG image, or the site logo"""
+        from flask import url_for
+
+        filename = f"{category}-category-og.png" if category else f"{tool_name}-og.png"
+        content_hash = og_manifest().get(filename) if (tool_name or category) else None
+        if content_hash:
+            return url_for('main.og_image', filename=filename, v=content_hash[:12], _external=True)
+        return url_for('static', filename='images/suntyn-ai-logo.svg', _external=True)
+    return {'og_image_url': og_image_url}
+
+@main_bp.route('/og/<filename>')
+def og_image(filename):
+    """Serve a pre-rendered OG image; cached for a year when ?v= matches its current content hash"""
+    from flask import send_from_directory
+    from utils.og_generator import OG_DIR
+
+    content_hash = og_manifest().get(filename)
+    versioned = bool(content_hash) and request.args.get('v') == content_hash[:12]
+    response = send_from_directory(OG_DIR, filename,
+                                   max_age=OG_CACHE_MAX_AGE if versioned else OG_UNVERSIONED_MAX_AGE)
+    if versioned:
+        response.headers['Cache-Control'] = f'public, max-age={OG_CACHE_MAX_AGE}, immutable'
+    return response
+
+# Bundled, fingerprinted CSS/JS (python -m utils.assets)
+@main_bp.app_context_processor
+def asset_context():
+    return {'asset_tags': assets.tags}
+
+@main_bp.route('/assets/<filename>')
+def asset(filename):
+    """Serve a built bundle, precompressed when the client accepts it; cached for a year"""
+    from utils.static_files import send_precompressed
+
+    return send_precompressed(assets.dist_dir, filename)
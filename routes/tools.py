@@ -1,8 +1,9 @@
 from flask import Blueprint, render_template, request, jsonify, redirect, url_for
-from models import Tool, ToolCategory, db
 import logging
 import os
-from config import Config
+from utils.tool_catalog import tool_catalog
+from utils.search_index import search_index
+from utils.page_cache import page_cache
 
 # Custom icon mapping for all tools
 TOOL_CUSTOM_ICONS = {
@@ -54,6 +55,9 @@ TOOL_CUSTOM_ICONS = {
 
 tools_bp = Blueprint('tools', __name__, url_prefix='/tools')
 
+# Tool pages change on deploy or catalog update; the catalog version is part of the cache key
+TOOL_PAGE_TTL = 60 * 60
+
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -62,68 +66,20 @@ logger = logging.getLogger(__name__)
 def index():
     """Tools index page with category filtering"""
     try:
-        from config import Config
         category = request.args.get('category', 'all')
         search_query = request.args.get('search', '')
 
-        # Get all tools from database OR fallback to config
-        try:
-            tools_query = Tool.query.filter_by(is_active=True)
-            
-            # Filter by category if specified
-            if category and category != 'all':
-                tools_query = tools_query.join(ToolCategory).filter(ToolCategory.name == category)
-
-            if search_query:
-                tools_query = tools_query.filter(
-                    Tool.display_name.ilike(f'%{search_query}%') |
-                    Tool.description.ilike(f'%{search_query}%')
-                )
-
-            tools = tools_query.all()
-            categories = ToolCategory.query.all()
-            
-            # If no tools found, use fallback
-            if not tools:
-                raise Exception("No tools in database, using fallback")
-                
-        except Exception as db_error:
-            logger.warning(f"Database error, using fallback: {db_error}")
-            # Fallback to config-based tools
-            tools = []
-            categories = []
-            
-            # Create tool objects from config
-            for cat_id, cat_data in Config.TOOL_CATEGORIES.items():
-                for tool_name in cat_data['tools']:
-                    if category == 'all' or category == cat_id:
-                        if not search_query or search_query.lower() in tool_name.lower():
-                            # Create a mock tool object
-                            tool_obj = type('Tool', (), {
-                                'name': tool_name,
-                                'display_name': tool_name.replace('-', ' ').title(),
-                                'description': f"Professional {tool_name.replace('-', ' ')} tool",
-                                'category': type('Category', (), {'name': cat_id})(),
-                                'icon': TOOL_CUSTOM_ICONS.get(tool_name, 'tool'),
-                                'color': cat_data['color'],
-                                'is_popular': tool_name in ['pdf-merge', 'image-compress', 'qr-generator', 'resume-generator']
-                            })
-                            tools.append(tool_obj)
-                
-                # Create category object
-                if category == 'all' or category == cat_id:
-                    cat_obj = type('Category', (), {
-                        'name': cat_id,
-                        'display_name': cat_data['name']
-                    })()
-                    if cat_obj not in [c for c in categories if hasattr(c, 'name') and c.name == cat_id]:
-                        categories.append(cat_obj)
+        catalog = tool_catalog.get()
+        if search_query:
+            tools = search_index.search(search_query, category=category)
+        else:
+            tools = catalog.in_category(category)
 
         logger.info(f"Loading tools index: found {len(tools)} tools")
 
         return render_template('tools/index.html', 
                              tools=tools, 
-                             categories=categories, 
+                             categories=catalog.categories, 
                              selected_category=category,
                              search_query=search_query,
                              tool_icons=TOOL_CUSTOM_ICONS)
@@ -154,19 +110,7 @@ def index():
 def api_tools():
     """API endpoint to get all tools data"""
     try:
-        tools = Tool.query.filter_by(is_active=True).all()
-
-        tools_data = []
-        for tool in tools:
-            tools_data.append({
-                'name': tool.name,
-                'display_name': tool.display_name,
-                'description': tool.description,
-                'category': tool.category.name if tool.category else 'utility',
-                'icon': tool.icon or 'tool',
-                'color': tool.color or 'blue',
-                'is_popular': tool.is_popular
-            })
+        tools_data = [tool.to_dict() for tool in tool_catalog.get().tools]
 
         logger.info(f"API returning {len(tools_data)} tools")
 
@@ -195,10 +139,11 @@ def api_tools():
         })
 
 @tools_bp.route('/<tool_name>')
+@page_cache.cached(TOOL_PAGE_TTL)
 def tool_page(tool_name):
     """Individual tool page"""
     try:
-        tool = Tool.query.filter_by(name=tool_name, is_active=True).first()
+        tool = tool_catalog.get().get(tool_name)
 
         if not tool:
             logger.warning(f"Tool not found: {tool_name}")
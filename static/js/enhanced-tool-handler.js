@@ -3,6 +3,8 @@
 class EnhancedToolHandler {
     constructor() {
         this.apiBase = '/api/v2';
+        // Files above this size go through the resumable chunked upload API
+        this.chunkedUploadThreshold = 10 * 1024 * 1024;
         this.currentTool = this.getCurrentTool();
         this.initializeHandler();
     }
@@ -155,12 +157,13 @@ class EnhancedToolHandler {
             
             // Add files if required
             if (this.selectedFiles && this.selectedFiles.length > 0) {
-                if (this.selectedFiles.length === 1) {
-                    formData.append('file', this.selectedFiles[0]);
-                } else {
-                    this.selectedFiles.forEach(file => {
-                        formData.append('files', file);
-                    });
+                const fieldName = this.selectedFiles.length === 1 ? 'file' : 'files';
+                for (const file of this.selectedFiles) {
+                    if (file.size > this.chunkedUploadThreshold) {
+                        formData.append('upload_id', await this.uploadInChunks(file));
+                    } else {
+                        formData.append(fieldName, file);
+                    }
                 }
             }
 
@@ -181,7 +184,12 @@ class EnhancedToolHandler {
                 body: formData
             });
 
-            const result = await response.json();
+            let result = await response.json();
+
+            // File-processing endpoints return a job id; wait for the background job
+            if (result.job_id) {
+                result = await this.waitForJob(result.status_url);
+            }
 
             if (result.success) {
                 this.showResults(result);
@@ -195,6 +203,67 @@ class EnhancedToolHandler {
         }
     }
 
+    async uploadInChunks(file) {
+        const initResponse = await fetch(`${this.apiBase}/uploads`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ filename: file.name, size: file.size })
+        });
+        let upload = await initResponse.json();
+        if (!initResponse.ok) {
+            throw new Error(upload.error || 'Upload failed');
+        }
+
+        let retries = 0;
+        while (upload.next_chunk < upload.total_chunks) {
+            const start = upload.next_chunk * upload.chunk_size;
+            const chunk = file.slice(start, start + upload.chunk_size);
+            const digest = await crypto.subtle.digest('SHA-256', await chunk.arrayBuffer());
+            const checksum = Array.from(new Uint8Array(digest))
+                .map(b => b.toString(16).padStart(2, '0')).join('');
+
+            try {
+                const response = await fetch(`${this.apiBase}/uploads/${upload.upload_id}/chunks/${upload.next_chunk}`, {
+                    method: 'PUT',
+                    headers: { 'X-Chunk-Checksum': checksum },
+                    body: chunk
+                });
+                if (!response.ok && response.status !== 409) {
+                    throw new Error((await response.json()).error);
+                }
+                retries = 0;
+            } catch (error) {
+                if (++retries > 3) {
+                    throw error;
+                }
+                await new Promise(resolve => setTimeout(resolve, 1000 * retries));
+            }
+
+            // Resume from whatever the server has actually stored
+            const statusResponse = await fetch(`${this.apiBase}/uploads/${upload.upload_id}`);
+            upload = await statusResponse.json();
+        }
+
+        await fetch(`${this.apiBase}/uploads/${upload.upload_id}/complete`, { method: 'POST' });
+        return upload.upload_id;
+    }
+
+    async waitForJob(statusUrl) {
+        while (true) {
+            const response = await fetch(statusUrl);
+            const job = await response.json();
+
+            if (job.status === 'finished') {
+                return job.result;
+            }
+            if (job.status === 'failed' || job.error) {
+                return { success: false, error: job.error || 'Processing failed' };
+            }
+
+            await new Promise(resolve => setTimeout(resolve, 1000));
+        }
+    }
+
     getAPIEndpoint() {
         const endpoints = {
             'pdf-merge': `${this.apiBase}/pdf/merge`,
@@ -5,13 +5,18 @@ Handles AI-powered text generation and document creation
 
 import os
 import uuid
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import letter
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
 import tempfile
 import logging
 
+from utils.storage import storage
+from utils.metrics import instrument_processor
+from utils.lazy_imports import lazy_import
+
+pagesizes = lazy_import('reportlab.lib.pagesizes')
+reportlab_styles = lazy_import('reportlab.lib.styles')
+platypus = lazy_import('reportlab.platypus')
+
+@instrument_processor
 class AIProcessor:
     """AI processing utilities"""
     
@@ -21,32 +26,29 @@ class AIProcessor:
         try:
             # Generate output filename
             output_filename = f"resume_{uuid.uuid4()}.pdf"
-            output_path = os.path.join('uploads', output_filename)
-            
-            # Ensure uploads directory exists
-            os.makedirs('uploads', exist_ok=True)
+            output_path = storage.output_path(output_filename)
             
             # Create PDF document
-            doc = SimpleDocTemplate(output_path, pagesize=letter)
-            styles = getSampleStyleSheet()
+            doc = platypus.SimpleDocTemplate(output_path, pagesize=pagesizes.letter)
+            styles = reportlab_styles.getSampleStyleSheet()
             story = []
             
             # Title
-            title = Paragraph(f"<b>{name}</b>", styles['Title'])
+            title = platypus.Paragraph(f"<b>{name}</b>", styles['Title'])
             story.append(title)
-            story.append(Spacer(1, 12))
+            story.append(platypus.Spacer(1, 12))
             
             # Experience section
-            exp_title = Paragraph("<b>Experience</b>", styles['Heading2'])
+            exp_title = platypus.Paragraph("<b>Experience</b>", styles['Heading2'])
             story.append(exp_title)
-            exp_content = Paragraph(experience, styles['Normal'])
+            exp_content = platypus.Paragraph(experience, styles['Normal'])
             story.append(exp_content)
-            story.append(Spacer(1, 12))
+            story.append(platypus.Spacer(1, 12))
             
             # Skills section
-            skills_title = Paragraph("<b>Skills</b>", styles['Heading2'])
+            skills_title = platypus.Paragraph("<b>Skills</b>", styles['Heading2'])
             story.append(skills_title)
-            skills_content = Paragraph(skills, styles['Normal'])
+            skills_content = platypus.Paragraph(skills, styles['Normal'])
             story.append(skills_content)
             
             # Build PDF
@@ -2,17 +2,18 @@ import os
 import json
 import random
 import string
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import letter
-from reportlab.lib.units import inch
 from datetime import datetime
+from utils.lazy_imports import lazy_import
+
+canvas = lazy_import('reportlab.pdfgen.canvas')
+pagesizes = lazy_import('reportlab.lib.pagesizes')
 
 def generate_resume(form_data, output_path):
     """Generate PDF resume from form data"""
     try:
         # Create PDF canvas
-        c = canvas.Canvas(output_path, pagesize=letter)
-        width, height = letter
+        c = canvas.Canvas(output_path, pagesize=pagesizes.letter)
+        width, height = pagesizes.letter
         
         # Title
         c.setFont("Helvetica-Bold", 24)
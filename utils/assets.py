@@ -0,0 +1,385 @@
+"""
+Static asset utilities for Toolora AI
+Bundles, minifies and fingerprints static/js and static/css, writing
+content-hashed files with .gz/.br siblings and a manifest read by asset_tags()
+"""
+
+import os
+import re
+import json
+import hashlib
+import logging
+import threading
+
+from config import Config
+from utils.static_files import compress_variants, write_variants, precompress_directory
+
+STATIC_DIR = os.path.join(Config.basedir, 'static')
+MANIFEST_NAME = 'manifest.json'
+
+# Bundle name -> source files under static/, concatenated in page order
+BUNDLES = {
+    # Stylesheets linked from base.html
+    'site.css': (
+        'css/main.css', 'css/enhanced-design.css', 'css/icon-system.css', 'css/orange-3d-theme.css',
+        'css/tabs-enhancement.css', 'css/header-fix.css', 'css/tool-specific-styles.css',
+        'css/icon-fixes.css',
+    ),
+    # Loaded before the CDN scripts and before first paint respectively, so kept on their own
+    'error-fixes.js': ('js/error-fixes.js',),
+    'instant-theme.js': ('js/instant-theme.js',),
+    # Head scripts of base.html, after the stylesheets
+    'head.js': (
+        'js/fixed-search.js', 'js/icon-manager.js', 'js/header-scroll-fix.js', 'js/tool-icons.js',
+        'js/icon-loader.js', 'js/tool-endpoints.js', 'js/alpine-fallback.js', 'js/tool-manager.js',
+        'js/enhanced-tool-handler.js', 'js/tool-specific-handlers.js',
+        'js/mobile-responsive-enhancements.js',
+    ),
+    # End of <body> in base.html
+    'footer.js': ('js/tools-carousel.js', 'js/main.js', 'js/theme.js'),
+    'dashboard.js': ('js/dashboard.js',),
+}
+
+HASH_LENGTH = 12
+
+
+# Minification: comments and insignificant whitespace only. Identifiers,
+# literals and line breaks are kept, so the output behaves exactly like the
+# source, automatic semicolon insertion included.
+
+_CSS_SPACE = re.compile(r'\s+')
+_CSS_PUNCT = re.compile(r'\s*([{};,>])\s*')
+
+
+def minify_css(source):
+    """Strip comments, collapse whitespace and drop spaces around { } ; , >"""
+    parts = []
+    code = []
+    i, n = 0, len(source)
+    while i < n:
+        char = source[i]
+        if char == '/' and source.startswith('/*', i):
+            end = source.find('*/', i + 2)
+            i = n if end == -1 else end + 2
+            code.append(' ')
+        elif char in '"\'':
+            end = _string_end(source, i)
+            parts.append(_squeeze_css(''.join(code)))
+            parts.append(source[i:end])
+            code = []
+            i = end
+        else:
+            code.append(char)
+            i += 1
+    parts.append(_squeeze_css(''.join(code)))
+    return ''.join(parts).strip().replace(';}', '}')
+
+
+def _squeeze_css(code):
+    return _CSS_PUNCT.sub(r'\1', _CSS_SPACE.sub(' ', code))
+
+
+def _string_end(source, start):
+    """Index just past the quoted string starting at start"""
+    quote = source[start]
+    i = start + 1
+    while i < len(source):
+        if source[i] == '\\':
+            i += 2
+        elif source[i] == quote or source[i] == '\n' and quote != '`':
+            return i + 1
+        else:
+            i += 1
+    return len(source)
+
+
+# A '/' after one of these starts a regular expression literal rather than a division
+_REGEX_AFTER_PUNCT = set('(,=:[!&|?{};+-*%<>~^')
+_REGEX_AFTER_WORDS = {'return', 'typeof', 'instanceof', 'in', 'of', 'new', 'delete', 'void', 'throw',
+                      'case', 'do', 'else', 'yield', 'await'}
+_WORD_TAIL = re.compile(r'[A-Za-z_$][\w$]*$')
+
+
+def _regex_allowed(out):
+    """Whether a '/' following the code emitted so far begins a regex literal"""
+    text = ''.join(out[-64:]).rstrip()
+    if not text:
+        return True
+    if text[-1] in _REGEX_AFTER_PUNCT:
+        return True
+    word = _WORD_TAIL.search(text)
+    return bool(word) and word.group() in _REGEX_AFTER_WORDS
+
+
+def _regex_end(source, start):
+    """Index just past the regex literal (flags included) starting at start"""
+    i, in_class = start + 1, False
+    while i < len(source):
+        char = source[i]
+        if char == '\\':
+            i += 2
+            continue
+        if char == '\n':
+            return i
+        if in_class:
+            in_class = char != ']'
+        elif char == '[':
+            in_class = True
+        elif char == '/':
+            i += 1
+            while i < len(source) and (source[i].isalnum() or source[i] in '_$'):
+                i += 1
+            return i
+        i += 1
+    return i
+
+
+def _template_end(source, start):
+    """Index just past the template literal starting at start, ${...} expressions included"""
+    i = start + 1
+    while i < len(source):
+        char = source[i]
+        if char == '\\':
+            i += 2
+        elif char == '`':
+            return i + 1
+        elif char == '$' and source.startswith('${', i):
+            i = _code_end(source, i + 2)
+        else:
+            i += 1
+    return len(source)
+
+
+def _code_end(source, start):
+    """Index just past the '}' closing a ${ expression opened before start"""
+    depth, i = 1, start
+    while i < len(source):
+        char = source[i]
+        if char in '"\'':
+            i = _string_end(source, i)
+        elif char == '`':
+            i = _template_end(source, i)
+        elif char == '{':
+            depth += 1
+            i += 1
+        elif char == '}':
+            depth -= 1
+            i += 1
+            if not depth:
+                return i
+        else:
+            i += 1
+    return i
+
+
+def minify_js(source):
+    """Strip comments, indentation, trailing spaces and blank lines; line breaks are kept"""
+    out = []
+
+    def newline():
+        while out and out[-1] == ' ':
+            out.pop()
+        if out and not out[-1].endswith('\n'):
+            out.append('\n')
+
+    i, n = 0, len(source)
+    while i < n:
+        char = source[i]
+        if char == '/' and source.startswith('//', i):
+            end = source.find('\n', i)
+            i = n if end == -1 else end
+        elif char == '/' and source.startswith('/*', i):
+            end = source.find('*/', i + 2)
+            end = n if end == -1 else end + 2
+            if '\n' in source[i:end]:
+                newline()
+            elif out and out[-1][-1] not in ' \n':
+                out.append(' ')
+            i = end
+        elif char == '/' and _regex_allowed(out):
+            end = _regex_end(source, i)
+            out.append(source[i:end])
+            i = end
+        elif char in '"\'':
+            end = _string_end(source, i)
+            out.append(source[i:end])
+            i = end
+        elif char == '`':
+            end = _template_end(source, i)
+            out.append(source[i:end])
+            i = end
+        elif char in '\r\n':
+            newline()
+            i += 1
+        elif char in ' \t':
+            while i < n and source[i] in ' \t':
+                i += 1
+            if out and out[-1][-1] not in ' \n':
+                out.append(' ')
+        else:
+            out.append(char)
+            i += 1
+    return ''.join(out).strip()
+
+
+def minify(name, source):
+    if name.endswith('.css'):
+        return minify_css(source)
+    if name.endswith('.js'):
+        return minify_js(source)
+    return source
+
+
+def bundle_source(name, sources, static_dir=STATIC_DIR):
+    """Minified contents of one bundle"""
+    parts = []
+    for path in sources:
+        with open(os.path.join(static_dir, path), encoding='utf-8') as f:
+            parts.append(minify(name, f.read()))
+    # ';' keeps a file without a trailing semicolon from running into the next one
+    return (';\n' if name.endswith('.js') else '\n').join(parts) + '\n'
+
+
+def hashed_name(name, content):
+    stem, ext = os.path.splitext(name)
+    return f'{stem}.{hashlib.sha256(content).hexdigest()[:HASH_LENGTH]}{ext}'
+
+
+def _write(path, content):
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+def load_manifest(dist_dir=None):
+    """Return {bundle name: fingerprinted filename} of the last build"""
+    try:
+        with open(os.path.join(dist_dir or Config.ASSET_DIST_DIR, MANIFEST_NAME)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def build_assets(static_dir=STATIC_DIR, dist_dir=None, bundles=None):
+    """Build every bundle into dist_dir and rewrite the manifest
+
+    Bundles whose fingerprinted file already exists are left alone. Files
+    of the previous build stay in place for pages rendered before the
+    deploy; older ones are deleted. Compressible files elsewhere under
+    static_dir get .gz/.br siblings as well. Returns {bundle: sizes} with
+    the source, minified, gzip and brotli byte counts.
+    """
+    dist_dir = dist_dir or Config.ASSET_DIST_DIR
+    bundles = bundles or BUNDLES
+    os.makedirs(dist_dir, exist_ok=True)
+    previous = load_manifest(dist_dir)
+
+    manifest, sizes = {}, {}
+    for name, sources in bundles.items():
+        content = bundle_source(name, sources, static_dir).encode('utf-8')
+        filename = hashed_name(name, content)
+        path = os.path.join(dist_dir, filename)
+        variants = compress_variants(content)
+        if not os.path.exists(path):
+            _write(path, content)
+            write_variants(path, variants)
+        manifest[name] = filename
+        sizes[name] = {
+            'source': sum(os.path.getsize(os.path.join(static_dir, source)) for source in sources),
+            'minified': len(content),
+            'gzip': len(variants['.gz']),
+            'brotli': len(variants['.br']) if '.br' in variants else None,
+        }
+
+    keep = set(manifest.values()) | set(previous.values()) | {MANIFEST_NAME}
+    for entry in os.scandir(dist_dir):
+        base = entry.name[:-3] if entry.name.endswith(('.gz', '.br')) else entry.name
+        if entry.is_file() and base not in keep:
+            os.remove(entry.path)
+
+    tmp_path = os.path.join(dist_dir, f'{MANIFEST_NAME}.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, os.path.join(dist_dir, MANIFEST_NAME))
+
+    # The rest of static/ (tool pages still link files directly) gets siblings too
+    precompress_directory(static_dir, skip=[dist_dir])
+    return sizes
+
+
+class AssetRegistry:
+    """Bundle name -> fingerprinted filename, reloaded when a build rewrites the manifest
+
+    With ASSET_AUTO_BUILD on, a process that finds no manifest builds the
+    assets itself on first use; the output is deterministic, so workers
+    racing to do so write identical files.
+    """
+
+    def __init__(self, dist_dir=None, auto_build=None):
+        self.dist_dir = dist_dir or Config.ASSET_DIST_DIR
+        self.auto_build = auto_build if auto_build is not None else Config.ASSET_AUTO_BUILD
+        self._mtime = None
+        self._manifest = {}
+        self._build_attempted = False
+        self._lock = threading.Lock()
+
+    def manifest(self):
+        try:
+            mtime = os.path.getmtime(os.path.join(self.dist_dir, MANIFEST_NAME))
+        except OSError:
+            mtime = None
+        if mtime is None and self.auto_build and not self._build_attempted:
+            with self._lock:
+                if not self._build_attempted:
+                    self._build_attempted = True
+                    try:
+                        build_assets(dist_dir=self.dist_dir)
+                        logging.info(f"Static assets built into {self.dist_dir}")
+                    except Exception as e:
+                        logging.error(f"Static asset build error: {str(e)}")
+            return self.manifest()
+        if mtime != self._mtime:
+            self._manifest = load_manifest(self.dist_dir) if mtime is not None else {}
+            self._mtime = mtime
+        return self._manifest
+
+    def filename(self, name):
+        return self.manifest().get(name)
+
+    def urls(self, name):
+        """URL of a bundle's fingerprinted file, or of each of its source files while it is not built"""
+        from flask import url_for
+
+        if name not in BUNDLES:
+            raise KeyError(f"Unknown asset bundle {name!r} (see BUNDLES in utils/assets.py)")
+        filename = self.filename(name)
+        if filename:
+            return [url_for('main.asset', filename=filename)]
+        return [url_for('static', filename=source) for source in BUNDLES[name]]
+
+    def tags(self, name):
+        """<link> or <script> tags loading a bundle, one per source file while it is not built"""
+        from markupsafe import Markup, escape
+
+        if name.endswith('.css'):
+            template = '<link rel="stylesheet" href="{}">'
+        else:
+            template = '<script src="{}"></script>'
+        return Markup('\n'.join(template.format(escape(url)) for url in self.urls(name)))
+
+
+assets = AssetRegistry()
+
+
+if __name__ == '__main__':
+    # Build step: python -m utils.assets
+    import time
+
+    start = time.time()
+    sizes = build_assets()
+    print(f"{'bundle':<18} {'files':>5} {'source':>9} {'minified':>9} {'gzip':>8} {'brotli':>8}")
+    for name, size in sizes.items():
+        br = f"{size['brotli']:>8}" if size['brotli'] is not None else f"{'-':>8}"
+        print(f"{name:<18} {len(BUNDLES[name]):>5} {size['source']:>9} {size['minified']:>9} {size['gzip']:>8} {br}")
+    print(f"Built {len(sizes)} bundles into {Config.ASSET_DIST_DIR} in {time.time() - start:.2f}s")
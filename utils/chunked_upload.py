@@ -0,0 +1,237 @@
+"""
+Chunked, resumable uploads for Toolora AI
+Large files arrive as a sequence of checksummed chunks appended straight to
+disk, so no single request has to carry (or buffer) the whole file
+"""
+
+import os
+import json
+import time
+import uuid
+import shutil
+import hashlib
+import logging
+
+from werkzeug.utils import secure_filename
+
+try:
+    import fcntl
+except ImportError:  # Non-POSIX platforms: no cross-process locking
+    fcntl = None
+
+from config import Config
+from utils.storage import storage
+
+
+class UploadError(Exception):
+    """Raised for invalid chunk uploads; carries the HTTP status to return"""
+
+    def __init__(self, message, status=400, **details):
+        super().__init__(message)
+        self.status = status
+        self.details = details
+
+
+class _UploadLock:
+    """Exclusive per-upload lock so concurrent chunk requests cannot interleave"""
+
+    def __init__(self, path):
+        self.path = path
+        self.handle = None
+
+    def __enter__(self):
+        try:
+            self.handle = open(self.path, 'a+')
+        except FileNotFoundError:
+            # Claimed or purged between the caller's check and here
+            raise UploadError('Upload not found', 404)
+        if fcntl is not None:
+            fcntl.flock(self.handle, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if fcntl is not None:
+            fcntl.flock(self.handle, fcntl.LOCK_UN)
+        self.handle.close()
+
+
+class ChunkedUploadStore:
+    """Filesystem store for in-progress chunked uploads
+
+    Layout: <upload_dir>/<upload_id>/meta.json and data.part. Chunks must be
+    sent in order; re-sending an already stored chunk is accepted if its
+    checksum matches, which makes retries after a dropped connection safe.
+    """
+
+    def __init__(self, upload_dir=None, chunk_size=None, max_bytes=None, ttl=None):
+        self.upload_dir = upload_dir or Config.CHUNKED_UPLOAD_DIR
+        self.chunk_size = chunk_size or Config.CHUNKED_UPLOAD_CHUNK_SIZE
+        self.max_bytes = max_bytes or Config.CHUNKED_UPLOAD_MAX_BYTES
+        self.ttl = ttl or Config.CHUNKED_UPLOAD_TTL
+
+    def _dir(self, upload_id):
+        if not upload_id or not upload_id.isalnum():
+            raise UploadError('Invalid upload id', 404)
+        return os.path.join(self.upload_dir, upload_id)
+
+    def _load(self, upload_id):
+        try:
+            with open(os.path.join(self._dir(upload_id), 'meta.json')) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            raise UploadError('Upload not found', 404)
+
+    def _save(self, meta):
+        path = os.path.join(self._dir(meta['upload_id']), 'meta.json')
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, path)
+
+    def _lock(self, upload_id):
+        upload_dir = self._dir(upload_id)
+        if not os.path.isdir(upload_dir):
+            raise UploadError('Upload not found', 404)
+        return _UploadLock(os.path.join(upload_dir, '.lock'))
+
+    @staticmethod
+    def _status(meta):
+        return {
+            'upload_id': meta['upload_id'],
+            'filename': meta['filename'],
+            'total_size': meta['total_size'],
+            'chunk_size': meta['chunk_size'],
+            'received_bytes': meta['received_bytes'],
+            'next_chunk': len(meta['chunks']),
+            'total_chunks': meta['total_chunks'],
+            'complete': meta['complete']
+        }
+
+    def init(self, filename, total_size):
+        """Start an upload and return its status (including the chunk size to use)"""
+        filename = secure_filename(filename or '')
+        if not filename:
+            raise UploadError('Filename is required')
+        if total_size <= 0 or total_size > self.max_bytes:
+            raise UploadError(f'File size must be between 1 byte and {self.max_bytes} bytes', 413)
+
+        self.purge_expired()
+        upload_id = uuid.uuid4().hex
+        os.makedirs(self._dir(upload_id))
+        open(os.path.join(self._dir(upload_id), 'data.part'), 'wb').close()
+
+        meta = {
+            'upload_id': upload_id,
+            'filename': filename,
+            'total_size': total_size,
+            'chunk_size': self.chunk_size,
+            'total_chunks': -(-total_size // self.chunk_size),
+            'received_bytes': 0,
+            'chunks': [],
+            'complete': False,
+            'created_at': time.time(),
+            'updated_at': time.time()
+        }
+        self._save(meta)
+        return self._status(meta)
+
+    def status(self, upload_id):
+        return self._status(self._load(upload_id))
+
+    def put_chunk(self, upload_id, index, stream, checksum):
+        """Append chunk `index` read from `stream`, verifying its SHA-256 checksum"""
+        if not checksum:
+            raise UploadError('Chunk checksum (SHA-256 hex) is required')
+        checksum = checksum.lower()
+
+        with self._lock(upload_id):
+            meta = self._load(upload_id)
+            if meta['complete']:
+                raise UploadError('Upload already completed', 409)
+
+            if index < len(meta['chunks']):
+                # Retry of a chunk we already have
+                if meta['chunks'][index] != checksum:
+                    raise UploadError('Chunk already received with a different checksum', 409)
+                return self._status(meta)
+            if index != len(meta['chunks']):
+                raise UploadError('Chunks must be sent in order', 409, next_chunk=len(meta['chunks']))
+
+            offset = meta['received_bytes']
+            expected = min(meta['chunk_size'], meta['total_size'] - offset)
+            data_path = os.path.join(self._dir(upload_id), 'data.part')
+            digest = hashlib.sha256()
+            written = 0
+
+            with open(data_path, 'ab') as f:
+                # Drop any bytes left over from an interrupted chunk
+                f.truncate(offset)
+                while True:
+                    block = stream.read(min(1024 * 1024, expected - written + 1))
+                    if not block:
+                        break
+                    written += len(block)
+                    if written > expected:
+                        break
+                    digest.update(block)
+                    f.write(block)
+
+            if written != expected or digest.hexdigest() != checksum:
+                os.truncate(data_path, offset)
+                if written != expected:
+                    raise UploadError(f'Chunk {index} must be {expected} bytes, got {written}')
+                raise UploadError(f'Checksum mismatch for chunk {index}')
+
+            meta['chunks'].append(checksum)
+            meta['received_bytes'] = offset + written
+            meta['updated_at'] = time.time()
+            self._save(meta)
+            return self._status(meta)
+
+    def complete(self, upload_id):
+        """Mark an upload as fully received"""
+        with self._lock(upload_id):
+            meta = self._load(upload_id)
+            if meta['received_bytes'] != meta['total_size']:
+                raise UploadError('Upload is incomplete', 409, next_chunk=len(meta['chunks']))
+            meta['complete'] = True
+            meta['updated_at'] = time.time()
+            self._save(meta)
+            return self._status(meta)
+
+    def claim(self, upload_id, prefix='uploaded'):
+        """Move a completed upload into upload storage for processing and forget it
+
+        Returns (path, original filename).
+        """
+        with self._lock(upload_id):
+            meta = self._load(upload_id)
+            if not meta['complete']:
+                raise UploadError('Upload is incomplete', 409, next_chunk=len(meta['chunks']))
+
+            path = storage.output_path(f"{prefix}_{uuid.uuid4()}_{meta['filename']}")
+            shutil.move(os.path.join(self._dir(upload_id), 'data.part'), path)
+
+        shutil.rmtree(self._dir(upload_id), ignore_errors=True)
+        return path, meta['filename']
+
+    def purge_expired(self):
+        """Remove uploads that have not been touched within the TTL"""
+        if not os.path.isdir(self.upload_dir):
+            return 0
+        removed = 0
+        cutoff = time.time() - self.ttl
+        for upload_id in os.listdir(self.upload_dir):
+            meta_path = os.path.join(self.upload_dir, upload_id, 'meta.json')
+            try:
+                if os.path.getmtime(meta_path) < cutoff:
+                    shutil.rmtree(os.path.join(self.upload_dir, upload_id), ignore_errors=True)
+                    removed += 1
+            except OSError:
+                continue
+        if removed:
+            logging.info(f"Purged {removed} expired chunked uploads")
+        return removed
+
+
+upload_store = ChunkedUploadStore()
@@ -0,0 +1,276 @@
+"""
+Response compression utilities for Toolora AI
+WSGI middleware that gzip- or brotli-compresses JSON, HTML and other text
+responses of selected blueprints, streaming chunk by chunk
+"""
+
+import re
+import time
+import zlib
+import threading
+
+from werkzeug.http import parse_accept_header
+
+from config import Config
+from utils.static_files import brotli
+
+ENVIRON_KEY = 'toolora.compression_min_size'
+
+# Only text-like bodies are compressed; PDF, audio, image, video and archive outputs never are
+COMPRESSIBLE_TYPES = re.compile(
+    r'^(text/|application/(json|javascript|xml|ld\+json|manifest\+json|[\w.+-]+\+(json|xml))|image/svg\+xml)'
+)
+
+# Compress whole bodies up to this size in one call and send a Content-Length;
+# larger or unsized bodies are streamed with chunked encoding
+BUFFER_LIMIT = 1024 * 1024
+
+
+def parse_blueprints(spec, default_min_size):
+    """'main,tools,api:512' -> {'main': default, 'tools': default, 'api': 512}"""
+    rules = {}
+    for item in spec.split(','):
+        name, _, min_size = item.strip().partition(':')
+        if name:
+            rules[name] = int(min_size) if min_size else default_min_size
+    return rules
+
+
+class _GzipEncoder:
+    def __init__(self, level):
+        # wbits 16 + MAX_WBITS writes a gzip header and trailer
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def process(self, data):
+        return self._compressor.compress(data)
+
+    def flush(self):
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class _BrotliEncoder:
+    def __init__(self, quality):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def process(self, data):
+        return self._compressor.process(data)
+
+    def flush(self):
+        return self._compressor.flush()
+
+    def finish(self):
+        return self._compressor.finish()
+
+
+class CompressionMiddleware:
+    """Compresses eligible responses of the wrapped WSGI app
+
+    A response is compressed when the Flask app marked its blueprint as
+    eligible (see ResponseCompression.init_app), the client accepts gzip
+    or br, the body is text-like and at least the blueprint's minimum
+    size, and it is not already encoded, a partial response, a download
+    attachment or a proxy-offloaded file. Strong ETags become weak, so
+    If-None-Match revalidation keeps working on the compressed form.
+    """
+
+    def __init__(self, wsgi_app, stats, gzip_level=None, brotli_quality=None):
+        self.wsgi_app = wsgi_app
+        self.stats = stats
+        self.gzip_level = gzip_level if gzip_level is not None else Config.COMPRESSION_GZIP_LEVEL
+        self.brotli_quality = brotli_quality if brotli_quality is not None else Config.COMPRESSION_BROTLI_QUALITY
+
+    def _encoding(self, environ):
+        accept = parse_accept_header(environ.get('HTTP_ACCEPT_ENCODING', ''))
+        if brotli is not None and accept['br'] and accept['br'] >= accept['gzip']:
+            return 'br'
+        if accept['gzip']:
+            return 'gzip'
+        return None
+
+    def _encoder(self, encoding):
+        if encoding == 'br':
+            return _BrotliEncoder(self.brotli_quality)
+        return _GzipEncoder(self.gzip_level)
+
+    def __call__(self, environ, start_response):
+        encoding = self._encoding(environ)
+        if encoding is None or environ.get('REQUEST_METHOD') == 'HEAD':
+            return self.wsgi_app(environ, start_response)
+
+        captured = {}
+        written = []
+
+        def capture(status, headers, exc_info=None):
+            captured['status'], captured['headers'], captured['exc_info'] = status, headers, exc_info
+            return written.append
+
+        body = self.wsgi_app(environ, capture)
+        status, headers = captured['status'], captured['headers']
+        min_size = environ.get(ENVIRON_KEY)
+        if min_size is None or not self._eligible(status, headers):
+            start_response(status, headers, captured['exc_info'])
+            return self._chain(written, body)
+
+        length = _header(headers, 'Content-Length')
+        length = int(length) if length and length.isdigit() else None
+        headers = self._vary(headers)
+        if length is not None and length < min_size:
+            self.stats.record('small')
+            start_response(status, headers, captured['exc_info'])
+            return self._chain(written, body)
+
+        headers = [(key, value) for key, value in headers if key.lower() != 'content-length']
+        headers = self._weaken_etag(headers)
+        headers.append(('Content-Encoding', encoding))
+
+        if length is not None and length <= BUFFER_LIMIT:
+            try:
+                data = b''.join(written) + b''.join(body)
+            finally:
+                if hasattr(body, 'close'):
+                    body.close()
+            start = time.perf_counter()
+            encoder = self._encoder(encoding)
+            compressed = encoder.process(data) + encoder.finish()
+            self.stats.record(encoding, len(data), len(compressed), time.perf_counter() - start)
+            headers.append(('Content-Length', str(len(compressed))))
+            start_response(status, headers, captured['exc_info'])
+            return [compressed]
+
+        start_response(status, headers, captured['exc_info'])
+        return self._stream(self._chain(written, body), self._encoder(encoding), encoding)
+
+    @staticmethod
+    def _eligible(status, headers):
+        code = int(status.split(' ', 1)[0])
+        if code < 200 or code in (204, 206, 304):
+            return False
+        if _header(headers, 'Content-Encoding') or _header(headers, 'Content-Range'):
+            return False
+        if _header(headers, 'X-Sendfile') or _header(headers, 'X-Accel-Redirect'):
+            return False
+        if 'no-transform' in (_header(headers, 'Cache-Control') or ''):
+            return False
+        if (_header(headers, 'Content-Disposition') or '').startswith('attachment'):
+            return False
+        return bool(COMPRESSIBLE_TYPES.match(_header(headers, 'Content-Type') or ''))
+
+    @staticmethod
+    def _vary(headers):
+        """Add Accept-Encoding to Vary: the body now depends on it, compressed or not"""
+        vary = _header(headers, 'Vary')
+        if vary and ('accept-encoding' in vary.lower() or vary.strip() == '*'):
+            return headers
+        headers = [(key, value) for key, value in headers if key.lower() != 'vary']
+        headers.append(('Vary', f'{vary}, Accept-Encoding' if vary else 'Accept-Encoding'))
+        return headers
+
+    @staticmethod
+    def _weaken_etag(headers):
+        return [(key, f'W/{value}' if key.lower() == 'etag' and not value.startswith('W/') else value)
+                for key, value in headers]
+
+    @staticmethod
+    def _chain(written, body):
+        if not written:
+            return body
+        return _ClosingIterator(written, body)
+
+    def _stream(self, body, encoder, encoding):
+        """Compress chunk by chunk, flushing after each so streamed output is not held back"""
+        size = compressed = 0
+        elapsed = 0.0
+        try:
+            for chunk in body:
+                if not chunk:
+                    continue
+                start = time.perf_counter()
+                data = encoder.process(chunk) + encoder.flush()
+                elapsed += time.perf_counter() - start
+                size += len(chunk)
+                compressed += len(data)
+                if data:
+                    yield data
+            start = time.perf_counter()
+            data = encoder.finish()
+            elapsed += time.perf_counter() - start
+            compressed += len(data)
+            if data:
+                yield data
+            self.stats.record(encoding, size, compressed, elapsed)
+        finally:
+            if hasattr(body, 'close'):
+                body.close()
+
+
+class _ClosingIterator:
+    """Bytes passed to the legacy write() callable, then the body, closing the body afterwards"""
+
+    def __init__(self, written, body):
+        self._written = written
+        self._body = body
+
+    def __iter__(self):
+        yield from self._written
+        yield from self._body
+
+    def close(self):
+        if hasattr(self._body, 'close'):
+            self._body.close()
+
+
+def _header(headers, name):
+    name = name.lower()
+    for key, value in headers:
+        if key.lower() == name:
+            return value
+    return None
+
+
+class ResponseCompression:
+    """Process-wide compression counters and the Flask hook choosing eligible blueprints"""
+
+    def __init__(self):
+        self.rules = {}
+        self._lock = threading.Lock()
+        self._counters = {'gzip': 0, 'br': 0, 'small': 0, 'bytes_in': 0, 'bytes_out': 0, 'seconds': 0.0}
+
+    def init_app(self, app, blueprints=None, min_size=None):
+        """Wrap app.wsgi_app; blueprints is a COMPRESSION_BLUEPRINTS-style spec"""
+        if not Config.COMPRESSION_ENABLED:
+            return
+        from flask import request
+
+        min_size = min_size if min_size is not None else Config.COMPRESSION_MIN_SIZE
+        self.rules = parse_blueprints(blueprints if blueprints is not None else Config.COMPRESSION_BLUEPRINTS,
+                                      min_size)
+
+        @app.after_request
+        def _mark_compressible(response):
+            rule = self.rules.get(request.blueprint)
+            if rule is not None:
+                request.environ[ENVIRON_KEY] = rule
+            return response
+
+        app.wsgi_app = CompressionMiddleware(app.wsgi_app, self)
+
+    def record(self, result, size=0, compressed=0, seconds=0.0):
+        with self._lock:
+            self._counters[result] += 1
+            self._counters['bytes_in'] += size
+            self._counters['bytes_out'] += compressed
+            self._counters['seconds'] += seconds
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+        stats['ratio'] = round(stats['bytes_out'] / stats['bytes_in'], 3) if stats['bytes_in'] else None
+        stats['seconds'] = round(stats['seconds'], 3)
+        stats['blueprints'] = self.rules
+        return stats
+
+
+compression = ResponseCompression()
@@ -0,0 +1,139 @@
+"""
+Database utilities for Toolora AI
+Engine options per backend, SQLite pragmas applied on every connection,
+and a serialized writer for batch and background writes
+"""
+
+import os
+import logging
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Non-POSIX platforms: in-process serialization only
+    fcntl = None
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from config import Config
+
+_state = threading.local()
+
+
+def is_sqlite(url):
+    return str(url).startswith('sqlite')
+
+
+def engine_options(database_url):
+    """SQLALCHEMY_ENGINE_OPTIONS for database_url"""
+    if is_sqlite(database_url):
+        # Local file: no stale connections to recycle or ping
+        return {'connect_args': {'timeout': Config.SQLITE_BUSY_TIMEOUT_MS / 1000, 'check_same_thread': False}}
+    return {'pool_recycle': 300, 'pool_pre_ping': True}
+
+
+def sqlite_pragmas():
+    return (
+        ('journal_mode', 'WAL'),
+        ('synchronous', Config.SQLITE_SYNCHRONOUS),
+        ('busy_timeout', Config.SQLITE_BUSY_TIMEOUT_MS),
+        ('cache_size', -Config.SQLITE_CACHE_SIZE_KB),
+        ('mmap_size', Config.SQLITE_MMAP_SIZE),
+        ('temp_store', 'MEMORY'),
+    )
+
+
+def configure_engine(engine):
+    """Apply the SQLite production settings to engine; other backends are left alone
+
+    Request sessions keep pysqlite's transaction handling: reads run outside
+    a transaction and BEGIN is issued just before the first write, which
+    then waits on busy_timeout for the write lock. An explicit DEFERRED
+    BEGIN would pin a WAL read snapshot that fails to upgrade with
+    "database is locked" as soon as another process commits. Inside
+    SerializedWriter.session() the transaction starts with BEGIN IMMEDIATE.
+    """
+    if not is_sqlite(engine.url) or getattr(engine, '_toolora_configured', False):
+        return engine
+
+    @event.listens_for(engine, 'connect')
+    def _on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma, value in sqlite_pragmas():
+                cursor.execute(f'PRAGMA {pragma}={value}')
+        finally:
+            cursor.close()
+
+    @event.listens_for(engine, 'begin')
+    def _on_begin(conn):
+        if getattr(_state, 'immediate', False):
+            conn.exec_driver_sql('BEGIN IMMEDIATE')
+
+    engine._toolora_configured = True
+    logging.info(f"SQLite {engine.url.database}: "
+                 + ', '.join(f'{name}={value}' for name, value in sqlite_pragmas()))
+    return engine
+
+
+class SerializedWriter:
+    """One write transaction at a time per database, across threads and processes
+
+    SQLite allows a single writer; left to the busy handler, concurrent
+    writers poll and can still time out under load. Writes made through
+    session() queue on a thread lock and an flock beside the database
+    file, then start with BEGIN IMMEDIATE so they never need a lock upgrade.
+    On other backends session() is a plain transactional session.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    def _lock_path(self, engine):
+        return os.path.abspath(engine.url.database) + '.writer.lock'
+
+    @contextmanager
+    def _file_lock(self, engine):
+        if fcntl is None or engine.url.database in (None, '', ':memory:'):
+            yield
+            return
+        with open(self._lock_path(engine), 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    @contextmanager
+    def session(self, engine=None):
+        """Yield a Session whose transaction commits on exit and rolls back on error"""
+        if engine is None:
+            from app import db
+            engine = db.engine
+
+        if not is_sqlite(engine.url):
+            with Session(bind=engine) as session, session.begin():
+                yield session
+            return
+
+        with self._lock, self._file_lock(engine):
+            session = Session(bind=engine)
+            try:
+                _state.immediate = True
+                try:
+                    session.connection()
+                finally:
+                    _state.immediate = False
+                yield session
+                session.commit()
+            except Exception:
+                session.rollback()
+                raise
+            finally:
+                session.close()
+
+
+db_writer = SerializedWriter()
+
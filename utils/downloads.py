@@ -0,0 +1,120 @@
+"""
+Download utilities for Toolora AI
+Serves processed files with byte ranges, strong ETags and zero-copy
+transfer, or hands the transfer off to a fronting proxy
+"""
+
+import os
+import hashlib
+import mimetypes
+
+from flask import request, Response
+from werkzeug.http import http_date, quote_etag
+
+from config import Config
+from utils.storage import storage
+
+BLOCK_SIZE = 256 * 1024
+
+
+def file_etag(path, stat=None):
+    """Strong ETag for a stored file
+
+    Processed files are written once under a unique name and never modified,
+    so inode, size and mtime identify the exact bytes.
+    """
+    stat = stat or os.stat(path)
+    digest = hashlib.sha1(f'{stat.st_ino}-{stat.st_size}-{stat.st_mtime_ns}'.encode()).hexdigest()
+    return digest[:32]
+
+
+def _read_range(path, start, length):
+    """Yield length bytes of path from start"""
+    with open(path, 'rb') as f:
+        f.seek(start)
+        while length > 0:
+            block = f.read(min(BLOCK_SIZE, length))
+            if not block:
+                break
+            length -= len(block)
+            yield block
+
+
+def _file_body(path, start, stop, size):
+    """Response body for bytes [start, stop) of path
+
+    Bodies that run to the end of the file use the server's
+    wsgi.file_wrapper from the seeked offset, which gunicorn turns into
+    sendfile(2); a bounded range in the middle of a file is streamed.
+    """
+    file_wrapper = request.environ.get('wsgi.file_wrapper')
+    if stop == size and file_wrapper is not None:
+        f = open(path, 'rb')
+        f.seek(start)
+        return file_wrapper(f, BLOCK_SIZE)
+    return _read_range(path, start, stop - start)
+
+
+def _offload_response(path, headers):
+    """Empty response telling the proxy to serve path itself"""
+    mode = Config.DOWNLOAD_OFFLOAD
+    if mode == 'x-accel-redirect':
+        relative_path = os.path.relpath(path, storage.root).replace(os.sep, '/')
+        headers['X-Accel-Redirect'] = Config.DOWNLOAD_ACCEL_PREFIX.rstrip('/') + '/' + relative_path
+    else:
+        headers['X-Sendfile'] = os.path.abspath(path)
+    return Response(status=200, headers=headers)
+
+
+def send_download(path, download_name=None):
+    """Return a download response for path honouring Range and conditional headers
+
+    Supports If-None-Match (304), single byte ranges with If-Range (206),
+    and 416 for unsatisfiable ranges. Multi-range requests get the whole
+    file. With DOWNLOAD_OFFLOAD set, the transfer is delegated to the proxy
+    through X-Sendfile or X-Accel-Redirect.
+    """
+    stat = os.stat(path)
+    size = stat.st_size
+    etag = file_etag(path, stat)
+    download_name = download_name or os.path.basename(path)
+    mimetype = mimetypes.guess_type(download_name)[0] or 'application/octet-stream'
+
+    headers = {
+        'ETag': quote_etag(etag),
+        'Last-Modified': http_date(stat.st_mtime),
+        'Cache-Control': f'private, max-age={Config.DOWNLOAD_MAX_AGE}, immutable',
+        'Accept-Ranges': 'bytes',
+        'Content-Type': mimetype,
+        'Content-Disposition': f'attachment; filename="{download_name}"'
+    }
+
+    if request.if_none_match.contains(etag):
+        headers.pop('Content-Type')
+        headers.pop('Content-Disposition')
+        return Response(status=304, headers=headers)
+
+    if Config.DOWNLOAD_OFFLOAD in ('x-sendfile', 'x-accel-redirect'):
+        return _offload_response(path, headers)
+
+    start, stop, status = 0, size, 200
+    byte_range = request.range
+    if_range = request.if_range
+    range_applies = byte_range is not None and (
+        not (if_range.etag or if_range.date) or if_range.etag == etag
+    )
+    if range_applies and len(byte_range.ranges) == 1:
+        bounds = byte_range.range_for_length(size)
+        if bounds is None:
+            headers['Content-Range'] = f'bytes */{size}'
+            headers.pop('Content-Disposition')
+            return Response(status=416, headers=headers)
+        start, stop = bounds
+        status = 206
+        headers['Content-Range'] = f'bytes {start}-{stop - 1}/{size}'
+
+    headers['Content-Length'] = str(stop - start)
+    if request.method == 'HEAD':
+        return Response(status=status, headers=headers)
+    return Response(_file_body(path, start, stop, size), status=status, headers=headers,
+                    direct_passthrough=True)
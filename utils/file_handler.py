@@ -4,6 +4,8 @@ import mimetypes
 from werkzeug.utils import secure_filename
 import qrcode
 
+from utils.storage import storage
+
 class FileHandler:
     """Utility class for handling file operations"""
     
@@ -83,9 +85,8 @@ class FileHandler:
         img = qr.make_image(fill_color="black", back_color="white")
         img = img.resize((size, size))
 
-        os.makedirs('uploads', exist_ok=True)
         output_filename = f"qr_code_{hash(content) % 10000}.{format.lower()}"
-        output_path = os.path.join('uploads', output_filename)
+        output_path = storage.output_path(output_filename)
 
         img.save(output_path)
         return output_path
\ No newline at end of file
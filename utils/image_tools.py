@@ -5,14 +5,24 @@ Handles image compression, resizing, format conversion, and other operations
 
 import os
 import uuid
-from PIL import Image, ImageEnhance, ImageFilter
 import tempfile
 import logging
 
+from utils.result_cache import cached
+from utils.storage import storage
+from utils.metrics import instrument_processor
+from utils.lazy_imports import lazy_import
+
+Image = lazy_import('PIL.Image')
+ImageEnhance = lazy_import('PIL.ImageEnhance')
+ImageFilter = lazy_import('PIL.ImageFilter')
+
+@instrument_processor
 class ImageProcessor:
     """Image processing utilities"""
     
     @staticmethod
+    @cached('image-compress')
     def compress_image(input_file, quality=85):
         """Compress image file"""
         try:
@@ -31,10 +41,7 @@ class ImageProcessor:
                     file_ext = '.jpg'
                 
                 output_filename = f"compressed_{uuid.uuid4()}{file_ext}"
-                output_path = os.path.join('uploads', output_filename)
-                
-                # Ensure uploads directory exists
-                os.makedirs('uploads', exist_ok=True)
+                output_path = storage.output_path(output_filename)
                 
                 # Save compressed image
                 img.save(output_path, 'JPEG', quality=quality, optimize=True)
@@ -52,6 +59,7 @@ class ImageProcessor:
             return None
     
     @staticmethod
+    @cached('image-resize')
     def resize_image(input_file, width=None, height=None, maintain_aspect=True):
         """Resize image file"""
         try:
@@ -75,10 +83,7 @@ class ImageProcessor:
                 # Generate output filename
                 file_ext = os.path.splitext(input_file)[1].lower()
                 output_filename = f"resized_{uuid.uuid4()}{file_ext}"
-                output_path = os.path.join('uploads', output_filename)
-                
-                # Ensure uploads directory exists
-                os.makedirs('uploads', exist_ok=True)
+                output_path = storage.output_path(output_filename)
                 
                 # Save resized image
                 resized_img.save(output_path)
@@ -96,6 +101,7 @@ class ImageProcessor:
             return None
     
     @staticmethod
+    @cached('image-convert')
     def convert_image(input_file, output_format='JPEG'):
         """Convert image to different format"""
         try:
@@ -118,10 +124,7 @@ class ImageProcessor:
                 
                 file_ext = format_extensions.get(output_format.upper(), '.jpg')
                 output_filename = f"converted_{uuid.uuid4()}{file_ext}"
-                output_path = os.path.join('uploads', output_filename)
-                
-                # Ensure uploads directory exists
-                os.makedirs('uploads', exist_ok=True)
+                output_path = storage.output_path(output_filename)
                 
                 # Save converted image
                 save_kwargs = {}
@@ -144,6 +147,7 @@ class ImageProcessor:
             return None
     
     @staticmethod
+    @cached('image-crop')
     def crop_image(input_file, left=0, top=0, right=None, bottom=None):
         """Crop image"""
         try:
@@ -162,10 +166,7 @@ class ImageProcessor:
                 # Generate output filename
                 file_ext = os.path.splitext(input_file)[1].lower()
                 output_filename = f"cropped_{uuid.uuid4()}{file_ext}"
-                output_path = os.path.join('uploads', output_filename)
-                
-                # Ensure uploads directory exists
-                os.makedirs('uploads', exist_ok=True)
+                output_path = storage.output_path(output_filename)
                 
                 # Save cropped image
                 cropped_img.save(output_path)
@@ -183,6 +184,7 @@ class ImageProcessor:
             return None
     
     @staticmethod
+    @cached('image-enhancer')
     def enhance_image(input_file, brightness=1.0, contrast=1.0, saturation=1.0, sharpness=1.0):
         """Enhance image with brightness, contrast, saturation, and sharpness"""
         try:
@@ -207,10 +209,7 @@ class ImageProcessor:
                 # Generate output filename
                 file_ext = os.path.splitext(input_file)[1].lower()
                 output_filename = f"enhanced_{uuid.uuid4()}{file_ext}"
-                output_path = os.path.join('uploads', output_filename)
-                
-                # Ensure uploads directory exists
-                os.makedirs('uploads', exist_ok=True)
+                output_path = storage.output_path(output_filename)
                 
                 # Save enhanced image
                 img.save(output_path)
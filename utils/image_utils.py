@@ -1,6 +1,9 @@
 import os
-from PIL import Image, ImageOps
 import io
+from utils.lazy_imports import lazy_import
+
+Image = lazy_import('PIL.Image')
+ImageOps = lazy_import('PIL.ImageOps')
 
 def compress_image(input_file, output_path, quality=80):
     """Compress image with specified quality"""
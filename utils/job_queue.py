@@ -0,0 +1,371 @@
+"""
+Background job queue for Toolora AI
+Runs file-processing tasks outside the request cycle using a SQLite-backed
+broker and a bounded process pool
+"""
+
+import os
+import json
+import time
+import uuid
+import sqlite3
+import logging
+import importlib
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from config import Config
+
+QUEUED = 'queued'
+RUNNING = 'running'
+FINISHED = 'finished'
+FAILED = 'failed'
+TERMINAL_STATES = (FINISHED, FAILED)
+
+
+class JobError(Exception):
+    """Raised by a task to mark its job as failed with a user-facing message"""
+
+
+class QueueFullError(Exception):
+    """Raised when the number of pending jobs exceeds JOB_MAX_PENDING"""
+
+
+def task_path(func):
+    """Return the importable 'module:qualname' path of a task function"""
+    return f"{func.__module__}:{func.__qualname__}"
+
+
+def _resolve_task(path):
+    """Import a task function from its 'module:qualname' path"""
+    module_name, qualname = path.split(':', 1)
+    target = importlib.import_module(module_name)
+    for attr in qualname.split('.'):
+        target = getattr(target, attr)
+    return target
+
+
+def _run_task(path, args, kwargs):
+    """Entry point executed inside a pool process"""
+    return _resolve_task(path)(*args, **kwargs)
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class JobQueue:
+    """SQLite-backed job queue with a per-process dispatcher thread"""
+
+    def __init__(self, db_path=None, max_workers=None, max_pending=None, timeout=None):
+        self.db_path = db_path or Config.JOB_DB_PATH
+        self.max_workers = max_workers or Config.JOB_WORKERS
+        self.max_pending = max_pending or Config.JOB_MAX_PENDING
+        self.timeout = timeout or Config.JOB_TIMEOUT
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._inflight = 0
+        self._executor = None
+        self._dispatcher = None
+        self._owner_pid = None
+        self._initialized = False
+        self._finish_hooks = []
+
+    # Storage
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _init_db(self):
+        if self._initialized:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    tool TEXT NOT NULL,
+                    task TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    result TEXT,
+                    error TEXT,
+                    worker_pid INTEGER,
+                    created_at REAL NOT NULL,
+                    started_at REAL,
+                    finished_at REAL
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS ix_jobs_status_created ON jobs (status, created_at)')
+        finally:
+            conn.close()
+        self._initialized = True
+
+    def _finish(self, job_id, status, result=None, error=None):
+        """Record a running job's outcome; a job already failed (e.g. timed out) keeps its state"""
+        conn = self._connect()
+        try:
+            updated = conn.execute(
+                'UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ? WHERE id = ? AND status = ?',
+                (status, json.dumps(result) if result is not None else None, error, time.time(), job_id, RUNNING)
+            ).rowcount
+        finally:
+            conn.close()
+
+        if updated and self._finish_hooks:
+            job = self.get(job_id)
+            for hook in self._finish_hooks:
+                try:
+                    hook(job)
+                except Exception as e:
+                    logging.error(f"Job finish hook error: {str(e)}")
+
+    # Public API
+
+    def submit(self, func, *args, tool=None, **kwargs):
+        """Queue func(*args, **kwargs) and return the new job id
+
+        Arguments must be JSON-serializable; func must be a module-level
+        function so pool processes can import it.
+        """
+        self._init_db()
+        job_id = uuid.uuid4().hex
+        payload = json.dumps({'args': list(args), 'kwargs': kwargs})
+
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            pending = conn.execute(
+                'SELECT COUNT(*) FROM jobs WHERE status IN (?, ?)', (QUEUED, RUNNING)
+            ).fetchone()[0]
+            if pending >= self.max_pending:
+                conn.execute('ROLLBACK')
+                raise QueueFullError(f'Job queue is full ({pending} pending)')
+            conn.execute(
+                'INSERT INTO jobs (id, tool, task, payload, status, created_at) VALUES (?, ?, ?, ?, ?, ?)',
+                (job_id, tool or func.__name__, task_path(func), payload, QUEUED, time.time())
+            )
+            conn.execute('COMMIT')
+        finally:
+            conn.close()
+
+        if Config.JOB_DISPATCH_IN_WEB:
+            self.start()
+        self._wakeup.set()
+        return job_id
+
+    def on_finish(self, func):
+        """Call func(job status dict) in the dispatching process whenever a job finishes or fails"""
+        if func not in self._finish_hooks:
+            self._finish_hooks.append(func)
+        return func
+
+    def get(self, job_id):
+        """Return the public status dict for a job, or None if unknown"""
+        self._init_db()
+        conn = self._connect()
+        try:
+            row = conn.execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        finally:
+            conn.close()
+
+        if row is None:
+            return None
+
+        job = {
+            'job_id': row['id'],
+            'tool': row['tool'],
+            'status': row['status'],
+            'created_at': row['created_at'],
+            'started_at': row['started_at'],
+            'finished_at': row['finished_at'],
+        }
+        if row['status'] == QUEUED:
+            job['position'] = self._queue_position(row['created_at'])
+        if row['result'] is not None:
+            job['result'] = json.loads(row['result'])
+        if row['error']:
+            job['error'] = row['error']
+        return job
+
+    def stats(self):
+        """Return job counts by status"""
+        self._init_db()
+        conn = self._connect()
+        try:
+            rows = conn.execute('SELECT status, COUNT(*) AS n FROM jobs GROUP BY status').fetchall()
+        finally:
+            conn.close()
+        counts = {QUEUED: 0, RUNNING: 0, FINISHED: 0, FAILED: 0}
+        counts.update({row['status']: row['n'] for row in rows})
+        counts['workers'] = self.max_workers
+        return counts
+
+    def _queue_position(self, created_at):
+        conn = self._connect()
+        try:
+            return conn.execute(
+                'SELECT COUNT(*) FROM jobs WHERE status = ? AND created_at < ?', (QUEUED, created_at)
+            ).fetchone()[0]
+        finally:
+            conn.close()
+
+    # Dispatching
+
+    def start(self):
+        """Start the dispatcher thread for this process (idempotent, fork-aware)"""
+        with self._lock:
+            if self._owner_pid == os.getpid() and self._dispatcher and self._dispatcher.is_alive():
+                return
+            self._init_db()
+            self._owner_pid = os.getpid()
+            self._inflight = 0
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            self._dispatcher = threading.Thread(target=self._dispatch_loop, name='job-dispatcher', daemon=True)
+            self._dispatcher.start()
+
+    def _claim_next(self):
+        """Atomically move the oldest queued job to running and return it
+
+        Returns None while max_workers jobs are already running anywhere, so
+        the cap holds across every process dispatching from this database.
+        """
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            running = conn.execute('SELECT COUNT(*) FROM jobs WHERE status = ?', (RUNNING,)).fetchone()[0]
+            if running >= self.max_workers:
+                conn.execute('COMMIT')
+                return None
+            row = conn.execute(
+                'SELECT id, task, payload FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1', (QUEUED,)
+            ).fetchone()
+            if row is None:
+                conn.execute('COMMIT')
+                return None
+            conn.execute(
+                'UPDATE jobs SET status = ?, started_at = ?, worker_pid = ? WHERE id = ?',
+                (RUNNING, time.time(), os.getpid(), row['id'])
+            )
+            conn.execute('COMMIT')
+            return row
+        finally:
+            conn.close()
+
+    def _expire_stale(self):
+        """Fail jobs running longer than JOB_TIMEOUT or owned by a process that has exited"""
+        conn = self._connect()
+        try:
+            conn.execute(
+                'UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE status = ? AND started_at < ?',
+                (FAILED, 'Job timed out', time.time(), RUNNING, time.time() - self.timeout)
+            )
+            pids = [row[0] for row in conn.execute(
+                'SELECT DISTINCT worker_pid FROM jobs WHERE status = ? AND worker_pid IS NOT NULL', (RUNNING,)
+            )]
+            for pid in pids:
+                if not _pid_alive(pid):
+                    conn.execute(
+                        'UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE status = ? AND worker_pid = ?',
+                        (FAILED, 'Worker exited', time.time(), RUNNING, pid)
+                    )
+        finally:
+            conn.close()
+
+    def _requeue(self, job_id):
+        conn = self._connect()
+        try:
+            conn.execute('UPDATE jobs SET status = ?, started_at = NULL, worker_pid = NULL WHERE id = ?',
+                         (QUEUED, job_id))
+        finally:
+            conn.close()
+
+    def _reset_executor(self, broken):
+        """Replace a broken process pool (a child was killed, e.g. by the OOM killer)
+
+        Every future of a broken pool fails at once; only the first to report
+        it replaces the pool, so the fresh one and its jobs are left alone.
+        """
+        with self._lock:
+            if self._executor is not broken:
+                return
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def _dispatch_loop(self):
+        last_expiry = 0
+        while True:
+            try:
+                if time.time() - last_expiry > 60:
+                    self._expire_stale()
+                    last_expiry = time.time()
+
+                while self._inflight < self.max_workers:
+                    row = self._claim_next()
+                    if row is None:
+                        break
+                    self._execute(row)
+            except Exception as e:
+                logging.error(f"Job dispatcher error: {str(e)}")
+
+            self._wakeup.wait(timeout=1.0)
+            self._wakeup.clear()
+
+    def _execute(self, row):
+        payload = json.loads(row['payload'])
+        with self._lock:
+            self._inflight += 1
+            executor = self._executor
+        try:
+            future = executor.submit(_run_task, row['task'], payload['args'], payload['kwargs'])
+        except Exception as e:
+            # The pool broke under an earlier job; this one never ran, so it goes back in line
+            logging.error(f"Job {row['id']} could not be submitted: {str(e)}")
+            with self._lock:
+                self._inflight -= 1
+            self._requeue(row['id'])
+            self._reset_executor(executor)
+            return
+        future.add_done_callback(lambda f, job_id=row['id']: self._on_done(job_id, f, executor))
+
+    def _on_done(self, job_id, future, executor):
+        try:
+            self._finish(job_id, FINISHED, result=future.result())
+        except JobError as e:
+            self._finish(job_id, FAILED, error=str(e))
+        except BrokenProcessPool:
+            logging.error(f"Job {job_id} failed: worker process died")
+            self._finish(job_id, FAILED, error='Processing failed')
+            self._reset_executor(executor)
+        except Exception as e:
+            logging.error(f"Job {job_id} failed: {str(e)}")
+            self._finish(job_id, FAILED, error='Processing failed')
+        finally:
+            with self._lock:
+                self._inflight -= 1
+            self._wakeup.set()
+
+
+job_queue = JobQueue()
+
+
+if __name__ == '__main__':
+    # Standalone worker: python -m utils.job_queue
+    from app import create_app
+
+    logging.basicConfig(level=logging.INFO)
+    logging.info(f"Starting job worker with {job_queue.max_workers} processes")
+    create_app(profile='worker')  # starts the dispatcher and the storage sweeper
+    while True:
+        time.sleep(3600)
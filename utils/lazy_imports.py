@@ -0,0 +1,113 @@
+"""
+Lazy import utilities for Toolora AI
+Defers the heavy processing libraries (PyPDF2, Pillow, reportlab, qrcode,
+PyMuPDF) until a processor first uses them, so workers that only render
+pages never pay for them, and optionally preloads them in the gunicorn master
+"""
+
+import sys
+import time
+import types
+import logging
+import importlib
+import threading
+
+# Imported by preload(); also the modules bench_imports reports on
+HEAVY_MODULES = (
+    'PyPDF2',
+    'PIL.Image',
+    'PIL.ImageOps',
+    'PIL.ImageEnhance',
+    'PIL.ImageFilter',
+    'PIL.ImageDraw',
+    'PIL.ImageFont',
+    'reportlab.pdfgen.canvas',
+    'reportlab.lib.pagesizes',
+    'reportlab.lib.styles',
+    'reportlab.platypus',
+    'qrcode',
+    'qrcode.image.styledpil',
+    'fitz',
+    'utils.pdf_merge',
+)
+
+_modules = {}
+_import_times = {}
+_lock = threading.Lock()
+# One lock per module name, held across its import: a module whose import
+# triggers another lazy import (utils.pdf_merge -> PyPDF2) takes a different
+# lock, and RLock lets an import that re-enters its own name proceed
+_load_locks = {}
+
+
+class LazyModule(types.ModuleType):
+    """Stand-in for a module that is imported on first attribute access
+
+    Used at module level in place of `import X` / `from X import Y`:
+    `Image = lazy_import('PIL.Image')` then `Image.open(...)` as before.
+    A missing library raises ImportError at that first use, inside the
+    processor's own error handling, rather than when the app boots.
+    """
+
+    def __getattr__(self, name):
+        return getattr(_load(self.__name__), name)
+
+    def __repr__(self):
+        state = 'loaded' if self.__name__ in _import_times else 'not loaded'
+        return f'<lazy module {self.__name__!r} ({state})>'
+
+
+def lazy_import(name):
+    """LazyModule for the dotted module name, shared by every caller"""
+    with _lock:
+        module = _modules.get(name)
+        if module is None:
+            module = _modules[name] = LazyModule(name)
+        return module
+
+
+def _load(name):
+    module = sys.modules.get(name)
+    if module is not None and name in _import_times:
+        return module
+    with _lock:
+        load_lock = _load_locks.setdefault(name, threading.RLock())
+    with load_lock:
+        if name not in _import_times:
+            already_imported = name in sys.modules
+            start = time.perf_counter()
+            module = importlib.import_module(name)
+            _import_times[name] = 0.0 if already_imported else time.perf_counter() - start
+            logging.debug(f"Lazy import of {name} took {_import_times[name] * 1000:.1f}ms")
+        return sys.modules[name]
+
+
+def is_loaded(name):
+    return name in sys.modules
+
+
+def import_times():
+    """{module name: seconds its first use spent importing it}"""
+    return dict(_import_times)
+
+
+def preload(names=HEAVY_MODULES):
+    """Import names now; returns {name: seconds}, skipping libraries that are not installed
+
+    Called from the gunicorn master (see gunicorn.conf.py) so forked workers
+    share the imported modules copy-on-write instead of each importing them.
+    """
+    timings = {}
+    for name in names:
+        try:
+            start = time.perf_counter()
+            _load(name)
+            timings[name] = time.perf_counter() - start
+        except ImportError as e:
+            logging.info(f"Preload skipped {name}: {str(e)}")
+    return timings
+
+
+if __name__ == '__main__':
+    for name, seconds in preload().items():
+        print(f'{seconds * 1000:8.1f}ms  {name}')
@@ -0,0 +1,307 @@
+"""
+Metrics utilities for Toolora AI
+Records per-route and per-processor latency, size and error histograms and
+exposes them in the Prometheus text format at /metrics
+"""
+
+import os
+import re
+import time
+import atexit
+import sqlite3
+import logging
+import functools
+import threading
+
+from config import Config
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+SIZE_BUCKETS = tuple(1024 * 4 ** i for i in range(11))  # 1KB .. 1GB
+
+# name -> (type, help)
+METRICS = {
+    'toolora_http_request_duration_seconds': ('histogram', 'Request latency by endpoint'),
+    'toolora_http_request_bytes': ('histogram', 'Request body size by endpoint'),
+    'toolora_http_response_bytes': ('histogram', 'Response body size by endpoint'),
+    'toolora_http_errors_total': ('counter', 'Responses with a 5xx status by endpoint'),
+    'toolora_processor_duration_seconds': ('histogram', 'Processor call latency by tool'),
+    'toolora_processor_input_bytes': ('histogram', 'Total input file size by tool'),
+    'toolora_processor_output_bytes': ('histogram', 'Total output file size by tool'),
+    'toolora_processor_errors_total': ('counter', 'Processor calls that raised or returned no result'),
+    'toolora_page_cache_requests_total': ('counter', 'Cached page lookups by route and result'),
+}
+
+
+def _format_labels(labels):
+    """Render labels as a canonical Prometheus label string"""
+    parts = []
+    for key in sorted(labels):
+        value = str(labels[key]).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        parts.append(f'{key}="{value}"')
+    return ','.join(parts)
+
+
+def _format_le(bound):
+    return '+Inf' if bound == float('inf') else repr(float(bound))
+
+
+def _paths_size(value):
+    """Total size of the existing files named by a path or list of paths"""
+    paths = value if isinstance(value, (list, tuple)) else [value]
+    total = 0
+    for path in paths:
+        if isinstance(path, str) and os.path.isfile(path):
+            total += os.path.getsize(path)
+    return total
+
+
+class MetricsRegistry:
+    """Process-local metric buffer flushed into a SQLite store shared by all processes
+
+    Web workers and job-queue pool processes each buffer increments in
+    memory and add them to the shared totals at most every
+    METRICS_FLUSH_INTERVAL seconds, so /metrics reports the whole
+    deployment without an external collector.
+    """
+
+    def __init__(self, db_path=None, flush_interval=None):
+        self.db_path = db_path or Config.METRICS_DB_PATH
+        self.flush_interval = flush_interval if flush_interval is not None else Config.METRICS_FLUSH_INTERVAL
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._pid = os.getpid()
+        self._last_flush = time.time()
+        self._initialized = False
+        atexit.register(self.flush)
+
+    # Storage
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _init_db(self):
+        if self._initialized:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS samples (
+                    name TEXT NOT NULL,
+                    labels TEXT NOT NULL,
+                    le TEXT NOT NULL,
+                    value REAL NOT NULL,
+                    PRIMARY KEY (name, labels, le)
+                )
+            ''')
+        finally:
+            conn.close()
+        self._initialized = True
+
+    # Recording
+
+    def _add(self, name, labels, le, amount):
+        if self._pid != os.getpid():
+            # Forked child: the parent flushes what it buffered
+            self._pending = {}
+            self._pid = os.getpid()
+        key = (name, labels, le)
+        self._pending[key] = self._pending.get(key, 0) + amount
+
+    def observe(self, name, labels, value, buckets=LATENCY_BUCKETS):
+        """Record one histogram observation"""
+        labels = _format_labels(labels)
+        with self._lock:
+            for bound in buckets + (float('inf'),):
+                if value <= bound:
+                    self._add(name, labels, _format_le(bound), 1)
+            self._add(name, labels, 'sum', value)
+            self._add(name, labels, 'count', 1)
+        self._maybe_flush()
+
+    def inc(self, name, labels, amount=1):
+        """Increment a counter"""
+        with self._lock:
+            self._add(name, _format_labels(labels), '', amount)
+        self._maybe_flush()
+
+    def _maybe_flush(self):
+        if time.time() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """Add buffered increments to the shared store"""
+        with self._lock:
+            if self._pid != os.getpid():
+                self._pending = {}
+                self._pid = os.getpid()
+            pending, self._pending = self._pending, {}
+            self._last_flush = time.time()
+        if not pending:
+            return
+
+        try:
+            self._init_db()
+            conn = self._connect()
+            try:
+                conn.execute('BEGIN IMMEDIATE')
+                conn.executemany(
+                    'INSERT INTO samples (name, labels, le, value) VALUES (?, ?, ?, ?) '
+                    'ON CONFLICT (name, labels, le) DO UPDATE SET value = value + excluded.value',
+                    [(name, labels, le, value) for (name, labels, le), value in pending.items()]
+                )
+                conn.execute('COMMIT')
+            finally:
+                conn.close()
+        except Exception as e:
+            logging.error(f"Metrics flush error: {str(e)}")
+
+    def _rows(self):
+        self.flush()
+        self._init_db()
+        conn = self._connect()
+        try:
+            return conn.execute('SELECT name, labels, le, value FROM samples').fetchall()
+        finally:
+            conn.close()
+
+    # Exposition
+
+    def render(self):
+        """Return all metrics in the Prometheus text exposition format"""
+        series = {}
+        for row in self._rows():
+            series.setdefault(row['name'], {}).setdefault(row['labels'], {})[row['le']] = row['value']
+
+        lines = []
+        for name, (metric_type, help_text) in METRICS.items():
+            if name not in series:
+                continue
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {metric_type}')
+            for labels, values in sorted(series[name].items()):
+                if metric_type == 'counter':
+                    lines.append(f'{name}{{{labels}}} {values[""]:g}')
+                    continue
+                sep = ',' if labels else ''
+                buckets = sorted((float(le), value) for le, value in values.items() if le not in ('sum', 'count'))
+                for bound, value in buckets:
+                    lines.append(f'{name}_bucket{{{labels}{sep}le="{_format_le(bound)}"}} {value:g}')
+                lines.append(f'{name}_sum{{{labels}}} {values.get("sum", 0):g}')
+                lines.append(f'{name}_count{{{labels}}} {values.get("count", 0):g}')
+        return '\n'.join(lines) + '\n'
+
+    def summary(self, name='toolora_processor_duration_seconds', label='tool', quantiles=(0.5, 0.99)):
+        """Estimate quantiles of a histogram per value of label, as Prometheus' histogram_quantile does"""
+        label_pattern = re.compile(rf'(?:^|,){label}="((?:[^"\\]|\\.)*)"')
+        series = {}
+        for row in self._rows():
+            if row['name'] != name or row['le'] in ('sum', 'count'):
+                continue
+            match = label_pattern.search(row['labels'])
+            buckets = series.setdefault(match.group(1) if match else '', {})
+            bound = float(row['le'])
+            buckets[bound] = buckets.get(bound, 0) + row['value']
+
+        result = {}
+        for key, buckets in sorted(series.items()):
+            buckets = sorted(buckets.items())
+            total = buckets[-1][1]
+            estimates = {'count': int(total)}
+            for q in quantiles:
+                rank = q * total
+                lower_bound, lower_count = 0.0, 0
+                for bound, count in buckets:
+                    if count >= rank:
+                        if bound == float('inf'):
+                            estimate = lower_bound
+                        else:
+                            fraction = (rank - lower_count) / (count - lower_count) if count > lower_count else 1
+                            estimate = lower_bound + (bound - lower_bound) * fraction
+                        break
+                    lower_bound, lower_count = bound, count
+                estimates[f'p{int(q * 100)}'] = round(estimate, 4)
+            result[key] = estimates
+        return result
+
+    # Flask integration
+
+    def init_app(self, app):
+        """Time every request and serve /metrics"""
+        if not Config.METRICS_ENABLED:
+            return
+        from flask import g, request, Response
+
+        @app.before_request
+        def _start_timer():
+            g.metrics_start = time.perf_counter()
+
+        @app.after_request
+        def _record_request(response):
+            start = g.pop('metrics_start', None)
+            if start is None:
+                return response
+            endpoint = request.endpoint or 'unmatched'
+            self.observe('toolora_http_request_duration_seconds',
+                         {'endpoint': endpoint, 'method': request.method, 'status': response.status_code},
+                         time.perf_counter() - start)
+            if request.content_length:
+                self.observe('toolora_http_request_bytes', {'endpoint': endpoint},
+                             request.content_length, SIZE_BUCKETS)
+            if response.content_length is not None:
+                self.observe('toolora_http_response_bytes', {'endpoint': endpoint},
+                             response.content_length, SIZE_BUCKETS)
+            if response.status_code >= 500:
+                self.inc('toolora_http_errors_total', {'endpoint': endpoint})
+            return response
+
+        def metrics_view():
+            return Response(self.render(), mimetype='text/plain; version=0.0.4')
+
+        app.add_url_rule('/metrics', 'metrics', metrics_view)
+
+
+metrics = MetricsRegistry()
+
+
+def instrument_processor(cls):
+    """Class decorator timing every static processor method
+
+    Records latency, total input and output file sizes, and errors (an
+    exception or a None/False result) labelled tool="<Class>.<method>".
+    """
+    for name, attr in list(vars(cls).items()):
+        if isinstance(attr, staticmethod) and not name.startswith('_'):
+            setattr(cls, name, staticmethod(_instrument(f'{cls.__name__}.{name}', attr.__func__)))
+    return cls
+
+
+def _instrument(tool, func):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not Config.METRICS_ENABLED:
+            return func(*args, **kwargs)
+
+        labels = {'tool': tool}
+        input_bytes = sum(_paths_size(value) for value in list(args) + list(kwargs.values()))
+        start = time.perf_counter()
+        result = None
+        try:
+            result = func(*args, **kwargs)
+            return result
+        finally:
+            metrics.observe('toolora_processor_duration_seconds', labels, time.perf_counter() - start)
+            if input_bytes:
+                metrics.observe('toolora_processor_input_bytes', labels, input_bytes, SIZE_BUCKETS)
+            if result is None or result is False:
+                metrics.inc('toolora_processor_errors_total', labels)
+            else:
+                output_bytes = _paths_size(result)
+                if output_bytes:
+                    metrics.observe('toolora_processor_output_bytes', labels, output_bytes, SIZE_BUCKETS)
+            # Processor calls are rare and slow next to a flush; keep /metrics current
+            metrics.flush()
+    return wrapper
@@ -6,122 +6,144 @@ Generates social media preview images with the new logo
 from PIL import Image, ImageDraw, ImageFont
 import os
 import io
+import json
 import base64
+import hashlib
+import functools
 
-def generate_og_image(title, description="Professional tools for creators", tool_category=None):
-    """
-    Generate OG image with enhanced Toolora branding
-    """
-    # Image dimensions for social media
-    width, height = 1200, 630
-    
-    # Create image with gradient background
-    img = Image.new('RGB', (width, height), color='#1a1a1a')
-    draw = ImageDraw.Draw(img)
-    
-    # Create gradient background
-    for y in range(height):
-        gradient_ratio = y / height
-        r = int(139 * (1 - gradient_ratio) + 16 * gradient_ratio)  # Purple to dark
-        g = int(92 * (1 - gradient_ratio) + 185 * gradient_ratio)   # Purple to emerald
-        b = int(246 * (1 - gradient_ratio) + 129 * gradient_ratio)  # Purple to emerald
-        
-        color = (r, g, b)
-        draw.line([(0, y), (width, y)], fill=color)
-    
-    # Add subtle pattern overlay
-    for x in range(0, width, 40):
-        for y in range(0, height, 40):
-            draw.ellipse([x, y, x+2, y+2], fill=(255, 255, 255, 20))
-    
-    # Load or create logo
+OG_WIDTH, OG_HEIGHT = 1200, 630
+
+# Gradient endpoints: purple at the top fading to emerald at the bottom
+GRADIENT_TOP = (139, 92, 246)
+GRADIENT_BOTTOM = (16, 185, 129)
+
+LOGO_SIZE = 120
+LOGO_X = 60
+LOGO_Y = 60
+
+_base_layer = None
+
+
+@functools.lru_cache(maxsize=None)
+def _load_font(size):
+    """Load (once per size) the branding font, falling back to Pillow's default"""
     try:
-        logo_path = os.path.join('static', 'images', 'toolora-logo.svg')
-        if os.path.exists(logo_path):
-            # In a real implementation, you'd convert SVG to PIL Image
-            # For now, we'll create a simple logo representation
-            pass
-    except:
-        pass
-    
-    # Create logo representation
-    logo_size = 120
-    logo_x = 60
-    logo_y = 60
-    
+        return ImageFont.truetype("Arial", size)
+    except OSError:
+        return ImageFont.load_default()
+
+
+def _build_base_layer():
+    """Render everything that is identical across OG images: gradient, dots and logo"""
+    # Vertical gradient as one composite over a stretched 0..255 ramp
+    mask = Image.linear_gradient('L').resize((OG_WIDTH, OG_HEIGHT), Image.BILINEAR)
+    img = Image.composite(Image.new('RGB', (OG_WIDTH, OG_HEIGHT), GRADIENT_BOTTOM),
+                          Image.new('RGB', (OG_WIDTH, OG_HEIGHT), GRADIENT_TOP), mask)
+
+    # Subtle dot pattern: draw one 40x40 tile and repeat it across the canvas
+    tile = Image.new('L', (40, 40), 0)
+    ImageDraw.Draw(tile).ellipse([0, 0, 2, 2], fill=255)
+    dots = Image.new('L', (OG_WIDTH, OG_HEIGHT), 0)
+    for x in range(0, OG_WIDTH, 40):
+        for y in range(0, OG_HEIGHT, 40):
+            dots.paste(tile, (x, y))
+    img.paste((255, 255, 255), mask=dots)
+
+    draw = ImageDraw.Draw(img)
+
     # Draw logo background with gradient effect
-    draw.ellipse([logo_x, logo_y, logo_x + logo_size, logo_y + logo_size], 
+    draw.ellipse([LOGO_X, LOGO_Y, LOGO_X + LOGO_SIZE, LOGO_Y + LOGO_SIZE],
                 fill=(255, 255, 255, 250))
-    
+
     # Create gradient-like effect for T letter
     colors = [
         (16, 185, 129),   # Emerald
-        (6, 182, 212),    # Cyan  
+        (6, 182, 212),    # Cyan
         (139, 92, 246)    # Purple
     ]
-    
+
     t_size = 80
-    t_x = logo_x + (logo_size - t_size) // 2
-    t_y = logo_y + (logo_size - t_size) // 2
-    
+    t_x = LOGO_X + (LOGO_SIZE - t_size) // 2
+    t_y = LOGO_Y + (LOGO_SIZE - t_size) // 2
+
     # Draw T with gradient effect (multiple overlapping rectangles)
     for i, color in enumerate(colors):
         offset = i * 2
         opacity = 255 - (i * 50)
-        
+
         # T horizontal bar with gradient
-        draw.rectangle([t_x - offset, t_y - offset, t_x + t_size + offset, t_y + 18 + offset], 
+        draw.rectangle([t_x - offset, t_y - offset, t_x + t_size + offset, t_y + 18 + offset],
                       fill=color + (opacity,))
         # T vertical bar with gradient
-        draw.rectangle([t_x + t_size//2 - 12 - offset, t_y - offset, 
-                       t_x + t_size//2 + 12 + offset, t_y + t_size + offset], 
+        draw.rectangle([t_x + t_size//2 - 12 - offset, t_y - offset,
+                       t_x + t_size//2 + 12 + offset, t_y + t_size + offset],
                       fill=color + (opacity,))
-    
+
     # Add subtle glow effect
-    draw.ellipse([logo_x - 5, logo_y - 5, logo_x + logo_size + 5, logo_y + logo_size + 5], 
+    draw.ellipse([LOGO_X - 5, LOGO_Y - 5, LOGO_X + LOGO_SIZE + 5, LOGO_Y + LOGO_SIZE + 5],
                 fill=(139, 92, 246, 30))
-    
-    # Add title text
-    try:
-        title_font = ImageFont.truetype("Arial", 64)
-        subtitle_font = ImageFont.truetype("Arial", 36)
-    except:
-        title_font = ImageFont.load_default()
-        subtitle_font = ImageFont.load_default()
-    
+
+    # Add bottom branding
+    draw.text((60, OG_HEIGHT - 60), "Toolora AI - Professional Tools Platform",
+              fill=(160, 160, 160), font=_load_font(36))
+
+    return img
+
+
+def get_base_layer():
+    """Return the shared background layer, building it on first use"""
+    global _base_layer
+    if _base_layer is None:
+        _base_layer = _build_base_layer()
+    return _base_layer
+
+
+def generate_og_image(title, description="Professional tools for creators", tool_category=None):
+    """
+    Generate OG image with enhanced Toolora branding
+
+    Only the title, description and category badge are drawn per call; the
+    background, pattern, logo and footer come from the cached base layer.
+    """
+    img = get_base_layer().copy()
+    draw = ImageDraw.Draw(img)
+
+    title_font = _load_font(64)
+    subtitle_font = _load_font(36)
+
     # Title
-    title_x = logo_x + logo_size + 40
-    title_y = logo_y + 10
+    title_x = LOGO_X + LOGO_SIZE + 40
+    title_y = LOGO_Y + 10
     draw.text((title_x, title_y), title, fill=(255, 255, 255), font=title_font)
-    
+
     # Subtitle
     draw.text((title_x, title_y + 80), description, fill=(200, 200, 200), font=subtitle_font)
-    
+
     # Add category badge if provided
     if tool_category:
         badge_x = title_x
         badge_y = title_y + 140
         badge_width = 200
         badge_height = 40
-        
+
         # Badge background
-        draw.rounded_rectangle([badge_x, badge_y, badge_x + badge_width, badge_y + badge_height], 
+        draw.rounded_rectangle([badge_x, badge_y, badge_x + badge_width, badge_y + badge_height],
                              radius=20, fill=(6, 182, 212))
-        
+
         # Badge text
-        draw.text((badge_x + 20, badge_y + 8), tool_category.title(), 
+        draw.text((badge_x + 20, badge_y + 8), tool_category.title(),
                  fill=(255, 255, 255), font=subtitle_font)
-    
-    # Add bottom branding
-    brand_text = "Toolora AI - Professional Tools Platform"
-    brand_y = height - 60
-    draw.text((60, brand_y), brand_text, fill=(160, 160, 160), font=subtitle_font)
-    
+
     return img
 
-def save_og_image(img, filename):
+OG_DIR = os.path.join('static', 'images', 'og')
+MANIFEST_NAME = 'manifest.json'
+
+# Bump whenever the rendering changes so pre-rendered images are rebuilt
+OG_GENERATOR_VERSION = 2
+
+def save_og_image(img, filename, og_dir=OG_DIR):
     """Save OG image to static folder"""
-    og_dir = os.path.join('static', 'images', 'og')
     os.makedirs(og_dir, exist_ok=True)
     
     filepath = os.path.join(og_dir, filename)
@@ -129,22 +151,108 @@ def save_og_image(img, filename):
     
     return filepath
 
+def tool_og_spec(tool_name, category):
+    """Filename and text of a tool's OG image"""
+    return {
+        'filename': f"{tool_name}-og.png",
+        'title': tool_name.replace('-', ' ').title(),
+        'description': f"Professional {category} tool - Free online",
+        'category': category
+    }
+
+def category_og_spec(category_name, tool_count, display_name=None):
+    """Filename and text of a category's OG image"""
+    return {
+        'filename': f"{category_name}-category-og.png",
+        'title': f"{display_name or category_name} Tools",
+        'description': f"{tool_count} professional tools available",
+        'category': category_name
+    }
+
+def spec_hash(spec):
+    """Content hash of everything that determines an OG image's pixels"""
+    payload = json.dumps([spec['title'], spec['description'], spec['category'], OG_GENERATOR_VERSION])
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+def render_spec(spec, og_dir=OG_DIR):
+    """Render and save one OG image; returns (filename, hash)"""
+    img = generate_og_image(spec['title'], spec['description'], spec['category'])
+    save_og_image(img, spec['filename'], og_dir)
+    return spec['filename'], spec_hash(spec)
+
 def generate_tool_og_image(tool_name, category):
     """Generate OG image for specific tool"""
-    title = tool_name.replace('-', ' ').title()
-    description = f"Professional {category} tool - Free online"
-    
-    img = generate_og_image(title, description, category)
-    filename = f"{tool_name}-og.png"
-    
-    return save_og_image(img, filename)
+    spec = tool_og_spec(tool_name, category)
+    return os.path.join(OG_DIR, render_spec(spec)[0])
 
-def generate_category_og_image(category_name, tool_count):
+def generate_category_og_image(category_name, tool_count, display_name=None):
     """Generate OG image for tool category"""
-    title = f"{category_name} Tools"
-    description = f"{tool_count} professional tools available"
-    
-    img = generate_og_image(title, description, category_name)
-    filename = f"{category_name}-category-og.png"
-    
-    return save_og_image(img, filename)
\ No newline at end of file
+    spec = category_og_spec(category_name, tool_count, display_name)
+    return os.path.join(OG_DIR, render_spec(spec)[0])
+
+# Bulk pre-rendering
+
+def all_og_specs():
+    """Specs for every tool and category in Config.TOOL_CATEGORIES"""
+    from config import Config
+
+    specs = []
+    for category_id, category_data in Config.TOOL_CATEGORIES.items():
+        specs.append(category_og_spec(category_id, len(category_data['tools']), category_data['name']))
+        specs.extend(tool_og_spec(tool_name, category_id) for tool_name in category_data['tools'])
+    return specs
+
+def load_manifest(og_dir=OG_DIR):
+    """Return {filename: content hash} of pre-rendered images"""
+    try:
+        with open(os.path.join(og_dir, MANIFEST_NAME)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def prerender_og_images(og_dir=OG_DIR, workers=None, force=False):
+    """Render every tool and category OG image whose inputs changed
+
+    Unchanged images (same title, description, category and generator
+    version, and still on disk) are skipped using the manifest of content
+    hashes; the rest are rendered in parallel across a process pool.
+    Returns a dict of counts.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    os.makedirs(og_dir, exist_ok=True)
+    manifest = {} if force else load_manifest(og_dir)
+    specs = all_og_specs()
+    stale = [spec for spec in specs
+             if manifest.get(spec['filename']) != spec_hash(spec)
+             or not os.path.exists(os.path.join(og_dir, spec['filename']))]
+
+    if stale:
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+            for filename, content_hash in executor.map(render_spec, stale, [og_dir] * len(stale)):
+                manifest[filename] = content_hash
+
+    current = {spec['filename'] for spec in specs}
+    manifest = {filename: content_hash for filename, content_hash in manifest.items() if filename in current}
+    tmp_path = os.path.join(og_dir, f'{MANIFEST_NAME}.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, os.path.join(og_dir, MANIFEST_NAME))
+
+    return {'total': len(specs), 'rendered': len(stale), 'skipped': len(specs) - len(stale)}
+
+
+if __name__ == '__main__':
+    # Build step: python -m utils.og_generator [--force] [--workers N]
+    import time
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Pre-render OG images for all tools and categories')
+    parser.add_argument('--force', action='store_true', help='re-render even if unchanged')
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    start = time.time()
+    result = prerender_og_images(workers=args.workers, force=args.force)
+    print(f"OG images: {result['rendered']} rendered, {result['skipped']} unchanged "
+          f"of {result['total']} in {time.time() - start:.1f}s")
@@ -0,0 +1,232 @@
+"""
+Page cache utilities for Toolora AI
+Serves rendered HTML pages from a per-process LRU, backed by an optional
+on-disk tier shared by all workers, with ETag / 304 revalidation
+"""
+
+import os
+import json
+import time
+import uuid
+import hashlib
+import logging
+import functools
+import threading
+from collections import OrderedDict
+
+from flask import request, make_response, Response
+
+from config import Config
+from utils.metrics import metrics
+from utils.tool_catalog import tool_catalog
+
+DISK_PRUNE_EVERY = 256  # disk writes between sweeps of expired files
+
+
+class CachedPage:
+    """One rendered 200 response"""
+
+    __slots__ = ('body', 'mimetype', 'etag', 'created_at', 'expires_at')
+
+    def __init__(self, body, mimetype, etag, created_at, expires_at):
+        self.body = body
+        self.mimetype = mimetype
+        self.etag = etag
+        self.created_at = created_at
+        self.expires_at = expires_at
+
+    def header(self):
+        return json.dumps({'mimetype': self.mimetype, 'etag': self.etag,
+                           'created_at': self.created_at, 'expires_at': self.expires_at}).encode()
+
+
+class PageCache:
+    """Rendered-response cache for pages that only change on deploy or catalog update
+
+    Entries are keyed by route, request URL (templates embed it in og:url)
+    and the tool catalog version, so a Tool/ToolCategory write retires
+    every cached page at once. Only query arguments a view declares are
+    part of the URL key; requests carrying any other argument are rendered
+    uncached, so random query strings cannot churn the cache or fill the
+    disk tier. Each worker keeps up to
+    PAGE_CACHE_MAX_ENTRIES pages in memory; with PAGE_CACHE_DIR set, a
+    page rendered by one worker is written there and reused by the others.
+    """
+
+    def __init__(self, max_entries=None, cache_dir=None, client_max_age=None):
+        self.max_entries = max_entries or Config.PAGE_CACHE_MAX_ENTRIES
+        self.cache_dir = cache_dir if cache_dir is not None else Config.PAGE_CACHE_DIR
+        self.client_max_age = client_max_age if client_max_age is not None else Config.PAGE_CACHE_CLIENT_MAX_AGE
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_writes = 0
+        self._counters = {'hit': 0, 'disk_hit': 0, 'miss': 0, 'bypass': 0, 'not_modified': 0}
+
+    @staticmethod
+    def make_key(route, url, version):
+        return hashlib.sha1(f'{route}\0{version}\0{url}'.encode()).hexdigest()
+
+    # Lookup
+
+    def get(self, key):
+        """(CachedPage, 'memory' or 'disk') for a live entry, else (None, None)"""
+        now = time.time()
+        with self._lock:
+            page = self._entries.get(key)
+            if page is not None:
+                if page.expires_at > now:
+                    self._entries.move_to_end(key)
+                    return page, 'memory'
+                del self._entries[key]
+
+        page = self._read_disk(key, now) if self.cache_dir else None
+        if page is not None:
+            self._remember(key, page)
+            return page, 'disk'
+        return None, None
+
+    def put(self, key, page):
+        self._remember(key, page)
+        if self.cache_dir:
+            self._write_disk(key, page)
+
+    def _remember(self, key, page):
+        with self._lock:
+            self._entries[key] = page
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    # Disk tier
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[:2], f'{key}.page')
+
+    def _read_disk(self, key, now):
+        try:
+            with open(self._path(key), 'rb') as f:
+                meta = json.loads(f.readline())
+                if meta['expires_at'] <= now:
+                    return None
+                return CachedPage(f.read(), meta['mimetype'], meta['etag'], meta['created_at'], meta['expires_at'])
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _write_disk(self, key, page):
+        path = self._path(key)
+        tmp_path = f'{path}.{uuid.uuid4().hex}.tmp'
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp_path, 'wb') as f:
+                f.write(page.header() + b'\n')
+                f.write(page.body)
+            # mtime doubles as the expiry time, so pruning needs no reads
+            os.utime(tmp_path, (page.expires_at, page.expires_at))
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logging.error(f"Page cache write error: {str(e)}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return
+
+        self._disk_writes += 1
+        if self._disk_writes % DISK_PRUNE_EVERY == 0:
+            self.prune_disk()
+
+    def prune_disk(self):
+        """Delete expired pages from the disk tier; returns how many"""
+        removed = 0
+        now = time.time()
+        try:
+            shards = list(os.scandir(self.cache_dir))
+        except OSError:
+            return 0
+        for shard in shards:
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                try:
+                    if entry.stat().st_mtime <= now:
+                        os.remove(entry.path)
+                        removed += 1
+                except OSError:
+                    pass
+        return removed
+
+    # Responses
+
+    def _respond(self, page, ttl):
+        response = Response(page.body, mimetype=page.mimetype)
+        response.set_etag(page.etag)
+        response.last_modified = page.created_at
+        response.headers['Cache-Control'] = f'public, max-age={min(ttl, self.client_max_age)}'
+        return response.make_conditional(request)
+
+    def _count(self, route, result):
+        with self._lock:
+            self._counters[result] += 1
+        if Config.METRICS_ENABLED:
+            metrics.inc('toolora_page_cache_requests_total', {'route': route, 'result': result})
+
+    def cached(self, ttl, route=None, args=()):
+        """Cache a view's 200 responses for ttl seconds
+
+        args names the query arguments the view reads; a request with any
+        other argument bypasses the cache. Redirects, errors and responses
+        that set cookies are passed through untouched. Conditional requests
+        get a 304 whether the page came from the cache or was just rendered.
+        """
+        allowed = frozenset(args)
+
+        def decorator(view):
+            name = route or view.__name__
+
+            @functools.wraps(view)
+            def wrapper(*args, **kwargs):
+                if not Config.PAGE_CACHE_ENABLED or request.method not in ('GET', 'HEAD'):
+                    return view(*args, **kwargs)
+                if not allowed.issuperset(request.args.keys()):
+                    self._count(name, 'bypass')
+                    return view(*args, **kwargs)
+
+                key = self.make_key(name, request.url, tool_catalog.get().version)
+                page, tier = self.get(key)
+                if page is not None:
+                    result = 'hit' if tier == 'memory' else 'disk_hit'
+                else:
+                    response = make_response(view(*args, **kwargs))
+                    if response.status_code != 200 or response.direct_passthrough \
+                            or 'Set-Cookie' in response.headers:
+                        self._count(name, 'bypass')
+                        return response
+                    body = response.get_data()
+                    now = time.time()
+                    page = CachedPage(body, response.mimetype, hashlib.sha1(body).hexdigest()[:32],
+                                      now, now + ttl)
+                    self.put(key, page)
+                    result = 'miss'
+
+                self._count(name, result)
+                response = self._respond(page, ttl)
+                if response.status_code == 304:
+                    self._count(name, 'not_modified')
+                return response
+            return wrapper
+        return decorator
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+            stats['entries'] = len(self._entries)
+        stats['max_entries'] = self.max_entries
+        stats['disk'] = bool(self.cache_dir)
+        return stats
+
+
+page_cache = PageCache()
@@ -0,0 +1,389 @@
+"""
+Streaming PDF merge engine for Toolora AI
+Copies each input's page objects straight to the output file, one input at a
+time, so memory stays flat no matter how many PDFs are merged. Bookmarks,
+named destinations and form fields are carried over as well
+"""
+
+import gc
+import io
+import os
+import hashlib
+import logging
+import resource
+
+from PyPDF2 import PdfReader
+from PyPDF2.generic import (
+    ArrayObject, DictionaryObject, IndirectObject, StreamObject
+)
+
+PDF_HEADER = b'%PDF-1.7\n%\xe2\xe3\xcf\xd3\n'
+
+# Keys of a page dictionary that are rebuilt instead of copied
+SKIPPED_PAGE_KEYS = ('/Parent', '/StructParents', '/B')
+
+# Links of a top-level bookmark, relinked into the merged outline on close
+SKIPPED_OUTLINE_KEYS = ('/Parent', '/Prev', '/Next')
+
+
+def _raw(obj, key):
+    """obj[key] without resolving an indirect reference, or None"""
+    return obj.raw_get(key) if isinstance(obj, DictionaryObject) and key in obj else None
+
+
+def _get(obj, key):
+    """obj[key] with an indirect reference resolved, or None (PyPDF2's .get() does not resolve)"""
+    return obj[key] if isinstance(obj, DictionaryObject) and key in obj else None
+
+
+def peak_rss_kb():
+    """Peak resident set size of this process in KB
+
+    Prefers VmHWM, which resets on exec, over ru_maxrss, which a forked
+    child inherits from its parent.
+    """
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+class StreamingPDFMerger:
+    """Incremental PDF merger
+
+    Inputs are appended one at a time. Every object reachable from an
+    input's pages is renumbered and written to the output as soon as it is
+    complete, and the reader is released before the next input is opened.
+    Identical streams (embedded fonts, images, ICC profiles) are written
+    once and shared across all documents.
+
+    Each input's bookmarks, named destinations and AcroForm fields are
+    copied with its pages, links into them renumbered. Only the small
+    objects tying them together (top-level bookmarks, destination names,
+    the field list) are held until close() writes the catalog; a later
+    input's destination of the same name wins, as with PdfMerger.
+
+    Usage:
+        with StreamingPDFMerger(output_path) as merger:
+            for path in input_files:
+                merger.append(path)
+        merger.stats
+    """
+
+    def __init__(self, output_path):
+        self.output_path = output_path
+        self._out = None
+        self._offsets = [None]  # object number -> byte offset, index 0 unused
+        self._page_refs = []
+        self._stream_index = {}
+        self._id_map = {}
+        self._pages_root = None
+        self._outline_items = []  # (object number, serialized top-level bookmark)
+        self._name_dests = {}     # catalog /Dests: serialized name -> serialized destination
+        self._string_dests = {}   # /Names /Dests name tree: name -> (serialized key, serialized destination)
+        self._form_fields = []
+        self._form_entries = {}   # AcroForm /DR, /DA and /NeedAppearances
+        self.stats = {
+            'inputs': 0,
+            'pages': 0,
+            'objects_written': 0,
+            'streams_deduplicated': 0,
+            'bytes_saved': 0,
+            'bytes_written': 0,
+            'peak_rss_kb': 0
+        }
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def open(self):
+        self._out = open(self.output_path, 'wb')
+        self._out.write(PDF_HEADER)
+        self._pages_root = self._allocate()
+
+    # Object numbering and output
+
+    def _allocate(self):
+        self._offsets.append(None)
+        return len(self._offsets) - 1
+
+    def _write_object(self, num, data):
+        self._offsets[num] = self._out.tell()
+        self._out.write(f'{num} 0 obj\n'.encode())
+        self._out.write(data)
+        self._out.write(b'\nendobj\n')
+        self.stats['objects_written'] += 1
+
+    # Object copying
+
+    def _serialize(self, obj, reader, skip_keys=(), extra=b''):
+        """Serialize a direct object, copying anything it references"""
+        if isinstance(obj, IndirectObject):
+            return f'{self._copy_ref(obj, reader)} 0 R'.encode()
+        if isinstance(obj, DictionaryObject):
+            parts = [b'<<']
+            for key, value in obj.items():
+                if key in skip_keys or key == '/Length' and isinstance(obj, StreamObject):
+                    continue
+                parts.append(self._serialize(key, reader))
+                parts.append(b' ')
+                parts.append(self._serialize(value, reader))
+                parts.append(b'\n')
+            if isinstance(obj, StreamObject):
+                parts.append(f'/Length {len(obj._data)}\n'.encode())
+            parts.append(extra)
+            parts.append(b'>>')
+            return b''.join(parts)
+        if isinstance(obj, ArrayObject):
+            return b'[' + b' '.join(self._serialize(item, reader) for item in obj) + b']'
+
+        buf = io.BytesIO()
+        obj.write_to_stream(buf, None)
+        return buf.getvalue()
+
+    def _copy_ref(self, ref, reader):
+        """Copy an indirect object into the output and return its new number"""
+        key = (ref.idnum, ref.generation)
+        if key in self._id_map:
+            if self._id_map[key] is None:
+                # Reference cycle through a stream: give up sharing and reserve a number
+                self._id_map[key] = self._allocate()
+            return self._id_map[key]
+
+        obj = reader.get_object(ref)
+        if isinstance(obj, DictionaryObject) and obj.get('/Type') == '/Pages':
+            return self._pages_root
+        if isinstance(obj, DictionaryObject) and obj.get('/Type') == '/Page':
+            # Reference to a page not being merged (e.g. a stale link target)
+            return self._copy_null(key)
+
+        if isinstance(obj, StreamObject):
+            # Children first, so identical streams serialize to identical bytes
+            self._id_map[key] = None  # cycle guard
+            data = self._serialize(obj, reader) + b'\nstream\n' + obj._data + b'\nendstream'
+            if self._id_map[key] is not None:
+                self._write_object(self._id_map[key], data)
+                return self._id_map[key]
+
+            digest = hashlib.sha1(data).digest()
+            num = self._stream_index.get(digest)
+            if num is not None:
+                self.stats['streams_deduplicated'] += 1
+                self.stats['bytes_saved'] += len(data)
+            else:
+                num = self._allocate()
+                self._write_object(num, data)
+                self._stream_index[digest] = num
+            self._id_map[key] = num
+            return num
+
+        num = self._allocate()
+        self._id_map[key] = num
+        self._write_object(num, self._serialize(obj, reader))
+        return num
+
+    def _copy_null(self, key):
+        num = self._allocate()
+        self._id_map[key] = num
+        self._write_object(num, b'null')
+        return num
+
+    # Document-level structures, copied while the input's pages are mapped
+
+    def _copy_outlines(self, reader, root):
+        """Copy the bookmark tree, holding back the top-level items for close()"""
+        outlines = _get(root, '/Outlines')
+        # Number every item first, so parent and sibling links serialize as
+        # plain references instead of recursing down long sibling chains
+        items = []
+        stack = [(_raw(outlines, '/First'), True)]
+        while stack:
+            ref, top_level = stack.pop()
+            while isinstance(ref, IndirectObject):
+                key = (ref.idnum, ref.generation)
+                if key in self._id_map:
+                    break
+                self._id_map[key] = self._allocate()
+                item = reader.get_object(ref)
+                if not isinstance(item, DictionaryObject):
+                    break
+                items.append((key, item, top_level))
+                stack.append((_raw(item, '/First'), False))
+                ref = _raw(item, '/Next')
+
+        for key, item, top_level in items:
+            num = self._id_map[key]
+            if top_level:
+                self._outline_items.append((num, self._serialize(item, reader, skip_keys=SKIPPED_OUTLINE_KEYS)))
+            else:
+                self._write_object(num, self._serialize(item, reader))
+
+    def _copy_named_dests(self, reader, root):
+        """Copy destinations named in the catalog's /Dests and in the /Names /Dests tree"""
+        dests = _get(root, '/Dests')
+        if isinstance(dests, DictionaryObject):
+            for name, dest in dests.items():
+                self._name_dests[self._serialize(name, reader)] = self._serialize(dest, reader)
+
+        names = _get(root, '/Names')
+        stack = [_get(names, '/Dests')]
+        while stack:
+            node = stack.pop()
+            if not isinstance(node, DictionaryObject):
+                continue
+            pairs = _get(node, '/Names') or []
+            for i in range(0, len(pairs) - 1, 2):
+                name = pairs[i].get_object()
+                self._string_dests[str(name)] = (self._serialize(name, reader), self._serialize(pairs[i + 1], reader))
+            stack.extend(kid.get_object() for kid in _get(node, '/Kids') or [])
+
+    def _copy_form(self, reader, root):
+        """Copy the AcroForm field list; resources and defaults come from the first form"""
+        form = _get(root, '/AcroForm')
+        if not isinstance(form, DictionaryObject):
+            return
+        for field in _get(form, '/Fields') or []:
+            if isinstance(field, IndirectObject):
+                self._form_fields.append(self._copy_ref(field, reader))
+        for key in ('/DR', '/DA'):
+            if key in form and key not in self._form_entries:
+                self._form_entries[key] = self._serialize(form.raw_get(key), reader)
+        if _get(form, '/NeedAppearances'):
+            self._form_entries['/NeedAppearances'] = b'true'
+
+    # Public API
+
+    def append(self, input_file, pages=None):
+        """Copy the pages of input_file (all, or the given 0-based indices) to the output"""
+        reader = PdfReader(input_file)
+        if reader.is_encrypted:
+            reader.decrypt('')
+
+        page_indices = range(len(reader.pages)) if pages is None else pages
+        self._id_map = {}
+
+        # Pre-assign page numbers so links between merged pages resolve
+        page_nums = []
+        page = None
+        for index in page_indices:
+            page = reader.pages[index]
+            num = self._allocate()
+            if page.indirect_ref is not None:
+                self._id_map[(page.indirect_ref.idnum, page.indirect_ref.generation)] = num
+            page_nums.append((num, page))
+
+        for num, page in page_nums:
+            parent = f'/Parent {self._pages_root} 0 R\n'.encode()
+            self._write_object(num, self._serialize(page, reader, skip_keys=SKIPPED_PAGE_KEYS, extra=parent))
+            self._page_refs.append(num)
+
+        root = reader.trailer['/Root']
+        self._copy_outlines(reader, root)
+        self._copy_named_dests(reader, root)
+        self._copy_form(reader, root)
+
+        self._out.flush()
+        self._id_map = {}
+        self.stats['inputs'] += 1
+        self.stats['pages'] += len(page_nums)
+
+        # PyPDF2 objects hold cycles back to their reader; free this input now
+        del reader, page, page_nums, root
+        gc.collect()
+        self.stats['peak_rss_kb'] = peak_rss_kb()
+
+    def _write_outline(self):
+        """Chain every input's top-level bookmarks under one outline root; returns its number"""
+        root = self._allocate()
+        nums = [num for num, _ in self._outline_items]
+        for i, (num, data) in enumerate(self._outline_items):
+            links = f'/Parent {root} 0 R\n'
+            if i > 0:
+                links += f'/Prev {nums[i - 1]} 0 R\n'
+            if i < len(nums) - 1:
+                links += f'/Next {nums[i + 1]} 0 R\n'
+            # data is a serialized dictionary: insert the links before its closing '>>'
+            self._write_object(num, data[:-2] + links.encode() + b'>>')
+        self._write_object(root, f'<< /Type /Outlines /First {nums[0]} 0 R /Last {nums[-1]} 0 R '
+                                 f'/Count {len(nums)} >>'.encode())
+        return root
+
+    def _catalog_entries(self):
+        """Serialized catalog entries for the outline, named destinations and form"""
+        entries = [f'/Type /Catalog /Pages {self._pages_root} 0 R\n'.encode()]
+        if self._outline_items:
+            entries.append(f'/Outlines {self._write_outline()} 0 R\n'.encode())
+
+        if self._name_dests:
+            dests = self._allocate()
+            self._write_object(dests, b'<<' + b''.join(
+                name + b' ' + dest + b'\n' for name, dest in self._name_dests.items()) + b'>>')
+            entries.append(f'/Dests {dests} 0 R\n'.encode())
+        if self._string_dests:
+            # A single leaf; name tree keys must be sorted
+            tree = self._allocate()
+            pairs = b'\n'.join(key + b' ' + dest for _, (key, dest) in sorted(self._string_dests.items()))
+            self._write_object(tree, b'<< /Names [' + pairs + b'] >>')
+            entries.append(f'/Names << /Dests {tree} 0 R >>\n'.encode())
+
+        if self._form_fields:
+            fields = ' '.join(f'{num} 0 R' for num in dict.fromkeys(self._form_fields))
+            form = [f'/Fields [{fields}]'.encode()]
+            form.extend(key.encode() + b' ' + value for key, value in self._form_entries.items())
+            entries.append(b'/AcroForm << ' + b'\n'.join(form) + b' >>\n')
+        return b''.join(entries)
+
+    def close(self):
+        """Write the page tree, catalog, xref table and trailer"""
+        kids = ' '.join(f'{num} 0 R' for num in self._page_refs)
+        self._write_object(self._pages_root,
+                           f'<< /Type /Pages /Kids [{kids}] /Count {len(self._page_refs)} >>'.encode())
+        entries = self._catalog_entries()
+        catalog = self._allocate()
+        self._write_object(catalog, b'<< ' + entries + b'>>')
+
+        xref_offset = self._out.tell()
+        lines = [f'xref\n0 {len(self._offsets)}\n', '0000000000 65535 f \n']
+        for offset in self._offsets[1:]:
+            lines.append(f'{offset:010d} 00000 n \n' if offset is not None else '0000000000 00000 f \n')
+        self._out.write(''.join(lines).encode())
+        self._out.write(
+            f'trailer\n<< /Size {len(self._offsets)} /Root {catalog} 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n'.encode()
+        )
+
+        self.stats['bytes_written'] = self._out.tell()
+        self.stats['peak_rss_kb'] = peak_rss_kb()
+        self._out.close()
+        self._out = None
+
+    def abort(self):
+        """Close and remove a partially written output"""
+        if self._out is not None:
+            self._out.close()
+            self._out = None
+        try:
+            os.remove(self.output_path)
+        except OSError:
+            pass
+
+
+def merge_pdf_files(input_files, output_path):
+    """Merge input_files into output_path and return the merge statistics"""
+    with StreamingPDFMerger(output_path) as merger:
+        for file_path in input_files:
+            if os.path.exists(file_path):
+                merger.append(file_path)
+
+    logging.info(f"PDF merge stats: {merger.stats}")
+    return merger.stats
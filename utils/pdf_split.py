@@ -0,0 +1,132 @@
+"""
+PDF split utilities for Toolora AI
+Parses page-range expressions and streams split parts as a ZIP archive
+"""
+
+import io
+import zipfile
+import logging
+import itertools
+
+from flask import Response, stream_with_context
+
+from utils.lazy_imports import lazy_import
+
+PyPDF2 = lazy_import('PyPDF2')
+
+
+def parse_page_ranges(page_range, total_pages=None):
+    """Parse a page range such as "1-3,5" into groups of 0-based page indices
+
+    Each comma-separated part becomes one group: "1-3,5" -> [[0, 1, 2], [4]].
+    Pages outside 1..total_pages are dropped when total_pages is given.
+    Raises ValueError on malformed input.
+    """
+    groups = []
+    for part in page_range.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        if '-' in part:
+            start, end = map(int, part.split('-'))
+            pages = list(range(start - 1, end))  # Convert to 0-based
+        else:
+            pages = [int(part) - 1]  # Convert to 0-based
+
+        if total_pages is not None:
+            pages = [page for page in pages if 0 <= page < total_pages]
+        if pages:
+            groups.append(pages)
+    return groups
+
+
+def split_parts(total_pages, page_range='', pages_per_file=1, base_name='page'):
+    """Return (filename, page indices) for every part of a split
+
+    With a page range each range group is one part, otherwise the document
+    is cut into chunks of pages_per_file pages.
+    """
+    if page_range and page_range.strip():
+        groups = parse_page_ranges(page_range, total_pages)
+    else:
+        pages_per_file = max(1, int(pages_per_file))
+        groups = [list(range(i, min(i + pages_per_file, total_pages)))
+                  for i in range(0, total_pages, pages_per_file)]
+
+    parts = []
+    for pages in groups:
+        if len(pages) == 1:
+            name = f"{base_name}_{pages[0] + 1}.pdf"
+        else:
+            name = f"{base_name}_{pages[0] + 1}-{pages[-1] + 1}.pdf"
+        parts.append((name, pages))
+    return parts
+
+
+def write_part(reader, pages, output):
+    """Write the given pages of reader as a standalone PDF to output"""
+    writer = PyPDF2.PdfWriter()
+    for page_num in pages:
+        writer.add_page(reader.pages[page_num])
+    writer.write(output)
+
+
+class ZipStreamBuffer:
+    """Write-only, unseekable sink that lets zipfile emit an archive in chunks"""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        """Return and forget everything written since the last drain"""
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def stream_split_zip(reader, parts):
+    """Yield a ZIP archive of the split parts, one chunk per finished part
+
+    Nothing is written to disk and only one part is held in memory, so the
+    client starts receiving data after the first part is produced. Routes
+    send it through split_zip_response(), which pulls the first chunk before
+    the headers. A later failure is re-raised so the server aborts the
+    transfer instead of ending a truncated archive cleanly.
+    """
+    sink = ZipStreamBuffer()
+    try:
+        with zipfile.ZipFile(sink, 'w', zipfile.ZIP_STORED) as archive:
+            for name, pages in parts:
+                part = io.BytesIO()
+                write_part(reader, pages, part)
+                archive.writestr(name, part.getvalue())
+                yield sink.drain()
+        yield sink.drain()
+    except Exception as e:
+        logging.error(f"PDF split stream error: {str(e)}")
+        raise
+
+
+def split_zip_response(reader, parts, download_name):
+    """Streamed ZIP download of the split parts
+
+    The first part is built before any header goes out, so an unreadable
+    document raises here and the calling route can still answer with a
+    JSON error instead of a broken download.
+    """
+    chunks = stream_split_zip(reader, parts)
+    first = next(chunks)
+    return Response(stream_with_context(itertools.chain([first], chunks)), mimetype='application/zip',
+                    headers={'Content-Disposition': f'attachment; filename="{download_name}"'})
@@ -5,36 +5,35 @@ Handles PDF merge, split, compress, and other operations
 
 import os
 import uuid
-from PyPDF2 import PdfReader, PdfWriter
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import letter
 import tempfile
 import logging
 
+from utils.pdf_split import split_parts, write_part
+from utils.result_cache import cached
+from utils.storage import storage
+from utils.metrics import instrument_processor
+from utils.lazy_imports import lazy_import
+
+PyPDF2 = lazy_import('PyPDF2')
+canvas = lazy_import('reportlab.pdfgen.canvas')
+pagesizes = lazy_import('reportlab.lib.pagesizes')
+pdf_merge = lazy_import('utils.pdf_merge')
+
+@instrument_processor
 class PDFProcessor:
     """PDF processing utilities"""
     
     @staticmethod
+    @cached('pdf-merge', inputs=('input_files',))
     def merge_pdfs(input_files):
         """Merge multiple PDF files into one"""
         try:
-            writer = PdfWriter()
-            
-            for file_path in input_files:
-                if os.path.exists(file_path):
-                    reader = PdfReader(file_path)
-                    for page in reader.pages:
-                        writer.add_page(page)
-            
             # Generate output filename
             output_filename = f"merged_{uuid.uuid4()}.pdf"
-            output_path = os.path.join('uploads', output_filename)
+            output_path = storage.output_path(output_filename)
             
-            # Ensure uploads directory exists
-            os.makedirs('uploads', exist_ok=True)
-            
-            with open(output_path, 'wb') as output_file:
-                writer.write(output_file)
+            # Stream pages input by input instead of holding every document in memory
+            pdf_merge.merge_pdf_files(input_files, output_path)
             
             # Cleanup input files
             for file_path in input_files:
@@ -50,29 +49,21 @@ class PDFProcessor:
             return None
     
     @staticmethod
-    def split_pdf(input_file, pages_per_file=1):
-        """Split PDF into multiple files"""
+    @cached('pdf-split')
+    def split_pdf(input_file, pages_per_file=1, page_ranges=''):
+        """Split PDF into multiple files, by page chunks or by page ranges such as 1-3,5"""
         try:
-            reader = PdfReader(input_file)
-            total_pages = len(reader.pages)
+            reader = PyPDF2.PdfReader(input_file)
             output_files = []
             
-            # Ensure uploads directory exists
-            os.makedirs('uploads', exist_ok=True)
-            
-            for i in range(0, total_pages, pages_per_file):
-                writer = PdfWriter()
-                
-                # Add pages to current split
-                for j in range(i, min(i + pages_per_file, total_pages)):
-                    writer.add_page(reader.pages[j])
-                
+            parts = split_parts(len(reader.pages), page_ranges, pages_per_file)
+            for part_number, (_, pages) in enumerate(parts, start=1):
                 # Generate output filename
-                output_filename = f"split_{uuid.uuid4()}_part_{i//pages_per_file + 1}.pdf"
-                output_path = os.path.join('uploads', output_filename)
+                output_filename = f"split_{uuid.uuid4()}_part_{part_number}.pdf"
+                output_path = storage.output_path(output_filename)
                 
                 with open(output_path, 'wb') as output_file:
-                    writer.write(output_file)
+                    write_part(reader, pages, output_file)
                 
                 output_files.append(output_path)
             
@@ -89,11 +80,12 @@ class PDFProcessor:
             return None
     
     @staticmethod
+    @cached('pdf-compress')
     def compress_pdf(input_file, quality=0.7):
         """Compress PDF file"""
         try:
-            reader = PdfReader(input_file)
-            writer = PdfWriter()
+            reader = PyPDF2.PdfReader(input_file)
+            writer = PyPDF2.PdfWriter()
             
             for page in reader.pages:
                 page.compress_content_streams()
@@ -101,10 +93,7 @@ class PDFProcessor:
             
             # Generate output filename
             output_filename = f"compressed_{uuid.uuid4()}.pdf"
-            output_path = os.path.join('uploads', output_filename)
-            
-            # Ensure uploads directory exists
-            os.makedirs('uploads', exist_ok=True)
+            output_path = storage.output_path(output_filename)
             
             with open(output_path, 'wb') as output_file:
                 writer.write(output_file)
@@ -122,21 +111,22 @@ class PDFProcessor:
             return None
     
     @staticmethod
+    @cached('pdf-watermark')
     def add_watermark(input_file, watermark_text):
         """Add watermark to PDF"""
         try:
             # Create watermark PDF
             watermark_path = f"watermark_{uuid.uuid4()}.pdf"
-            c = canvas.Canvas(watermark_path, pagesize=letter)
+            c = canvas.Canvas(watermark_path, pagesize=pagesizes.letter)
             c.setFont("Helvetica", 50)
             c.setFillAlpha(0.3)
             c.rotate(45)
             c.drawString(200, 200, watermark_text)
             c.save()
             
-            reader = PdfReader(input_file)
-            watermark_reader = PdfReader(watermark_path)
-            writer = PdfWriter()
+            reader = PyPDF2.PdfReader(input_file)
+            watermark_reader = PyPDF2.PdfReader(watermark_path)
+            writer = PyPDF2.PdfWriter()
             
             watermark_page = watermark_reader.pages[0]
             
@@ -146,10 +136,7 @@ class PDFProcessor:
             
             # Generate output filename
             output_filename = f"watermarked_{uuid.uuid4()}.pdf"
-            output_path = os.path.join('uploads', output_filename)
-            
-            # Ensure uploads directory exists
-            os.makedirs('uploads', exist_ok=True)
+            output_path = storage.output_path(output_filename)
             
             with open(output_path, 'wb') as output_file:
                 writer.write(output_file)
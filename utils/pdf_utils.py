@@ -1,20 +1,16 @@
 import os
-from PyPDF2 import PdfMerger, PdfReader, PdfWriter
-import fitz  # PyMuPDF for compression
+
+from utils.pdf_split import parse_page_ranges
+from utils.lazy_imports import lazy_import
+
+PyPDF2 = lazy_import('PyPDF2')
+fitz = lazy_import('fitz')  # PyMuPDF for compression
+pdf_merge = lazy_import('utils.pdf_merge')
 
 def merge_pdfs(input_files, output_path):
     """Merge multiple PDF files into one"""
     try:
-        merger = PdfMerger()
-        
-        for pdf_file in input_files:
-            if os.path.exists(pdf_file):
-                merger.append(pdf_file)
-        
-        with open(output_path, 'wb') as output_file:
-            merger.write(output_file)
-        
-        merger.close()
+        pdf_merge.merge_pdf_files(input_files, output_path)
         return True
     except Exception as e:
         print(f"Error merging PDFs: {e}")
@@ -23,21 +19,12 @@ def merge_pdfs(input_files, output_path):
 def split_pdf(input_file, output_path, page_range):
     """Split PDF and extract specific pages"""
     try:
-        reader = PdfReader(input_file)
-        writer = PdfWriter()
+        reader = PyPDF2.PdfReader(input_file)
+        writer = PyPDF2.PdfWriter()
         
         # Parse page range (e.g., "1-3", "1,3,5", "1-3,5")
-        pages = []
-        for part in page_range.split(','):
-            if '-' in part:
-                start, end = map(int, part.split('-'))
-                pages.extend(range(start-1, end))  # Convert to 0-based
-            else:
-                pages.append(int(part)-1)  # Convert to 0-based
-        
-        # Add selected pages
-        for page_num in pages:
-            if 0 <= page_num < len(reader.pages):
+        for group in parse_page_ranges(page_range, len(reader.pages)):
+            for page_num in group:
                 writer.add_page(reader.pages[page_num])
         
         with open(output_path, 'wb') as output_file:
@@ -0,0 +1,228 @@
+"""
+Popularity utilities for Toolora AI
+Keeps per-tool use counters (all time and hourly) up to date as usage is
+tracked, so popular-tool lists never aggregate the full tool_history table
+"""
+
+import time
+import logging
+import threading
+from datetime import datetime, timedelta
+from collections import namedtuple
+
+from config import Config
+
+# Window name -> hours of hourly buckets summed; None reads the all-time totals
+WINDOWS = {
+    '24h': 24,
+    '7d': 7 * 24,
+    'all': None,
+}
+RETENTION_HOURS = max(hours for hours in WINDOWS.values() if hours)
+
+PopularTool = namedtuple('PopularTool', ['tool_name', 'tool_category', 'usage_count'])
+
+
+def hour_bucket(moment):
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+def _upsert(session, model, key_columns, rows):
+    """Add rows' usage_count to existing counters, inserting missing ones"""
+    dialect = session.get_bind().dialect.name
+    if dialect in ('sqlite', 'postgresql'):
+        if dialect == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert
+        statement = insert(model.__table__)
+        statement = statement.on_conflict_do_update(
+            index_elements=key_columns,
+            set_={'usage_count': model.__table__.c.usage_count + statement.excluded.usage_count}
+        )
+        session.execute(statement, rows)
+        return
+
+    for row in rows:
+        key = {column: row[column] for column in key_columns}
+        counter = session.query(model).filter_by(**key).with_for_update().first()
+        if counter:
+            counter.usage_count += row['usage_count']
+        else:
+            session.add(model(**row))
+
+
+class UsageCounters:
+    """Incrementally maintained popularity counters
+
+    apply() runs inside the transaction that inserts tool_history rows, so
+    counters and history commit together. Reads are served from a
+    per-window in-process cache refreshed every POPULARITY_CACHE_TTL
+    seconds; a refresh reads at most one row per tool (all time) or per
+    tool and hour (24h/7d), whatever the size of tool_history.
+    """
+
+    def __init__(self, cache_ttl=None):
+        self.cache_ttl = cache_ttl if cache_ttl is not None else Config.POPULARITY_CACHE_TTL
+        self.app = None
+        self._cache = {}
+        self._lock = threading.Lock()
+        self._pruned_hour = None
+
+    # Writing
+
+    def apply(self, events, session=None):
+        """Count tool_history rows (dicts with tool_name, tool_category and a
+        used_at datetime); call within the session that inserts them"""
+        from models import ToolUsageTotal, ToolUsageHourly
+
+        if session is None:
+            from app import db
+            session = db.session
+
+        totals, hourly = {}, {}
+        for event in events:
+            key = (event['tool_name'], event['tool_category'])
+            totals[key] = totals.get(key, 0) + 1
+            hour = hour_bucket(event['used_at'])
+            hourly[key + (hour,)] = hourly.get(key + (hour,), 0) + 1
+
+        _upsert(session, ToolUsageTotal, ['tool_name', 'tool_category'], [
+            {'tool_name': name, 'tool_category': category, 'usage_count': count}
+            for (name, category), count in totals.items()
+        ])
+        _upsert(session, ToolUsageHourly, ['tool_name', 'tool_category', 'hour'], [
+            {'tool_name': name, 'tool_category': category, 'hour': hour, 'usage_count': count}
+            for (name, category, hour), count in hourly.items()
+        ])
+        self._prune(session, ToolUsageHourly)
+
+    def _prune(self, session, model):
+        """Drop hourly buckets older than the longest window, once per hour per process"""
+        current_hour = hour_bucket(datetime.utcnow())
+        if self._pruned_hour == current_hour:
+            return
+        cutoff = current_hour - timedelta(hours=RETENTION_HOURS)
+        session.query(model).filter(model.hour < cutoff).delete(synchronize_session=False)
+        self._pruned_hour = current_hour
+
+    def rebuild(self):
+        """Recompute all counters from tool_history; needs an app context"""
+        from app import db
+        from models import ToolHistory, ToolUsageTotal, ToolUsageHourly
+        from utils.database import db_writer
+
+        with db_writer.session() as session:
+            session.query(ToolUsageTotal).delete()
+            session.query(ToolUsageHourly).delete()
+
+            totals = session.query(ToolHistory.tool_name, ToolHistory.tool_category,
+                                   db.func.count(ToolHistory.id))\
+                .group_by(ToolHistory.tool_name, ToolHistory.tool_category).all()
+            if totals:
+                session.execute(ToolUsageTotal.__table__.insert(), [
+                    {'tool_name': name, 'tool_category': category, 'usage_count': count}
+                    for name, category, count in totals
+                ])
+
+            cutoff = hour_bucket(datetime.utcnow()) - timedelta(hours=RETENTION_HOURS)
+            hourly = {}
+            recent = session.query(ToolHistory.tool_name, ToolHistory.tool_category, ToolHistory.used_at)\
+                .filter(ToolHistory.used_at >= cutoff)
+            for name, category, used_at in recent.yield_per(10000):
+                key = (name, category, hour_bucket(used_at))
+                hourly[key] = hourly.get(key, 0) + 1
+            if hourly:
+                session.execute(ToolUsageHourly.__table__.insert(), [
+                    {'tool_name': name, 'tool_category': category, 'hour': hour, 'usage_count': count}
+                    for (name, category, hour), count in hourly.items()
+                ])
+        self.invalidate()
+        return len(totals)
+
+    # Reading
+
+    def popular(self, window='all', limit=None):
+        """PopularTool rows for window, most used first"""
+        if window not in WINDOWS:
+            raise ValueError(f'Unknown popularity window: {window}')
+        cached = self._cache.get(window)
+        if cached is None or time.time() - cached[0] >= self.cache_ttl:
+            with self._lock:
+                cached = self._cache.get(window)
+                if cached is None or time.time() - cached[0] >= self.cache_ttl:
+                    cached = self._cache[window] = (time.time(), self._load(window))
+        return cached[1][:limit] if limit else cached[1]
+
+    def counts(self, window='all'):
+        """{tool_name: usage_count} over all categories"""
+        counts = {}
+        for name, category, count in self.popular(window):
+            counts[name] = counts.get(name, 0) + count
+        return counts
+
+    def invalidate(self):
+        self._cache = {}
+
+    def _load(self, window):
+        try:
+            if self.app is not None:
+                with self.app.app_context():
+                    return self._query(window)
+            return self._query(window)
+        except Exception as e:
+            logging.error(f"Popularity counters read error: {str(e)}")
+            return []
+
+    def _query(self, window):
+        from app import db
+        from models import ToolUsageTotal, ToolUsageHourly
+
+        hours = WINDOWS[window]
+        if hours is None:
+            rows = db.session.query(ToolUsageTotal.tool_name, ToolUsageTotal.tool_category,
+                                    ToolUsageTotal.usage_count).all()
+        else:
+            cutoff = hour_bucket(datetime.utcnow()) - timedelta(hours=hours - 1)
+            rows = db.session.query(ToolUsageHourly.tool_name, ToolUsageHourly.tool_category,
+                                    db.func.sum(ToolUsageHourly.usage_count))\
+                .filter(ToolUsageHourly.hour >= cutoff)\
+                .group_by(ToolUsageHourly.tool_name, ToolUsageHourly.tool_category).all()
+        return sorted((PopularTool(name, category, int(count)) for name, category, count in rows),
+                      key=lambda row: (-row.usage_count, row.tool_name))
+
+    def init_app(self, app):
+        self.app = app
+
+    def backfill(self):
+        """Build the counters from tool_history if they have never been filled; needs an app context"""
+        from app import db
+        from models import ToolHistory, ToolUsageTotal
+
+        try:
+            if ToolUsageTotal.query.first() is None and ToolHistory.query.first() is not None:
+                logging.info("Popularity counters empty, rebuilding from tool_history")
+                self.rebuild()
+        except Exception as e:
+            db.session.rollback()
+            logging.error(f"Popularity counters backfill error: {str(e)}")
+
+
+usage_counters = UsageCounters()
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Rebuild or show the tool popularity counters')
+    parser.add_argument('--rebuild', action='store_true', help='recompute counters from tool_history')
+    parser.add_argument('--window', choices=sorted(WINDOWS), default='all')
+    parser.add_argument('--limit', type=int, default=10)
+    args = parser.parse_args()
+
+    from app import app
+    with app.app_context():
+        if args.rebuild:
+            print(f'rebuilt counters for {usage_counters.rebuild()} tools')
+        for name, category, count in usage_counters.popular(args.window, args.limit):
+            print(f'{count:>10}  {name} ({category})')
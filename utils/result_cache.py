@@ -0,0 +1,251 @@
+"""
+Content-addressed result cache for Toolora AI
+Skips re-processing when the same input bytes are run through the same tool
+with the same options
+"""
+
+import os
+import re
+import json
+import time
+import uuid
+import shutil
+import sqlite3
+import hashlib
+import inspect
+import logging
+import functools
+
+from config import Config
+from utils.storage import storage
+
+UUID_PATTERN = re.compile(r'[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}')
+
+
+def hash_file(path, chunk_size=1024 * 1024):
+    """SHA-256 of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _link_or_copy(src, dst):
+    """Hard-link src to dst, copying when linking is not possible"""
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copyfile(src, dst)
+
+
+class ResultCache:
+    """Disk-backed LRU cache of processor outputs keyed by input hash + tool + options"""
+
+    def __init__(self, cache_dir=None, max_bytes=None):
+        self.cache_dir = cache_dir or Config.RESULT_CACHE_DIR
+        self.max_bytes = max_bytes or Config.RESULT_CACHE_MAX_BYTES
+        self._initialized = False
+
+    def _connect(self):
+        conn = sqlite3.connect(os.path.join(self.cache_dir, 'index.db'), timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _init_db(self):
+        if self._initialized:
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS entries (
+                    key TEXT PRIMARY KEY,
+                    tool TEXT NOT NULL,
+                    outputs TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS ix_entries_last_access ON entries (last_access)')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS tool_stats (
+                    tool TEXT PRIMARY KEY,
+                    hits INTEGER NOT NULL DEFAULT 0,
+                    misses INTEGER NOT NULL DEFAULT 0
+                )
+            ''')
+        finally:
+            conn.close()
+        self._initialized = True
+
+    @staticmethod
+    def make_key(tool, input_paths, params):
+        """Build the cache key from the tool, the input file hashes and normalized params"""
+        digest = hashlib.sha256()
+        digest.update(tool.encode())
+        digest.update(json.dumps(params, sort_keys=True, default=str).encode())
+        for path in input_paths:
+            digest.update(hash_file(path).encode())
+        return digest.hexdigest()
+
+    def _entry_dir(self, key):
+        return os.path.join(self.cache_dir, key[:2], key)
+
+    def _record(self, conn, tool, hit):
+        column = 'hits' if hit else 'misses'
+        conn.execute('INSERT OR IGNORE INTO tool_stats (tool) VALUES (?)', (tool,))
+        conn.execute(f'UPDATE tool_stats SET {column} = {column} + 1 WHERE tool = ?', (tool,))
+
+    def get(self, key, tool):
+        """Materialize a cached result as fresh files in upload storage
+
+        Returns a path or list of paths, matching what the processor returned,
+        or None on a miss.
+        """
+        self._init_db()
+        conn = self._connect()
+        try:
+            row = conn.execute('SELECT outputs FROM entries WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                self._record(conn, tool, hit=False)
+                return None
+
+            outputs = json.loads(row['outputs'])
+            is_list = isinstance(outputs, list)
+            outputs = outputs if is_list else [outputs]
+            entry_dir = self._entry_dir(key)
+            if not all(os.path.exists(os.path.join(entry_dir, name)) for name in outputs):
+                conn.execute('DELETE FROM entries WHERE key = ?', (key,))
+                self._record(conn, tool, hit=False)
+                return None
+
+            paths = []
+            for name in outputs:
+                # Fresh uuid per caller so each hit gets its own downloadable artifact
+                dst = storage.output_path(UUID_PATTERN.sub(str(uuid.uuid4()), name, count=1))
+                _link_or_copy(os.path.join(entry_dir, name), dst)
+                paths.append(dst)
+
+            conn.execute('UPDATE entries SET last_access = ? WHERE key = ?', (time.time(), key))
+            self._record(conn, tool, hit=True)
+            return paths if is_list else paths[0]
+        finally:
+            conn.close()
+
+    def put(self, key, tool, result):
+        """Store a processor result (path or list of paths) and evict least recently used entries"""
+        self._init_db()
+        output_paths = result if isinstance(result, list) else [result]
+        entry_dir = self._entry_dir(key)
+        os.makedirs(entry_dir, exist_ok=True)
+
+        names, size = [], 0
+        for path in output_paths:
+            name = os.path.basename(path)
+            tmp_path = os.path.join(entry_dir, f'.{name}.{os.getpid()}.tmp')
+            _link_or_copy(path, tmp_path)
+            os.replace(tmp_path, os.path.join(entry_dir, name))
+            names.append(name)
+            size += os.path.getsize(path)
+
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute(
+                'INSERT OR REPLACE INTO entries (key, tool, outputs, size, created_at, last_access) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (key, tool, json.dumps(names if isinstance(result, list) else names[0]), size, now, now)
+            )
+        finally:
+            conn.close()
+        self.evict()
+
+    def evict(self):
+        """Delete least recently used entries until the cache fits in 90% of its budget"""
+        conn = self._connect()
+        try:
+            total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+            if total <= self.max_bytes:
+                return
+            target = self.max_bytes * 0.9
+            for row in conn.execute('SELECT key, size FROM entries ORDER BY last_access').fetchall():
+                if total <= target:
+                    break
+                conn.execute('DELETE FROM entries WHERE key = ?', (row['key'],))
+                shutil.rmtree(self._entry_dir(row['key']), ignore_errors=True)
+                total -= row['size']
+        finally:
+            conn.close()
+
+    def stats(self):
+        """Return size usage and per-tool hit ratios"""
+        self._init_db()
+        conn = self._connect()
+        try:
+            entries, size = conn.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries').fetchone()
+            tools = {}
+            for row in conn.execute('SELECT tool, hits, misses FROM tool_stats ORDER BY tool'):
+                lookups = row['hits'] + row['misses']
+                tools[row['tool']] = {
+                    'hits': row['hits'],
+                    'misses': row['misses'],
+                    'hit_ratio': round(row['hits'] / lookups, 4) if lookups else 0.0
+                }
+        finally:
+            conn.close()
+        return {'entries': entries, 'size_bytes': size, 'max_bytes': self.max_bytes, 'tools': tools}
+
+
+result_cache = ResultCache()
+
+
+def cached(tool, inputs=('input_file',)):
+    """Cache a utils processor whose named inputs are file paths (or lists of paths)
+
+    The wrapped processor keeps its contract: outputs are written to
+    uploads/, inputs are removed, and None is returned on failure.
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not Config.RESULT_CACHE_ENABLED:
+                return func(*args, **kwargs)
+
+            try:
+                bound = signature.bind(*args, **kwargs)
+                bound.apply_defaults()
+                input_paths = []
+                for name in inputs:
+                    value = bound.arguments[name]
+                    input_paths.extend(value if isinstance(value, (list, tuple)) else [value])
+                input_paths = [path for path in input_paths if os.path.exists(path)]
+                params = {k: v for k, v in bound.arguments.items() if k not in inputs}
+                key = result_cache.make_key(tool, input_paths, params)
+
+                cached_result = result_cache.get(key, tool)
+                if cached_result is not None:
+                    for path in input_paths:
+                        try:
+                            os.remove(path)
+                        except OSError:
+                            pass
+                    return cached_result
+            except Exception as e:
+                logging.error(f"Result cache lookup error for {tool}: {str(e)}")
+                return func(*args, **kwargs)
+
+            result = func(*args, **kwargs)
+            if result:
+                try:
+                    result_cache.put(key, tool, result)
+                except Exception as e:
+                    logging.error(f"Result cache store error for {tool}: {str(e)}")
+            return result
+
+        return wrapper
+    return decorator
@@ -0,0 +1,94 @@
+"""
+Schema utilities for Toolora AI
+Creates missing tables, brings existing databases up to the indexes declared
+on the models (which db.create_all() only creates together with new tables)
+and backfills derived data; run by create_app() or once per deploy
+"""
+
+import logging
+
+from sqlalchemy import inspect
+from sqlalchemy.schema import CreateIndex
+
+
+def missing_indexes(engine, metadata):
+    """Indexes declared in metadata that the database does not have yet"""
+    inspector = inspect(engine)
+    missing = []
+    for table in metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {index['name'] for index in inspector.get_indexes(table.name)}
+        missing.extend(index for index in sorted(table.indexes, key=lambda ix: ix.name)
+                       if index.name not in existing)
+    return missing
+
+
+def ensure_indexes(engine=None, metadata=None):
+    """Create every missing declared index; returns their names
+
+    Safe to run on every start. On PostgreSQL indexes are built with
+    CREATE INDEX CONCURRENTLY so a large tool_history keeps taking writes.
+    """
+    if engine is None or metadata is None:
+        from app import db
+        engine = engine or db.engine
+        metadata = metadata or db.metadata
+
+    created = []
+    for index in missing_indexes(engine, metadata):
+        try:
+            if engine.dialect.name == 'postgresql':
+                statement = str(CreateIndex(index).compile(dialect=engine.dialect))
+                statement = statement.replace('CREATE INDEX', 'CREATE INDEX CONCURRENTLY IF NOT EXISTS', 1)
+                with engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+                    conn.exec_driver_sql(statement)
+            else:
+                index.create(engine, checkfirst=True)
+            created.append(index.name)
+            logging.info(f"Created index {index.name} on {index.table.name}")
+        except Exception as e:
+            logging.error(f"Index creation error for {index.name}: {str(e)}")
+    return created
+
+
+def ensure_schema(app=None):
+    """Create missing tables and indexes and backfill the popularity counters
+
+    Idempotent. create_app() runs it when SCHEMA_AUTO_CREATE is on; the
+    gunicorn master runs it once and turns it off for the workers.
+    """
+    if app is None:
+        from app import app
+    from app import db
+    import models  # noqa: F401  (registers the tables on db.metadata)
+    from utils.popularity import usage_counters
+
+    with app.app_context():
+        db.create_all()
+        created = ensure_indexes()
+        usage_counters.backfill()
+    return created
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Create missing tables and model indexes')
+    parser.add_argument('--dry-run', action='store_true', help='only list the missing tables and indexes')
+    args = parser.parse_args()
+
+    from app import create_app, db
+    app = create_app({'SCHEMA_AUTO_CREATE': False}, profile='script')
+    if args.dry_run:
+        import models  # noqa: F401
+        with app.app_context():
+            inspector = inspect(db.engine)
+            for table in db.metadata.sorted_tables:
+                if not inspector.has_table(table.name):
+                    print(f'missing table: {table.name}')
+            for index in missing_indexes(db.engine, db.metadata):
+                print(f'missing: {index.name} on {index.table.name}')
+    else:
+        names = ensure_schema(app)
+        print(f"schema up to date, created {len(names)} index(es){': ' + ', '.join(names) if names else ''}")
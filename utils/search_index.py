@@ -0,0 +1,227 @@
+"""
+Search index utilities for Toolora AI
+Prefix and trigram index over the tool catalog for typeahead search,
+ranked by match quality and then by tool popularity
+"""
+
+import re
+import time
+import logging
+import threading
+from operator import itemgetter
+from collections import OrderedDict
+
+from config import Config
+from utils.tool_catalog import tool_catalog
+from utils.popularity import usage_counters
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+MAX_PREFIX = 12
+
+# Score for a query token matching the start of a word in each field; a match
+# inside a word (found through the trigram index) scores half
+FIELD_WEIGHTS = (
+    ('name', 4),
+    ('display_name', 3),
+    ('category', 2),
+    ('features', 1),
+    ('description', 1),
+)
+
+
+def tokenize(text):
+    return TOKEN_PATTERN.findall((text or '').lower())
+
+
+def trigrams(token):
+    return {token[i:i + 3] for i in range(len(token) - 2)}
+
+
+def _tool_fields(tool):
+    """Searchable text of a ToolRecord by field name"""
+    features = ' '.join(f for f in (tool.features or ()) if isinstance(f, str))
+    category = tool.category
+    return {
+        'name': tool.name,
+        'display_name': tool.display_name,
+        'category': f'{category.name} {category.display_name or ""}',
+        'features': features,
+        'description': tool.description,
+    }
+
+
+class SearchIndex:
+    """Immutable index over one catalog snapshot
+
+    Tools are numbered in popularity order, so ranking by (match score,
+    popularity, name) is an integer sort. Every distinct word is posted
+    with its best field weight per tool; query words are resolved to
+    vocabulary words through a prefix map and, from three characters on,
+    a trigram map for matches inside words; shorter words are matched
+    inside words by scanning the vocabulary, as the old substring search did. Ranked results are kept in an
+    LRU keyed by the normalized query, so repeated typeahead prefixes are
+    a dict lookup.
+    """
+
+    def __init__(self, tools, popularity=None, version=None, cache_size=None):
+        popularity = popularity or {}
+        self.tools = tuple(sorted(tools, key=lambda tool: (-popularity.get(tool.name, 0), tool.name)))
+        self.source_tools = tools
+        self.popularity = popularity
+        self.version = version
+        self.cache_size = cache_size if cache_size is not None else Config.SEARCH_CACHE_SIZE
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+        # word -> {field weight: [doc_id, ...]}, each doc under its best weight for the word
+        best = {}
+        for doc_id, tool in enumerate(self.tools):
+            fields = _tool_fields(tool)
+            for field, weight in FIELD_WEIGHTS:
+                for token in tokenize(fields[field]):
+                    postings = best.setdefault(token, {})
+                    if postings.get(doc_id, 0) < weight:
+                        postings[doc_id] = weight
+        self._postings = {}
+        for token, postings in best.items():
+            by_weight = self._postings[token] = {}
+            for doc_id, weight in postings.items():
+                by_weight.setdefault(weight, []).append(doc_id)
+
+        # prefix -> words, trigram -> words
+        self._prefix_words = {}
+        self._trigram_words = {}
+        for token in self._postings:
+            for end in range(1, min(len(token), MAX_PREFIX) + 1):
+                self._prefix_words.setdefault(token[:end], []).append(token)
+            for gram in trigrams(token):
+                self._trigram_words.setdefault(gram, set()).add(token)
+
+    def _words_matching(self, query_token):
+        """Vocabulary words starting with query_token, and words containing it elsewhere"""
+        prefixed = self._prefix_words.get(query_token[:MAX_PREFIX], ())
+        if len(query_token) > MAX_PREFIX:
+            prefixed = [word for word in prefixed if word.startswith(query_token)]
+
+        if len(query_token) < 3:
+            # No trigrams to intersect; the vocabulary is small enough to scan
+            return prefixed, [word for word in self._postings
+                              if query_token in word and not word.startswith(query_token)]
+
+        candidates = None
+        for gram in trigrams(query_token):
+            words = self._trigram_words.get(gram)
+            if not words:
+                return prefixed, []
+            candidates = set(words) if candidates is None else candidates & words
+        inner = [word for word in candidates if query_token in word and not word.startswith(query_token)]
+        return prefixed, inner
+
+    def _token_scores(self, query_token):
+        """{doc_id: score} for the tools matching one query word
+
+        A word prefix match scores twice the field weight, a match inside
+        a word scores the field weight.
+        """
+        prefixed, inner = self._words_matching(query_token)
+        levels = []
+        for words, factor in ((prefixed, 2), (inner, 1)):
+            for word in words:
+                for weight, doc_ids in self._postings[word].items():
+                    levels.append((weight * factor, doc_ids))
+
+        # Lowest first, so each tool ends up with its best score
+        levels.sort(key=itemgetter(0))
+        scores = {}
+        for score, doc_ids in levels:
+            scores.update(dict.fromkeys(doc_ids, score))
+        return scores
+
+    def _ranked(self, query_tokens):
+        """Doc ids matching every query word, best first"""
+        with self._lock:
+            ranked = self._cache.get(query_tokens)
+            if ranked is not None:
+                self._cache.move_to_end(query_tokens)
+                return ranked
+
+        scores = None
+        for query_token in sorted(set(query_tokens), key=len, reverse=True):
+            token_scores = self._token_scores(query_token)
+            if scores is None:
+                scores = token_scores
+            else:
+                scores = {doc_id: score + token_scores[doc_id]
+                          for doc_id, score in scores.items() if doc_id in token_scores}
+            if not scores:
+                break
+
+        # Doc ids are in popularity order; the stable sort by score keeps it for ties
+        scores = scores or {}
+        ranked = sorted(sorted(scores), key=scores.__getitem__, reverse=True)
+        with self._lock:
+            self._cache[query_tokens] = ranked
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return ranked
+
+    def search(self, query, limit=None, category=None):
+        """Tools matching every word of query, best first
+
+        Ties on match score are broken by popularity (use counts by tool
+        name), then by name.
+        """
+        query_tokens = tuple(tokenize(query))
+        if not query_tokens:
+            return []
+
+        ranked = self._ranked(query_tokens)
+        if category and category != 'all':
+            matches = (self.tools[doc_id] for doc_id in ranked)
+            matches = [tool for tool in matches if tool.category.name == category]
+            return matches[:limit] if limit else matches
+        if limit:
+            ranked = ranked[:limit]
+        return [self.tools[doc_id] for doc_id in ranked]
+
+
+class SearchRegistry:
+    """Keeps a SearchIndex in step with the tool catalog and caches popularity"""
+
+    def __init__(self, popularity_ttl=None):
+        self.popularity_ttl = popularity_ttl if popularity_ttl is not None else Config.SEARCH_POPULARITY_TTL
+        self._index = None
+        self._popularity = {}
+        self._popularity_at = 0
+        self._lock = threading.Lock()
+
+    def index(self):
+        """Current index, rebuilt when the catalog or the popularity snapshot changes"""
+        catalog = tool_catalog.get()
+        popularity = self.popularity()
+        index = self._index
+        if index is None or index.source_tools is not catalog.tools or index.popularity is not popularity:
+            with self._lock:
+                index = self._index
+                if index is None or index.source_tools is not catalog.tools or index.popularity is not popularity:
+                    start = time.perf_counter()
+                    index = self._index = SearchIndex(catalog.tools, popularity, catalog.version)
+                    logging.info(f"Search index built for {len(catalog.tools)} tools "
+                                 f"in {(time.perf_counter() - start) * 1000:.1f}ms")
+        return index
+
+    def popularity(self):
+        """All-time use counts by tool name, refreshed every SEARCH_POPULARITY_TTL seconds"""
+        if time.time() - self._popularity_at < self.popularity_ttl:
+            return self._popularity
+        self._popularity_at = time.time()
+        popularity = usage_counters.counts('all')
+        if popularity != self._popularity:
+            self._popularity = popularity
+        return self._popularity
+
+    def search(self, query, limit=None, category=None):
+        return self.index().search(query, limit, category)
+
+
+search_index = SearchRegistry()
@@ -0,0 +1,162 @@
+"""
+Sitemap utilities for Toolora AI
+Builds sitemap.xml (or a sitemap index with child sitemaps) and robots.txt
+once per tool catalog version, gzip-compressed up front and served with
+ETag / Last-Modified revalidation
+"""
+
+import os
+import gzip
+import hashlib
+import logging
+import threading
+from datetime import datetime, timezone
+from xml.sax.saxutils import escape
+
+from flask import request, Response, abort
+
+from config import Config
+from utils.tool_catalog import tool_catalog
+
+# Site pages listed ahead of the tools: (path, changefreq, priority)
+SITE_PAGES = (
+    ('/', 'daily', '1.0'),
+    ('/tools', 'daily', '0.9'),
+    ('/about', 'monthly', '0.7'),
+    ('/contact', 'monthly', '0.7'),
+    ('/privacy', 'monthly', '0.6'),
+    ('/terms', 'monthly', '0.6'),
+    ('/cookies', 'monthly', '0.6'),
+    ('/faq', 'weekly', '0.8'),
+)
+TOOL_CHANGEFREQ = 'weekly'
+TOOL_PRIORITY = '0.8'
+
+XML_HEADER = '<?xml version="1.0" encoding="UTF-8"?>'
+SITEMAP_NS = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+
+
+class Document:
+    """One generated text file with its gzip encoding and validators"""
+
+    __slots__ = ('body', 'gzipped', 'mimetype', 'etag', 'last_modified')
+
+    def __init__(self, text, mimetype, last_modified):
+        self.body = text.encode('utf-8')
+        # mtime=0 keeps the compressed bytes identical across workers
+        self.gzipped = gzip.compress(self.body, compresslevel=9, mtime=0)
+        self.mimetype = mimetype
+        self.etag = hashlib.sha1(self.body).hexdigest()[:32]
+        self.last_modified = last_modified
+
+
+def _url_entry(loc, lastmod, changefreq, priority):
+    lastmod = f'<lastmod>{lastmod}</lastmod>' if lastmod else ''
+    return (f'<url><loc>{escape(loc)}</loc>{lastmod}'
+            f'<changefreq>{changefreq}</changefreq><priority>{priority}</priority></url>')
+
+
+def render_urlset(entries):
+    return '\n'.join([XML_HEADER, f'<urlset xmlns="{SITEMAP_NS}">', *entries, '</urlset>', ''])
+
+
+def render_index(locations, lastmod):
+    lastmod = f'<lastmod>{lastmod}</lastmod>' if lastmod else ''
+    entries = [f'<sitemap><loc>{escape(loc)}</loc>{lastmod}</sitemap>' for loc in locations]
+    return '\n'.join([XML_HEADER, f'<sitemapindex xmlns="{SITEMAP_NS}">', *entries, '</sitemapindex>', ''])
+
+
+def build_documents(catalog, site_url, max_urls, last_modified=None):
+    """Name -> Document for one catalog: 'sitemap.xml' and, past max_urls, its children
+
+    Up to max_urls URLs, sitemap.xml is a single urlset. Beyond that it
+    becomes a sitemap index over 'pages.xml' and 'tools-<n>.xml' chunks of
+    max_urls tools each, all served under /sitemaps/.
+    """
+    lastmod = last_modified.strftime('%Y-%m-%d') if last_modified else None
+    pages = [_url_entry(site_url + path, lastmod, changefreq, priority)
+             for path, changefreq, priority in SITE_PAGES]
+    tools = [_url_entry(f'{site_url}/tools/{tool.name}', lastmod, TOOL_CHANGEFREQ, TOOL_PRIORITY)
+             for tool in catalog.tools]
+
+    if len(pages) + len(tools) <= max_urls:
+        return {'sitemap.xml': Document(render_urlset(pages + tools), 'application/xml', last_modified)}
+
+    documents = {'pages.xml': Document(render_urlset(pages), 'application/xml', last_modified)}
+    for number, start in enumerate(range(0, len(tools), max_urls), 1):
+        documents[f'tools-{number}.xml'] = Document(render_urlset(tools[start:start + max_urls]),
+                                                    'application/xml', last_modified)
+    children = [f'{site_url}/sitemaps/{name}' for name in documents]
+    documents['sitemap.xml'] = Document(render_index(children, lastmod), 'application/xml', last_modified)
+    return documents
+
+
+def render_robots(site_url):
+    return f'User-agent: *\nAllow: /\nSitemap: {site_url}/sitemap.xml\n'
+
+
+class SitemapRegistry:
+    """Process-wide sitemap documents, rebuilt when the tool catalog version moves
+
+    Last-Modified is the mtime of the catalog version file, which every
+    process sees alike, so all workers produce byte-identical documents
+    and ETags.
+    """
+
+    def __init__(self, site_url=None, max_urls=None, max_age=None):
+        self.site_url = (site_url or Config.SITE_URL).rstrip('/')
+        self.max_urls = max_urls or Config.SITEMAP_MAX_URLS
+        self.max_age = max_age if max_age is not None else Config.SITEMAP_MAX_AGE
+        self._version = None
+        self._documents = {}
+        self._robots = None
+        self._lock = threading.Lock()
+
+    def _catalog_modified(self):
+        try:
+            mtime = os.path.getmtime(tool_catalog.version_path)
+        except OSError:
+            return None
+        return datetime.fromtimestamp(int(mtime), tz=timezone.utc)
+
+    def documents(self):
+        """Name -> Document for the current catalog, built on first use after each change"""
+        catalog = tool_catalog.get()
+        if self._version == catalog.version:
+            return self._documents
+        with self._lock:
+            if self._version != catalog.version:
+                self._documents = build_documents(catalog, self.site_url, self.max_urls,
+                                                  self._catalog_modified())
+                self._version = catalog.version
+                logging.info(f"Sitemap v{catalog.version} built: {len(catalog.tools)} tools, "
+                             f"{len(self._documents)} file(s)")
+        return self._documents
+
+    def get(self, name):
+        return self.documents().get(name)
+
+    def robots(self):
+        if self._robots is None:
+            self._robots = Document(render_robots(self.site_url), 'text/plain', None)
+        return self._robots
+
+    def respond(self, document):
+        """Serve a Document, gzipped when the client accepts it, answering conditional requests"""
+        if document is None:
+            abort(404)
+        if request.accept_encodings['gzip']:
+            response = Response(document.gzipped, mimetype=document.mimetype)
+            response.headers['Content-Encoding'] = 'gzip'
+            response.set_etag(f'{document.etag}-gz')
+        else:
+            response = Response(document.body, mimetype=document.mimetype)
+            response.set_etag(document.etag)
+        response.vary.add('Accept-Encoding')
+        if document.last_modified is not None:
+            response.last_modified = document.last_modified
+        response.headers['Cache-Control'] = f'public, max-age={self.max_age}'
+        return response.make_conditional(request)
+
+
+sitemaps = SitemapRegistry()
@@ -0,0 +1,151 @@
+"""
+Static file utilities for Toolora AI
+Serves static/ and built assets from precompressed .br/.gz siblings chosen by
+Accept-Encoding, with year-long immutable caching for fingerprinted names
+"""
+
+import os
+import re
+import gzip
+import mimetypes
+
+try:
+    import brotli
+except ImportError:  # Optional: only .gz siblings are written and served without it
+    brotli = None
+
+from flask import request, send_from_directory
+from werkzeug.security import safe_join
+from werkzeug.exceptions import NotFound
+
+from config import Config
+
+# Preferred first when the client weights them equally
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+# Files worth writing compressed siblings for
+COMPRESSIBLE_EXTENSIONS = ('.css', '.js', '.svg', '.json', '.txt', '.xml', '.html', '.map')
+
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+
+# name.<12 hex digits>.ext, as written by utils/assets.py
+_FINGERPRINTED = re.compile(r'\.[0-9a-f]{12}\.[A-Za-z0-9]+$')
+
+
+def is_fingerprinted(filename):
+    return bool(_FINGERPRINTED.search(filename))
+
+
+def choose_encoding(path):
+    """(encoding, sibling suffix) of the best fresh variant the client accepts, else (None, '')
+
+    A sibling older than its source is ignored, so a static file edited
+    without rerunning the build is never served stale.
+    """
+    try:
+        source_mtime = os.path.getmtime(path)
+    except OSError:
+        return None, ''
+    best, best_quality = (None, ''), 0
+    for encoding, suffix in ENCODINGS:
+        quality = request.accept_encodings[encoding]
+        if quality <= best_quality:
+            continue
+        try:
+            if os.path.getmtime(path + suffix) < source_mtime:
+                continue
+        except OSError:
+            continue
+        best, best_quality = (encoding, suffix), quality
+    return best
+
+
+def has_variants(path):
+    return any(os.path.exists(path + suffix) for _, suffix in ENCODINGS)
+
+
+def send_precompressed(directory, filename, max_age=None):
+    """send_from_directory() that prefers a .br or .gz sibling the client accepts
+
+    The file goes out through wsgi.file_wrapper (sendfile under gunicorn)
+    with an ETag per encoding and Vary: Accept-Encoding whenever variants
+    exist. Fingerprinted names are cached for a year as immutable;
+    everything else gets max_age, or the app's static default.
+    """
+    path = safe_join(directory, filename)
+    if path is None or not os.path.isfile(path):
+        raise NotFound()
+
+    encoding, suffix = choose_encoding(path) if Config.STATIC_PRECOMPRESSED else (None, '')
+    mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    immutable = is_fingerprinted(filename)
+    if immutable:
+        max_age = IMMUTABLE_MAX_AGE
+
+    response = send_from_directory(directory, filename + suffix, mimetype=mimetype, max_age=max_age)
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    if encoding or has_variants(path):
+        response.vary.add('Accept-Encoding')
+    if immutable:
+        response.headers['Cache-Control'] = f'public, max-age={IMMUTABLE_MAX_AGE}, immutable'
+    return response
+
+
+def compress_variants(content):
+    """{sibling suffix: compressed bytes} for every encoding available here"""
+    variants = {'.gz': gzip.compress(content, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants['.br'] = brotli.compress(content, quality=11)
+    return variants
+
+
+def write_variants(path, variants):
+    """Write the variants that are smaller than path next to it, with its mtime; returns how many"""
+    stat = os.stat(path)
+    written = 0
+    for suffix, compressed in variants.items():
+        if len(compressed) >= stat.st_size:
+            continue
+        tmp_path = f'{path}{suffix}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(compressed)
+        # Same mtime as the source: fresh until the source changes
+        os.utime(tmp_path, (stat.st_mtime, stat.st_mtime))
+        os.replace(tmp_path, path + suffix)
+        written += 1
+    return written
+
+
+def precompress_directory(directory, skip=()):
+    """Write .gz (and .br with the brotli package) siblings for compressible files under directory
+
+    Files whose siblings are already as new as they are are left alone.
+    Returns the number of siblings written.
+    """
+    suffixes = [suffix for encoding, suffix in ENCODINGS if encoding != 'br' or brotli is not None]
+    skip = {os.path.abspath(path) for path in skip}
+    written = 0
+    for root, dirs, files in os.walk(directory):
+        dirs[:] = [name for name in dirs if os.path.abspath(os.path.join(root, name)) not in skip]
+        for name in files:
+            if not name.endswith(COMPRESSIBLE_EXTENSIONS):
+                continue
+            path = os.path.join(root, name)
+            mtime = os.path.getmtime(path)
+            fresh = [os.path.exists(path + suffix) and os.path.getmtime(path + suffix) >= mtime
+                     for suffix in suffixes]
+            if all(fresh):
+                continue
+            with open(path, 'rb') as f:
+                written += write_variants(path, compress_variants(f.read()))
+    return written
+
+
+def init_app(app):
+    """Route the app's /static endpoint through send_precompressed()"""
+    def static(filename):
+        return send_precompressed(app.static_folder, filename,
+                                  max_age=app.get_send_file_max_age(filename))
+
+    app.view_functions['static'] = static
@@ -0,0 +1,268 @@
+"""
+Upload storage manager for Toolora AI
+Places uploaded and processed files in sharded subdirectories of uploads/,
+tracks their expiry, and sweeps expired files in the background
+"""
+
+import os
+import time
+import shutil
+import sqlite3
+import hashlib
+import logging
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Non-POSIX platforms: no cross-process locking
+    fcntl = None
+
+from config import Config
+
+
+class StorageManager:
+    """Registry of files under uploads/ with TTL expiry
+
+    Files live at <root>/<aa>/<bb>/<filename>, where aa/bb come from a hash
+    of the filename, so a download can be located from its name alone and
+    no directory grows past a few hundred entries. Every path handed out by
+    output_path() is registered with an expiry in a SQLite index; the
+    sweeper deletes expired files in batches.
+    """
+
+    def __init__(self, root=None, db_path=None, ttl=None, sweep_interval=None, batch_size=None):
+        self.root = root or Config.STORAGE_ROOT
+        self.db_path = db_path or Config.STORAGE_DB_PATH
+        self.ttl = ttl or Config.STORAGE_TTL
+        self.sweep_interval = sweep_interval or Config.STORAGE_SWEEP_INTERVAL
+        self.batch_size = batch_size or Config.STORAGE_SWEEP_BATCH
+        self._lock = threading.Lock()
+        self._sweeper = None
+        self._owner_pid = None
+        self._initialized = False
+        self._last_sweep = {'at': None, 'files_removed': 0, 'bytes_removed': 0, 'duration_ms': 0}
+
+    # Storage
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _init_db(self):
+        if self._initialized:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS files (
+                    filename TEXT PRIMARY KEY,
+                    path TEXT NOT NULL,
+                    size INTEGER,
+                    created_at REAL NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS ix_files_expires_at ON files (expires_at)')
+            conn.execute('CREATE INDEX IF NOT EXISTS ix_files_size ON files (size)')
+        finally:
+            conn.close()
+        self._initialized = True
+
+    # Public API
+
+    @staticmethod
+    def shard(filename):
+        """Return the two-level shard directory (e.g. '3f/a2') for a filename"""
+        digest = hashlib.sha1(filename.encode()).hexdigest()
+        return os.path.join(digest[:2], digest[2:4])
+
+    def path_for(self, filename):
+        """Sharded path of a filename, without registering it"""
+        return os.path.join(self.root, self.shard(filename), filename)
+
+    def output_path(self, filename, ttl=None):
+        """Allocate a sharded path for a new file and register it for expiry"""
+        self._init_db()
+        path = self.path_for(filename)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute(
+                'INSERT OR REPLACE INTO files (filename, path, size, created_at, expires_at) '
+                'VALUES (?, ?, NULL, ?, ?)',
+                (filename, path, now, now + (ttl or self.ttl))
+            )
+        finally:
+            conn.close()
+        return path
+
+    def resolve(self, filename):
+        """Return the path of a live file by name, or None if missing or expired
+
+        Falls back to the flat uploads/<filename> layout for files written
+        before sharding.
+        """
+        self._init_db()
+        conn = self._connect()
+        try:
+            row = conn.execute('SELECT path, expires_at FROM files WHERE filename = ?', (filename,)).fetchone()
+        finally:
+            conn.close()
+
+        if row is not None:
+            if row['expires_at'] < time.time():
+                return None
+            return row['path'] if os.path.exists(row['path']) else None
+
+        legacy_path = os.path.join(self.root, filename)
+        return legacy_path if os.path.isfile(legacy_path) else None
+
+    def sweep(self):
+        """Delete expired files in batches and record sizes of new ones
+
+        Only one process sweeps at a time; returns the number of files
+        removed, or None if another process holds the sweep lock.
+        """
+        self._init_db()
+        lock_path = f'{self.db_path}.sweep.lock'
+        with open(lock_path, 'a') as lock_file:
+            if fcntl is not None:
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    return None
+
+            started = time.time()
+            removed, removed_bytes = 0, 0
+            conn = self._connect()
+            try:
+                while True:
+                    rows = conn.execute(
+                        'SELECT filename, path FROM files WHERE expires_at < ? ORDER BY expires_at LIMIT ?',
+                        (started, self.batch_size)
+                    ).fetchall()
+                    for row in rows:
+                        try:
+                            removed_bytes += os.path.getsize(row['path'])
+                            os.remove(row['path'])
+                            removed += 1
+                        except OSError:
+                            pass  # Already consumed or deleted by a processor
+                    conn.executemany('DELETE FROM files WHERE filename = ?', [(row['filename'],) for row in rows])
+                    if len(rows) < self.batch_size:
+                        break
+
+                self._record_sizes(conn)
+            finally:
+                conn.close()
+
+        self._last_sweep = {
+            'at': started,
+            'files_removed': removed,
+            'bytes_removed': removed_bytes,
+            'duration_ms': round((time.time() - started) * 1000, 1)
+        }
+        if removed:
+            logging.info(f"Storage sweep removed {removed} files ({removed_bytes} bytes)")
+        return removed
+
+    def _record_sizes(self, conn):
+        """Fill in sizes of files registered before they were written"""
+        rows = conn.execute(
+            'SELECT filename, path FROM files WHERE size IS NULL AND created_at < ? LIMIT ?',
+            (time.time() - 60, self.batch_size)
+        ).fetchall()
+        sizes = []
+        for row in rows:
+            try:
+                sizes.append((os.path.getsize(row['path']), row['filename']))
+            except OSError:
+                sizes.append((0, row['filename']))
+        conn.executemany('UPDATE files SET size = ? WHERE filename = ?', sizes)
+
+    def sweep_saved_files(self):
+        """Delete SavedFile rows (and their files) past expires_at; needs an app context"""
+        from datetime import datetime
+        from app import db
+        from models import SavedFile
+
+        removed = 0
+        while True:
+            expired = SavedFile.query.filter(SavedFile.expires_at < datetime.utcnow()) \
+                .limit(self.batch_size).all()
+            for saved_file in expired:
+                try:
+                    os.remove(saved_file.file_path)
+                except OSError:
+                    pass
+                db.session.delete(saved_file)
+            db.session.commit()
+            removed += len(expired)
+            if len(expired) < self.batch_size:
+                return removed
+
+    def stats(self):
+        """Return tracked file counts, bytes and disk usage"""
+        self._init_db()
+        conn = self._connect()
+        try:
+            files, size = conn.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM files').fetchone()
+            expired = conn.execute('SELECT COUNT(*) FROM files WHERE expires_at < ?', (time.time(),)).fetchone()[0]
+        finally:
+            conn.close()
+
+        os.makedirs(self.root, exist_ok=True)
+        disk = shutil.disk_usage(self.root)
+        return {
+            'files': files,
+            'size_bytes': size,
+            'expired_pending': expired,
+            'ttl': self.ttl,
+            'disk_total_bytes': disk.total,
+            'disk_used_bytes': disk.used,
+            'disk_free_bytes': disk.free,
+            'last_sweep': self._last_sweep
+        }
+
+    # Background sweeping
+
+    def start_sweeper(self, app=None):
+        """Start the sweeper thread for this process (idempotent, fork-aware)
+
+        With an app, expired SavedFile rows are swept as well.
+        """
+        if not Config.STORAGE_SWEEPER_ENABLED:
+            return
+        with self._lock:
+            if self._owner_pid == os.getpid() and self._sweeper and self._sweeper.is_alive():
+                return
+            self._owner_pid = os.getpid()
+            self._sweeper = threading.Thread(target=self._sweep_loop, args=(app,),
+                                             name='storage-sweeper', daemon=True)
+            self._sweeper.start()
+
+    def _sweep_loop(self, app):
+        while True:
+            try:
+                self.sweep()
+                if app is not None:
+                    with app.app_context():
+                        self.sweep_saved_files()
+            except Exception as e:
+                logging.error(f"Storage sweeper error: {str(e)}")
+            time.sleep(self.sweep_interval)
+
+
+storage = StorageManager()
+
+
+if __name__ == '__main__':
+    # One-off sweep, e.g. from cron: python -m utils.storage
+    logging.basicConfig(level=logging.INFO)
+    storage.sweep()
+    logging.info(f"Storage stats: {storage.stats()}")
@@ -0,0 +1,266 @@
+"""
+Tool catalog registry for Toolora AI
+Holds the tool and category list in memory so page views do not query the
+tools tables, reloading only when a version counter says they changed
+"""
+
+import os
+import time
+import logging
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Non-POSIX platforms: no cross-process locking
+    fcntl = None
+
+from flask import has_app_context
+
+from config import Config
+
+# Shown with a "popular" badge until usage counters say otherwise
+DEFAULT_POPULAR_TOOLS = ('pdf-merge', 'image-compress', 'qr-generator', 'resume-generator')
+
+
+class _Record:
+    """Immutable, slots-based record"""
+
+    __slots__ = ()
+
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            object.__setattr__(self, name, fields.get(name))
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f'{type(self).__name__} is immutable')
+
+    def __repr__(self):
+        return f'<{type(self).__name__} {self.name}>'
+
+
+class CategoryRecord(_Record):
+    __slots__ = ('name', 'display_name', 'icon', 'color', 'description', 'sort_order')
+
+
+class ToolRecord(_Record):
+    __slots__ = ('name', 'display_name', 'description', 'category', 'icon', 'color',
+                 'is_popular', 'is_premium', 'usage_count', 'features', 'file_types', 'max_file_size_mb')
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'display_name': self.display_name,
+            'description': self.description,
+            'category': self.category.name,
+            'icon': self.icon,
+            'color': self.color,
+            'is_popular': self.is_popular
+        }
+
+
+class ToolCatalog:
+    """One immutable snapshot of all active tools, indexed by name and category"""
+
+    def __init__(self, tools, categories, version, source):
+        self.tools = tuple(tools)
+        self.categories = tuple(categories)
+        self.version = version
+        self.source = source
+        self.by_name = {tool.name: tool for tool in self.tools}
+        by_category = {}
+        for tool in self.tools:
+            by_category.setdefault(tool.category.name, []).append(tool)
+        self.by_category = {name: tuple(tools) for name, tools in by_category.items()}
+        self.categories_by_name = {category.name: category for category in self.categories}
+
+    def get(self, name):
+        return self.by_name.get(name)
+
+    def in_category(self, category):
+        """Tools of one category, or all tools for 'all'/empty"""
+        if not category or category == 'all':
+            return self.tools
+        return self.by_category.get(category, ())
+
+
+def catalog_from_config(icons=None, version=0):
+    """Build a catalog from Config.TOOL_CATEGORIES (used when the tools table is empty)"""
+    icons = icons or {}
+    tools, categories = [], []
+    for sort_order, (category_id, category_data) in enumerate(Config.TOOL_CATEGORIES.items()):
+        category = CategoryRecord(
+            name=category_id,
+            display_name=category_data['name'],
+            icon=category_data['icon'],
+            color=category_data['color'],
+            description=category_data['description'],
+            sort_order=sort_order
+        )
+        categories.append(category)
+        for tool_name in category_data['tools']:
+            tools.append(ToolRecord(
+                name=tool_name,
+                display_name=tool_name.replace('-', ' ').title(),
+                description=f"Professional {tool_name.replace('-', ' ')} tool",
+                category=category,
+                icon=icons.get(tool_name, 'tool'),
+                color=category_data['color'],
+                is_popular=tool_name in DEFAULT_POPULAR_TOOLS,
+                is_premium=False,
+                usage_count=0,
+                features=(),
+                file_types=(),
+                max_file_size_mb=16
+            ))
+    return ToolCatalog(tools, categories, version, 'config')
+
+
+def catalog_from_database(icons=None, version=0):
+    """Build a catalog from the tools and tool_categories tables; needs an app context"""
+    from models import Tool, ToolCategory
+
+    icons = icons or {}
+    categories = {}
+    for row in ToolCategory.query.order_by(ToolCategory.sort_order, ToolCategory.name).all():
+        categories[row.id] = CategoryRecord(
+            name=row.name,
+            display_name=row.display_name,
+            icon=row.icon,
+            color=row.color or 'blue',
+            description=row.description,
+            sort_order=row.sort_order
+        )
+
+    tools = []
+    for row in Tool.query.filter_by(is_active=True).order_by(Tool.id).all():
+        category = categories.get(row.category_id) or CategoryRecord(name='utility', display_name='Utility')
+        tools.append(ToolRecord(
+            name=row.name,
+            display_name=row.display_name,
+            description=row.description,
+            category=category,
+            icon=icons.get(row.name) or row.icon or 'tool',
+            color=category.color or 'blue',
+            is_popular=row.name in DEFAULT_POPULAR_TOOLS,
+            is_premium=bool(row.is_premium),
+            usage_count=row.usage_count or 0,
+            features=tuple(row.features or ()),
+            file_types=tuple(row.file_types or ()),
+            max_file_size_mb=row.max_file_size_mb
+        ))
+    return ToolCatalog(tools, categories.values(), version, 'database')
+
+
+class ToolCatalogRegistry:
+    """Process-wide holder of the current ToolCatalog
+
+    Writes to Tool or ToolCategory through SQLAlchemy bump a version
+    counter stored in a small file shared by all processes. Readers compare
+    it with their snapshot's version at most every CATALOG_CHECK_INTERVAL
+    seconds and rebuild the snapshot when it moved.
+    """
+
+    def __init__(self, version_path=None, check_interval=None):
+        self.version_path = version_path or Config.CATALOG_VERSION_PATH
+        self.check_interval = check_interval if check_interval is not None else Config.CATALOG_CHECK_INTERVAL
+        self.icons = {}
+        self.app = None
+        self._catalog = None
+        self._checked_at = 0
+        self._lock = threading.Lock()
+        self._listening = False
+
+    # Version counter
+
+    def current_version(self):
+        try:
+            with open(self.version_path) as f:
+                return int(f.read().strip() or 0)
+        except (OSError, ValueError):
+            return 0
+
+    def bump_version(self):
+        """Invalidate every process's catalog"""
+        os.makedirs(os.path.dirname(os.path.abspath(self.version_path)), exist_ok=True)
+        with open(self.version_path, 'a+') as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            f.seek(0)
+            try:
+                version = int(f.read().strip() or 0) + 1
+            except ValueError:
+                version = 1
+            f.seek(0)
+            f.truncate()
+            f.write(str(version))
+            f.flush()
+        self._checked_at = 0
+        return version
+
+    # Loading
+
+    def load(self):
+        """Rebuild the catalog from the database, falling back to Config"""
+        version = self.current_version()
+        try:
+            if self.app is not None and not has_app_context():
+                with self.app.app_context():
+                    catalog = catalog_from_database(self.icons, version)
+            else:
+                catalog = catalog_from_database(self.icons, version)
+            if not catalog.tools:
+                catalog = catalog_from_config(self.icons, version)
+        except Exception as e:
+            logging.warning(f"Tool catalog: database unavailable, using config ({e})")
+            catalog = catalog_from_config(self.icons, version)
+
+        self._catalog = catalog
+        self._checked_at = time.time()
+        logging.info(f"Tool catalog v{version} loaded from {catalog.source}: {len(catalog.tools)} tools")
+        return catalog
+
+    def get(self):
+        """Return the current catalog, reloading it if the version counter moved"""
+        catalog = self._catalog
+        if catalog is not None and time.time() - self._checked_at < self.check_interval:
+            return catalog
+        with self._lock:
+            if self._catalog is None or self.current_version() != self._catalog.version:
+                return self.load()
+            self._checked_at = time.time()
+            return self._catalog
+
+    # Flask integration
+
+    def init_app(self, app, icons=None):
+        """Invalidate the catalog on Tool/ToolCategory writes; it is loaded on first get()"""
+        from sqlalchemy import event
+        from sqlalchemy.orm import Session
+        from models import Tool, ToolCategory
+
+        self.app = app
+        if icons:
+            self.icons = icons
+        self._catalog = None
+        if self._listening:
+            return
+        self._listening = True
+
+        @event.listens_for(Session, 'after_flush')
+        def _track_catalog_changes(session, flush_context):
+            for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+                if isinstance(obj, (Tool, ToolCategory)):
+                    session.info['tool_catalog_changed'] = True
+                    return
+
+        @event.listens_for(Session, 'after_commit')
+        def _bump_catalog_version(session):
+            if session.info.pop('tool_catalog_changed', False):
+                self.bump_version()
+
+        @event.listens_for(Session, 'after_rollback')
+        def _discard_catalog_changes(session):
+            session.info.pop('tool_catalog_changed', None)
+
+
+tool_catalog = ToolCatalogRegistry()
@@ -0,0 +1,200 @@
+"""
+Usage tracking utilities for Toolora AI
+Buffers /api/dashboard/track events and server-side tool runs in memory and
+writes them to tool_history, with the popularity counters, in batched
+inserts from a background thread
+"""
+
+import os
+import time
+import atexit
+import logging
+import threading
+from collections import deque
+
+from config import Config
+from utils.popularity import usage_counters
+
+GUEST_EMAIL = 'guest@suntyn.ai'
+
+
+class UsageTracker:
+    """Write-behind buffer for ToolHistory rows
+
+    Requests append an event to a bounded ring buffer and return; a
+    per-process flusher thread inserts pending events in one multi-row
+    statement once TRACKING_BATCH_SIZE are waiting or every
+    TRACKING_FLUSH_INTERVAL seconds. When the buffer is full the oldest
+    event is dropped. Pending events are drained at interpreter exit, which
+    covers gunicorn's graceful worker shutdown.
+    """
+
+    def __init__(self, buffer_size=None, batch_size=None, flush_interval=None):
+        self.buffer_size = buffer_size or Config.TRACKING_BUFFER_SIZE
+        self.batch_size = batch_size or Config.TRACKING_BATCH_SIZE
+        self.flush_interval = flush_interval if flush_interval is not None else Config.TRACKING_FLUSH_INTERVAL
+        self.app = None
+        self._buffer = deque(maxlen=self.buffer_size)
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = False
+        self._thread = None
+        self._pid = None
+        self._guest_user_id = None
+        self._counters = {'recorded': 0, 'flushed': 0, 'dropped': 0, 'failed': 0, 'batches': 0}
+        self._last_flush = None
+        atexit.register(self.drain)
+
+    # Recording
+
+    def record(self, tool_name, tool_category, **fields):
+        """Queue one tool use; returns immediately"""
+        event = dict(fields, tool_name=tool_name, tool_category=tool_category)
+        event.setdefault('used_at', time.time())
+
+        if not Config.TRACKING_BUFFER_ENABLED:
+            self._write([event])
+            return
+
+        with self._lock:
+            if self._pid != os.getpid():
+                # Forked child: the parent's thread and events stay with the parent
+                self._buffer.clear()
+                self._thread = None
+                self._pid = os.getpid()
+            if len(self._buffer) == self._buffer.maxlen:
+                self._counters['dropped'] += 1
+            self._buffer.append(event)
+            self._counters['recorded'] += 1
+            pending = len(self._buffer)
+            if self._thread is None:
+                self._start()
+
+        if pending >= self.batch_size:
+            self._wakeup.set()
+
+    def record_run(self, tool_name, processing_time, **fields):
+        """Queue a tool run timed by the server; the category comes from the tool catalog"""
+        from utils.tool_catalog import tool_catalog
+
+        tool = tool_catalog.get().get(tool_name)
+        self.record(tool_name, tool.category.name if tool else 'other',
+                    processing_time=round(processing_time, 3), **fields)
+
+    def record_job(self, job):
+        """JobQueue finish hook: record a finished job with its measured run time"""
+        if job and job['status'] == 'finished' and job['started_at'] and job['finished_at']:
+            self.record_run(job['tool'], job['finished_at'] - job['started_at'])
+
+    # Flushing
+
+    def _start(self):
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name='usage-tracker', daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stopping:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def flush(self):
+        """Write everything currently buffered, batch by batch"""
+        with self._flush_lock:
+            while True:
+                with self._lock:
+                    count = min(len(self._buffer), self.batch_size)
+                    batch = [self._buffer.popleft() for _ in range(count)]
+                if not batch:
+                    return
+                self._write(batch)
+
+    def drain(self):
+        """Stop the flusher and write all pending events"""
+        self._stopping = True
+        self._wakeup.set()
+        if self._pid == os.getpid():
+            self.flush()
+
+    def _write(self, events):
+        try:
+            if self.app is not None:
+                with self.app.app_context():
+                    self._insert(events)
+            else:
+                self._insert(events)
+        except Exception as e:
+            if len(events) > 1:
+                # Retry row by row so one bad event does not take the rest of the batch with it
+                logging.warning(f"Usage tracking batch of {len(events)} failed, retrying rows: {str(e)}")
+                for event in events:
+                    self._write([event])
+                return
+            with self._lock:
+                self._counters['failed'] += 1
+            logging.error(f"Usage tracking flush error: {str(e)}")
+            return
+
+        with self._lock:
+            self._counters['flushed'] += len(events)
+            self._counters['batches'] += 1
+            self._last_flush = time.time()
+
+    def _insert(self, events):
+        from datetime import datetime
+        from models import ToolHistory
+        from utils.database import db_writer
+
+        # One serialized write transaction per batch, so flushers in several
+        # workers queue for the SQLite write lock instead of failing on it
+        with db_writer.session() as session:
+            user_id = self._guest_user(session, events[0].get('display_name'))
+            rows = [{
+                'user_id': user_id,
+                'tool_name': event['tool_name'][:100],
+                'tool_category': event['tool_category'][:50],
+                'file_count': event.get('file_count', 1),
+                'file_size_mb': event.get('file_size_mb', 0),
+                'processing_time': event.get('processing_time'),
+                'used_at': datetime.utcfromtimestamp(event['used_at']),
+                'ip_address': event.get('ip_address'),
+                'user_agent': (event.get('user_agent') or '')[:500]
+            } for event in events]
+            try:
+                session.execute(ToolHistory.__table__.insert(), rows)
+                usage_counters.apply(rows, session)
+            except Exception:
+                self._guest_user_id = None
+                raise
+
+    def _guest_user(self, session, display_name=None):
+        """Id of the shared guest user, created on first use and cached per process"""
+        if self._guest_user_id is not None:
+            return self._guest_user_id
+        from models import User
+
+        user = session.query(User).filter_by(email=GUEST_EMAIL).first()
+        if not user:
+            user = User(email=GUEST_EMAIL, display_name=display_name or 'Guest User')
+            session.add(user)
+            session.flush()
+        self._guest_user_id = user.id
+        return self._guest_user_id
+
+    # Reporting
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+            stats['pending'] = len(self._buffer)
+        stats['buffer_size'] = self.buffer_size
+        stats['last_flush'] = self._last_flush
+        return stats
+
+    def init_app(self, app):
+        self.app = app
+
+
+usage_tracker = UsageTracker()
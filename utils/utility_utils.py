@@ -3,11 +3,17 @@ Utility processing functions for various tools
 """
 import os
 import uuid
-import qrcode
-from PIL import Image, ImageDraw, ImageFont
 import tempfile
 import logging
 
+from utils.storage import storage
+from utils.metrics import instrument_processor
+from utils.lazy_imports import lazy_import
+
+qrcode = lazy_import('qrcode')
+Image = lazy_import('PIL.Image')
+
+@instrument_processor
 class UtilityProcessor:
     """Utility processing functions"""
 
@@ -51,10 +57,7 @@ class UtilityProcessor:
 
             # Generate output filename
             output_filename = f"qr_code_{uuid.uuid4()}.png"
-            output_path = os.path.join('uploads', output_filename)
-
-            # Ensure uploads directory exists
-            os.makedirs('uploads', exist_ok=True)
+            output_path = storage.output_path(output_filename)
 
             # Save image
             img.save(output_path, 'PNG')
@@ -122,4 +125,3 @@ class UtilityProcessor:
         except Exception as e:
             logging.error(f"Text case conversion error: {str(e)}")
             return text
-`
\ No newline at end of file
@@ -4,24 +4,186 @@ Handles video trimming, audio extraction, and other operations
 """
 
 import os
+import json
+import time
 import uuid
+import itertools
 import subprocess
 import tempfile
 import logging
 
+try:
+    import fcntl
+except ImportError:  # Non-POSIX platforms: slots are not enforced across processes
+    fcntl = None
+
+from config import Config
+from utils.result_cache import cached
+from utils.storage import storage
+from utils.metrics import instrument_processor
+
+
+class FFmpegScheduler:
+    """Owns every ffmpeg invocation
+
+    Concurrent encodes are capped at a fixed number of slots shared by all
+    processes on the host (flock on per-slot lock files). Waiters take a
+    ticket in a queue directory and are served first come, first served.
+    Each encode gets -threads set to the per-slot CPU budget.
+    """
+
+    def __init__(self, slots=None, threads_per_slot=None, state_dir=None, poll_interval=0.1):
+        self.slots = slots or Config.FFMPEG_SLOTS
+        self.threads_per_slot = threads_per_slot or Config.FFMPEG_THREADS_PER_SLOT
+        self.state_dir = state_dir or Config.FFMPEG_STATE_DIR
+        self.poll_interval = poll_interval
+        self.queue_dir = os.path.join(self.state_dir, 'queue')
+        self.slot_dir = os.path.join(self.state_dir, 'slots')
+        self._tickets = itertools.count()
+
+    def _ensure_dirs(self):
+        os.makedirs(self.queue_dir, exist_ok=True)
+        os.makedirs(self.slot_dir, exist_ok=True)
+
+    def _slot_state_path(self, slot):
+        return os.path.join(self.slot_dir, f'slot-{slot}.json')
+
+    def _read_slot_state(self, slot):
+        try:
+            with open(self._slot_state_path(slot)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {'pid': None, 'started_at': None, 'jobs': 0, 'busy_seconds': 0.0, 'since': time.time()}
+
+    def _write_slot_state(self, slot, state):
+        path = self._slot_state_path(slot)
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _pid_alive(pid):
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            return True
+        return True
+
+    def _waiting_tickets(self):
+        """Return queued tickets in arrival order, dropping those of dead processes"""
+        tickets = []
+        for name in sorted(os.listdir(self.queue_dir)):
+            pid = int(name.split('-')[1])
+            if self._pid_alive(pid):
+                tickets.append(name)
+            else:
+                try:
+                    os.remove(os.path.join(self.queue_dir, name))
+                except OSError:
+                    pass
+        return tickets
+
+    def _try_lock_slot(self):
+        for slot in range(self.slots):
+            handle = open(os.path.join(self.slot_dir, f'slot-{slot}.lock'), 'a+')
+            try:
+                fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                handle.close()
+                continue
+            return slot, handle
+        return None, None
+
+    def _acquire(self):
+        """Block until this caller reaches the head of the queue and owns a slot"""
+        self._ensure_dirs()
+        if fcntl is None:
+            return 0, None
+
+        ticket = f'{time.time_ns():020d}-{os.getpid()}-{next(self._tickets)}'
+        ticket_path = os.path.join(self.queue_dir, ticket)
+        open(ticket_path, 'w').close()
+        try:
+            while True:
+                # Only the oldest waiters may take a slot, so later arrivals never jump the queue
+                if ticket in self._waiting_tickets()[:self.slots]:
+                    slot, handle = self._try_lock_slot()
+                    if handle is not None:
+                        return slot, handle
+                time.sleep(self.poll_interval)
+        finally:
+            try:
+                os.remove(ticket_path)
+            except OSError:
+                pass
+
+    def build_command(self, cmd):
+        """Add the per-slot thread budget as an output option"""
+        return cmd[:-1] + ['-threads', str(self.threads_per_slot), cmd[-1]]
+
+    def run(self, cmd, timeout=None):
+        """Run an ffmpeg command inside a scheduler slot; returns CompletedProcess"""
+        slot, handle = self._acquire()
+        state = self._read_slot_state(slot)
+        state.update(pid=os.getpid(), started_at=time.time())
+        self._write_slot_state(slot, state)
+        try:
+            return subprocess.run(self.build_command(cmd), capture_output=True, text=True,
+                                  timeout=timeout or Config.FFMPEG_TIMEOUT)
+        finally:
+            state['busy_seconds'] += time.time() - state['started_at']
+            state['jobs'] += 1
+            state.update(pid=None, started_at=None)
+            self._write_slot_state(slot, state)
+            if handle is not None:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+                handle.close()
+
+    def stats(self):
+        """Return queue depth and per-slot utilization across all processes"""
+        self._ensure_dirs()
+        now = time.time()
+        slot_usage = []
+        for slot in range(self.slots):
+            state = self._read_slot_state(slot)
+            busy = state['pid'] is not None and self._pid_alive(state['pid'])
+            busy_seconds = state['busy_seconds'] + (now - state['started_at'] if busy else 0)
+            elapsed = max(now - state['since'], 1e-9)
+            slot_usage.append({
+                'slot': slot,
+                'busy': busy,
+                'jobs': state['jobs'],
+                'busy_seconds': round(busy_seconds, 3),
+                'utilization': round(min(busy_seconds / elapsed, 1.0), 4)
+            })
+
+        return {
+            'slots': self.slots,
+            'threads_per_slot': self.threads_per_slot,
+            'active': sum(1 for s in slot_usage if s['busy']),
+            'queue_depth': len(self._waiting_tickets()),
+            'slot_usage': slot_usage
+        }
+
+
+ffmpeg_scheduler = FFmpegScheduler()
+
+
+@instrument_processor
 class VideoProcessor:
     """Video processing utilities using FFmpeg"""
     
     @staticmethod
+    @cached('video-to-mp3')
     def extract_audio(input_file, output_format='mp3'):
         """Extract audio from video file"""
         try:
             # Generate output filename
             output_filename = f"audio_{uuid.uuid4()}.{output_format}"
-            output_path = os.path.join('uploads', output_filename)
-            
-            # Ensure uploads directory exists
-            os.makedirs('uploads', exist_ok=True)
+            output_path = storage.output_path(output_filename)
             
             # FFmpeg command to extract audio
             cmd = [
@@ -36,7 +198,7 @@ class VideoProcessor:
             ]
             
             # Run FFmpeg
-            result = subprocess.run(cmd, capture_output=True, text=True)
+            result = ffmpeg_scheduler.run(cmd)
             
             if result.returncode == 0:
                 # Cleanup input file
@@ -54,16 +216,14 @@ class VideoProcessor:
             return None
     
     @staticmethod
+    @cached('video-trimmer')
     def trim_video(input_file, start_time=0, duration=None):
         """Trim video file"""
         try:
             # Generate output filename
             file_ext = os.path.splitext(input_file)[1].lower()
             output_filename = f"trimmed_{uuid.uuid4()}{file_ext}"
-            output_path = os.path.join('uploads', output_filename)
-            
-            # Ensure uploads directory exists
-            os.makedirs('uploads', exist_ok=True)
+            output_path = storage.output_path(output_filename)
             
             # Build FFmpeg command
             cmd = ['ffmpeg', '-i', input_file, '-ss', str(start_time)]
@@ -74,7 +234,7 @@ class VideoProcessor:
             cmd.extend(['-c', 'copy', '-y', output_path])
             
             # Run FFmpeg
-            result = subprocess.run(cmd, capture_output=True, text=True)
+            result = ffmpeg_scheduler.run(cmd)
             
             if result.returncode == 0:
                 # Cleanup input file
@@ -92,16 +252,14 @@ class VideoProcessor:
             return None
     
     @staticmethod
+    @cached('video-compress')
     def compress_video(input_file, crf=23):
         """Compress video file"""
         try:
             # Generate output filename
             file_ext = os.path.splitext(input_file)[1].lower()
             output_filename = f"compressed_{uuid.uuid4()}{file_ext}"
-            output_path = os.path.join('uploads', output_filename)
-            
-            # Ensure uploads directory exists
-            os.makedirs('uploads', exist_ok=True)
+            output_path = storage.output_path(output_filename)
             
             # FFmpeg command for compression
             cmd = [
@@ -115,7 +273,7 @@ class VideoProcessor:
             ]
             
             # Run FFmpeg
-            result = subprocess.run(cmd, capture_output=True, text=True)
+            result = ffmpeg_scheduler.run(cmd)
             
             if result.returncode == 0:
                 # Cleanup input file
@@ -133,16 +291,14 @@ class VideoProcessor:
             return None
     
     @staticmethod
+    @cached('audio-remover')
     def remove_audio(input_file):
         """Remove audio from video file"""
         try:
             # Generate output filename
             file_ext = os.path.splitext(input_file)[1].lower()
             output_filename = f"no_audio_{uuid.uuid4()}{file_ext}"
-            output_path = os.path.join('uploads', output_filename)
-            
-            # Ensure uploads directory exists
-            os.makedirs('uploads', exist_ok=True)
+            output_path = storage.output_path(output_filename)
             
             # FFmpeg command to remove audio
             cmd = [
@@ -154,7 +310,7 @@ class VideoProcessor:
             ]
             
             # Run FFmpeg
-            result = subprocess.run(cmd, capture_output=True, text=True)
+            result = ffmpeg_scheduler.run(cmd)
             
             if result.returncode == 0:
                 # Cleanup input file
@@ -1,7 +1,8 @@
 import os
-import subprocess
 import tempfile
 
+from utils.video_tools import ffmpeg_scheduler
+
 def trim_video(input_file, output_path, start_time, end_time):
     """Trim video to specified time range"""
     try:
@@ -15,7 +16,7 @@ def trim_video(input_file, output_path, start_time, end_time):
             output_path
         ]
         
-        result = subprocess.run(cmd, capture_output=True, text=True)
+        result = ffmpeg_scheduler.run(cmd)
         
         if result.returncode == 0:
             return True
@@ -39,7 +40,7 @@ def extract_audio(input_file, output_path):
             output_path
         ]
         
-        result = subprocess.run(cmd, capture_output=True, text=True)
+        result = ffmpeg_scheduler.run(cmd)
         
         if result.returncode == 0:
             return True
@@ -73,7 +74,7 @@ def compress_video(input_file, output_path, quality='medium'):
             output_path
         ]
         
-        result = subprocess.run(cmd, capture_output=True, text=True)
+        result = ffmpeg_scheduler.run(cmd)
         
         if result.returncode == 0:
             return True
@@ -96,7 +97,7 @@ def convert_video_format(input_file, output_path, output_format):
             output_path
         ]
         
-        result = subprocess.run(cmd, capture_output=True, text=True)
+        result = ffmpeg_scheduler.run(cmd)
         
         if result.returncode == 0:
             return True